@@ -0,0 +1,418 @@
+"""Columnar attendance analytics over attendance_data.xlsx.
+
+The sheet is loaded once per content hash into NumPy columns (employee code,
+day ordinal, punch-in/out epoch seconds, status code, total hours, punch-in
+location code).  Summaries over any date range are computed with boolean
+masks and ``bincount`` reductions instead of per-record Python loops, and are
+cached per (range, grouping) on the table generation, so a reload of the
+sheet invalidates them automatically.
+
+Because everything is already column-wise, a snapshot of the table is just
+its arrays plus the string lists; loading one maps the arrays in place.
+"""
+
+import calendar
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from directory import Directory, id_sort_key
+from pagination import decode_cursor, encode_cursor
+from snapshot import pack_strings
+from sources import WatchedFile
+from work_calendar import WorkCalendar
+
+GROUPINGS = ("employee", "department", "location", "day")
+
+# Codes are appended in first-seen order; these are pinned so the common
+# statuses keep stable codes across reloads.
+KNOWN_STATUSES = ("present", "late", "half_day", "absent", "leave", "holiday", "wfh")
+
+# Days of attendance a status counts for when comparing against working days.
+ATTENDED = {"present": 1.0, "late": 1.0, "wfh": 1.0, "half_day": 0.5}
+
+MISSING = -1
+
+SUMMARY_CACHE_SIZE = 256
+
+COLUMNS = ("employee", "day", "punch_in", "punch_out", "status", "hours", "location",
+           "out_location", "remark")
+STRING_LISTS = ("employee_ids", "employee_names", "statuses", "locations", "remarks")
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    text = str(value).strip()
+    return "" if text.lower() in ("nan", "none") else text
+
+
+def _epoch(value) -> int:
+    if isinstance(value, datetime):
+        return calendar.timegm(value.timetuple())
+    text = _text(value)
+    if not text:
+        return MISSING
+    try:
+        return calendar.timegm(datetime.fromisoformat(text.replace("Z", "")).timetuple())
+    except ValueError:
+        return MISSING
+
+
+def _day(value) -> int:
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    try:
+        return date.fromisoformat(_text(value)[:10]).toordinal()
+    except ValueError:
+        return MISSING
+
+
+class Interner:
+    """Maps strings to dense integer codes."""
+
+    def __init__(self, initial=()):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for value in initial:
+            self.code(value)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class AttendanceTable:
+    """One immutable generation of the attendance sheet, stored column-wise."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], employee_ids: List[str],
+                 employee_names: List[str], statuses: List[str], locations: List[str],
+                 remarks: List[str], version: int, source_hash: str):
+        self.employee = columns["employee"]
+        self.day = columns["day"]
+        self.punch_in = columns["punch_in"]
+        self.punch_out = columns["punch_out"]
+        self.status = columns["status"]
+        self.hours = columns["hours"]
+        self.location = columns["location"]
+        self.out_location = columns["out_location"]
+        self.remark = columns["remark"]
+        self.employee_ids = employee_ids
+        self.employee_names = employee_names
+        self.statuses = statuses
+        self.locations = locations
+        self.remarks = remarks
+        self.version = version
+        self.source_hash = source_hash
+        self.load_seconds = 0.0
+        self.loaded_from = "source"
+        self.derived: Dict[object, object] = {}
+        self._summaries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._summaries_lock = threading.Lock()
+        self.summary_hits = 0
+        self.summary_misses = 0
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    @classmethod
+    def from_rows(cls, rows, version: int = 0, source_hash: str = "") -> "AttendanceTable":
+        employees, names = Interner(), []
+        statuses = Interner(KNOWN_STATUSES)
+        locations = Interner()
+        remarks = Interner()
+        columns = {key: [] for key in COLUMNS}
+        for row in rows:
+            emp_id = _text(row.get("employee_id"))
+            if emp_id.endswith(".0"):
+                emp_id = emp_id[:-2]
+            if not emp_id:
+                continue
+            code = employees.code(emp_id)
+            if code == len(names):
+                names.append(_text(row.get("employee_name")))
+            columns["employee"].append(code)
+            columns["day"].append(_day(row.get("date")))
+            columns["punch_in"].append(_epoch(row.get("punch_in")))
+            columns["punch_out"].append(_epoch(row.get("punch_out")))
+            columns["status"].append(statuses.code(_text(row.get("status")).lower()))
+            hours = row.get("total_hours")
+            columns["hours"].append(float(hours) if hours not in (None, "") else 0.0)
+            columns["location"].append(locations.code(_text(row.get("punch_in_location"))))
+            columns["out_location"].append(locations.code(_text(row.get("punch_out_location"))))
+            remark = _text(row.get("remarks"))
+            columns["remark"].append(remarks.code(remark) if remark else MISSING)
+        arrays = {
+            "employee": np.array(columns["employee"], dtype=np.int32),
+            "day": np.array(columns["day"], dtype=np.int32),
+            "punch_in": np.array(columns["punch_in"], dtype=np.int64),
+            "punch_out": np.array(columns["punch_out"], dtype=np.int64),
+            "status": np.array(columns["status"], dtype=np.int8),
+            "hours": np.array(columns["hours"], dtype=np.float32),
+            "location": np.array(columns["location"], dtype=np.int32),
+            "out_location": np.array(columns["out_location"], dtype=np.int32),
+            "remark": np.array(columns["remark"], dtype=np.int32),
+        }
+        return cls(arrays, employees.values, names, statuses.values, locations.values,
+                   remarks.values, version, source_hash)
+
+    def record(self, row: int) -> dict:
+        """One row in the shape produced by ``dataService.loadAttendanceData()``."""
+        def stamp(seconds):
+            if seconds == MISSING:
+                return None
+            return datetime.fromtimestamp(int(seconds), timezone.utc).replace(tzinfo=None).isoformat()
+
+        day = int(self.day[row])
+        return {
+            "id": f"att_{row + 1:04d}",
+            "employee_id": self.employee_ids[self.employee[row]],
+            "employee_name": self.employee_names[self.employee[row]],
+            "date": date.fromordinal(day).isoformat() if day != MISSING else None,
+            "punch_in": stamp(self.punch_in[row]),
+            "punch_out": stamp(self.punch_out[row]),
+            "punch_in_location": self.locations[self.location[row]] or None,
+            "punch_out_location": self.locations[self.out_location[row]] or None,
+            "status": self.statuses[self.status[row]],
+            "total_hours": round(float(self.hours[row]), 2),
+            "remarks": self.remarks[self.remark[row]] if self.remark[row] != MISSING else None,
+        }
+
+    def records(self, rows) -> Iterator[dict]:
+        for row in rows:
+            yield self.record(int(row))
+
+    def select(self, search: Optional[str] = None, start: Optional[date] = None,
+               end: Optional[date] = None, employee_id: Optional[str] = None) -> np.ndarray:
+        """Boolean row mask; ``search`` is a name/id prefix as in ``getAttendance()``."""
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.day >= start.toordinal()
+        if end is not None:
+            mask &= self.day <= end.toordinal()
+        if employee_id:
+            code = {emp_id: i for i, emp_id in enumerate(self.employee_ids)}.get(employee_id)
+            mask &= self.employee == (-1 if code is None else code)
+        if search:
+            term = search.lower()
+            codes = [
+                code for code, (emp_id, name) in enumerate(zip(self.employee_ids, self.employee_names))
+                if name.lower().startswith(term) or emp_id.lower().startswith(term)
+            ]
+            mask &= np.isin(self.employee, np.array(codes, dtype=np.int32))
+        return mask
+
+    def _keyset(self):
+        """Rows sorted by (day, employee id), with their composite sort keys."""
+        cached = self.derived.get("keyset")
+        if cached is None:
+            n_employees = max(len(self.employee_ids), 1)
+            ranked = sorted(range(len(self.employee_ids)), key=lambda c: id_sort_key(self.employee_ids[c]))
+            rank = np.empty(len(self.employee_ids), dtype=np.int64)
+            rank[ranked] = np.arange(len(ranked), dtype=np.int64)
+            keys = self.day.astype(np.int64) * n_employees + rank[self.employee]
+            order = np.argsort(keys, kind="stable")
+            sorted_ids = [id_sort_key(self.employee_ids[c]) for c in ranked]
+            cached = self.derived["keyset"] = (order, keys[order], sorted_ids)
+        return cached
+
+    def ordered(self, mask: np.ndarray) -> Iterator[int]:
+        """All rows of ``mask`` in (date, employee id) order, produced lazily."""
+        order = self._keyset()[0]
+        for start in range(0, len(order), 4096):
+            block = order[start:start + 4096]
+            yield from block[mask[block]].tolist()
+
+    def page(self, mask: np.ndarray, after: Optional[str], limit: int) -> Tuple[np.ndarray, Optional[str]]:
+        """Rows of ``mask`` in (date, employee id) order, resuming after cursor ``after``."""
+        order, keys, sorted_ids = self._keyset()
+        start = 0
+        if after:
+            day_text, emp_id, row_text = decode_cursor(after, 3)
+            try:
+                day, row = date.fromisoformat(day_text).toordinal(), int(row_text)
+            except ValueError:
+                raise ValueError("Malformed cursor")
+            n_employees = max(len(self.employee_ids), 1)
+            rank = bisect_left(sorted_ids, id_sort_key(emp_id))
+            known = rank < len(sorted_ids) and sorted_ids[rank] == id_sort_key(emp_id)
+            key = day * n_employees + rank
+            start = int(np.searchsorted(keys, key, side="left"))
+            if known:
+                # Skip rows sharing the cursor's key up to and including its row.
+                end = int(np.searchsorted(keys, key, side="right"))
+                same = order[start:end]
+                start += int(np.count_nonzero(same <= row))
+        # Scan forward in growing blocks so the first page costs O(limit)
+        # rather than a pass over the whole history.
+        found, block = [], max(4 * limit, 1024)
+        collected = 0
+        while start < len(order) and collected <= limit:
+            candidates = order[start:start + block]
+            hits = candidates[mask[candidates]]
+            found.append(hits)
+            collected += len(hits)
+            start += block
+            block *= 2
+        rows = np.concatenate(found)[:limit + 1] if found else order[:0]
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = int(rows[-1])
+        cursor = encode_cursor(date.fromordinal(int(self.day[last])).isoformat(),
+                               self.employee_ids[self.employee[last]], str(last))
+        return rows, cursor
+
+    def _department_codes(self, directory: Directory):
+        """Department code per attendance employee code, cached for the latest directory version only."""
+        cached = self.derived.get("departments")
+        if cached is not None and cached[0] == directory.version:
+            return cached[1], cached[2]
+        departments = Interner(["Unassigned"])
+        codes = np.empty(len(self.employee_ids), dtype=np.int32)
+        for code, emp_id in enumerate(self.employee_ids):
+            emp = directory.get(emp_id)
+            codes[code] = departments.code(emp.department) if emp and emp.department else 0
+        # A request still holding an older generation never evicts a newer one.
+        if cached is None or cached[0] < directory.version:
+            self.derived["departments"] = (directory.version, codes, departments.values)
+        return codes, departments.values
+
+    def summary(self, start: Optional[date] = None, end: Optional[date] = None,
+                group_by: str = "employee", directory: Optional[Directory] = None,
+                calendar: Optional[WorkCalendar] = None) -> dict:
+        """Status counts and hours per group.
+
+        With a ``calendar``, the range's working days come along and each
+        employee gets ``expectedDays`` against ``attendedDays`` (half days
+        count half); each day row says whether it was a working day.
+        """
+        if group_by not in GROUPINGS:
+            raise ValueError(f"group_by must be one of {', '.join(GROUPINGS)}")
+        if group_by == "department" and directory is None:
+            raise ValueError("Grouping by department needs the employee directory")
+        key = (start, end, group_by, directory.version if group_by == "department" else None,
+               calendar.version if calendar else None)
+        with self._summaries_lock:
+            cached = self._summaries.get(key)
+            if cached is not None:
+                self._summaries.move_to_end(key)
+                self.summary_hits += 1
+                return cached
+            self.summary_misses += 1
+
+        mask = self.day != MISSING
+        if start is not None:
+            mask &= self.day >= start.toordinal()
+        if end is not None:
+            mask &= self.day <= end.toordinal()
+
+        if group_by == "employee":
+            keys, labels = self.employee[mask], self.employee_ids
+        elif group_by == "department":
+            codes, labels = self._department_codes(directory)
+            keys = codes[self.employee[mask]]
+        elif group_by == "location":
+            keys, labels = self.location[mask], self.locations
+        else:
+            keys, labels = self.day[mask], None
+
+        groups, inverse = np.unique(keys, return_inverse=True)
+        n_groups, n_statuses = len(groups), len(self.statuses)
+        status_counts = np.bincount(
+            inverse * n_statuses + self.status[mask], minlength=n_groups * n_statuses,
+        ).reshape(n_groups, n_statuses)
+        hours = np.bincount(inverse, weights=self.hours[mask], minlength=n_groups)
+        records = status_counts.sum(axis=1)
+        working_days = None
+        if calendar is not None and mask.any():
+            days = self.day[mask]
+            first = start or date.fromordinal(int(days.min()))
+            last = end or date.fromordinal(int(days.max()))
+            working_days = calendar.working_days(first, last)
+            attended = status_counts @ np.array([ATTENDED.get(status, 0.0) for status in self.statuses])
+
+        rows = []
+        for i, group in enumerate(groups.tolist()):
+            row = {
+                "key": date.fromordinal(group).isoformat() if labels is None else labels[group],
+                "records": int(records[i]),
+                "totalHours": round(float(hours[i]), 2),
+                "averageHours": round(float(hours[i] / records[i]), 2),
+                "statuses": {self.statuses[s]: int(n) for s, n in enumerate(status_counts[i]) if n},
+            }
+            if group_by == "employee":
+                row["name"] = self.employee_names[group]
+            if working_days is not None:
+                if group_by == "employee":
+                    row["expectedDays"] = working_days
+                    row["attendedDays"] = float(attended[i])
+                elif group_by == "day":
+                    row["workingDay"] = calendar.is_working(date.fromordinal(group))
+            rows.append(row)
+
+        totals = status_counts.sum(axis=0)
+        result = {
+            "groupBy": group_by,
+            "from": start.isoformat() if start else None,
+            "to": end.isoformat() if end else None,
+            "version": self.version,
+            "records": int(records.sum()),
+            "totalHours": round(float(hours.sum()), 2),
+            "statuses": {self.statuses[s]: int(n) for s, n in enumerate(totals) if n},
+            "groups": rows,
+        }
+        if working_days is not None:
+            result["workingDays"] = working_days
+        with self._summaries_lock:
+            self._summaries[key] = result
+            if len(self._summaries) > SUMMARY_CACHE_SIZE:
+                self._summaries.popitem(last=False)
+        return result
+
+
+def parse_attendance(path: str, version: int = 0, source_hash: str = "") -> AttendanceTable:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[workbook.sheetnames[0]]
+        rows = sheet.iter_rows(values_only=True)
+        header = [_text(h).lower() for h in next(rows, ())]
+        return AttendanceTable.from_rows(
+            (dict(zip(header, values)) for values in rows), version, source_hash,
+        )
+    finally:
+        workbook.close()
+
+
+class AttendanceStore(WatchedFile):
+    description = "attendance workbook"
+    snapshot_kind = "attendance"
+
+    def empty(self) -> AttendanceTable:
+        return AttendanceTable.from_rows([])
+
+    def load(self, source_hash: str, version: int) -> AttendanceTable:
+        return parse_attendance(self.path, version, source_hash)
+
+    def to_snapshot(self, table: AttendanceTable) -> dict:
+        sections = {f"attendance.{column}": getattr(table, column) for column in COLUMNS}
+        for name in STRING_LISTS:
+            # Positional lists (names may repeat), so no StringTable dedup.
+            sections[f"{name}.offsets"], sections[f"{name}.data"] = pack_strings(getattr(table, name))
+        return sections
+
+    def from_snapshot(self, snapshot, version: int) -> AttendanceTable:
+        columns = {column: snapshot.array(f"attendance.{column}") for column in COLUMNS}
+        lists = [snapshot.strings(name) for name in STRING_LISTS]
+        return AttendanceTable(columns, *lists, version=version, source_hash=snapshot.source_hash)
@@ -0,0 +1,99 @@
+"""One-round-trip startup payload assembled from pre-serialized fragments.
+
+Each section (employees, hierarchy, meeting rooms, ...) is registered with a
+version function and a builder.  The builder runs and its JSON is encoded
+once per version; ``/api/bootstrap`` then only splices cached byte strings
+together, so serving it costs a dictionary lookup per section rather than a
+re-serialisation of every collection.  Clients send the versions they
+already hold and sections that have not moved are left out.
+
+Sections whose content also depends on the clock (room occupancy) pass a
+``ttl`` so their fragment is rebuilt at least that often.
+
+With an ``epoch`` (the server run, see ``changelog.RUN_EPOCH``) the payload
+names it, so clients can turn versions into ``since`` tokens and tell when
+the versions they hold come from an earlier run.
+"""
+
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+
+class Fragment(NamedTuple):
+    version: int
+    body: bytes
+    built_at: float
+
+
+class SectionRegistry:
+    def __init__(self, epoch: Optional[str] = None):
+        self.epoch = epoch
+        self._sections: Dict[str, Tuple[Callable[[], int], Callable[[], object], Optional[float]]] = {}
+        self._fragments: Dict[str, Fragment] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, name: str, version: Callable[[], int], build: Callable[[], object],
+                 ttl: Optional[float] = None) -> None:
+        self._sections[name] = (version, build, ttl)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sections
+
+    def names(self):
+        return list(self._sections)
+
+    def fragment(self, name: str) -> Fragment:
+        version_of, build, ttl = self._sections[name]
+        version = version_of()
+        cached = self._fragments.get(name)
+        now = time.monotonic()
+        if cached is not None and cached.version == version and (ttl is None or now - cached.built_at < ttl):
+            self.hits += 1
+            return cached
+        with self._lock:
+            cached = self._fragments.get(name)
+            if cached is None or cached.version != version or (ttl is not None and now - cached.built_at >= ttl):
+                self.misses += 1
+                body = json.dumps(build(), separators=(",", ":")).encode()
+                cached = self._fragments[name] = Fragment(version, body, now)
+            else:
+                self.hits += 1
+        return cached
+
+    def assemble(self, include: Iterable[str], known: Optional[Dict[str, int]] = None) -> bytes:
+        """``{"versions": ..., "sections": ..., "unchanged": [...]}`` as JSON bytes."""
+        known = known or {}
+        versions, parts, unchanged = {}, [], []
+        for name in include:
+            if name not in self._sections:
+                raise ValueError(f"Unknown section: {name}")
+            if name in versions:
+                continue
+            fragment = self.fragment(name)
+            versions[name] = fragment.version
+            if known.get(name) == fragment.version:
+                unchanged.append(name)
+            else:
+                parts.append(json.dumps(name).encode() + b":" + fragment.body)
+        return b"".join([
+            b'{' if self.epoch is None else b'{"epoch":' + json.dumps(self.epoch).encode() + b',',
+            b'"versions":', json.dumps(versions, separators=(",", ":")).encode(),
+            b',"sections":{', b",".join(parts), b'},"unchanged":', json.dumps(unchanged).encode(), b"}",
+        ])
+
+
+def parse_known(value: Optional[str]) -> Dict[str, int]:
+    """``"employees:3,hierarchy:3"`` -> {"employees": 3, "hierarchy": 3}."""
+    known = {}
+    for item in (value or "").split(","):
+        name, _, version = item.strip().partition(":")
+        if name:
+            try:
+                known[name] = int(version)
+            except ValueError:
+                raise ValueError(f"Malformed version for {name}: {version!r}")
+    return known
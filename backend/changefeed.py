@@ -0,0 +1,128 @@
+"""Server-sent change feed replacing client-side polling.
+
+Every mutation publishes a ``Change`` (data type, new version, changed
+record ids).  Each connected client has a ``Subscriber`` holding at most one
+pending change per data type: changes arriving before the client has been
+written to are merged (highest version, union of ids), so a burst of
+updates costs one event and a slow client's backlog can never grow past the
+number of data types.  When the merged id set gets large it collapses to
+``ids: null``, meaning "reload this type".
+
+Publishers may run on any thread (request handlers run in the threadpool,
+file reloads under the store lock); they only touch the subscriber's
+pending map and wake its event loop.  Idle connections send nothing.
+"""
+
+import asyncio
+import json
+import threading
+from typing import AsyncIterator, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set
+
+# Bursts within this window go out as one event per type.
+COALESCE_WINDOW = 0.02
+# Above this many ids a change is sent as "reload the type" instead.
+MAX_IDS = 500
+
+EVENT_STREAM = "text/event-stream"
+
+
+class Change(NamedTuple):
+    type: str
+    version: int
+    ids: Optional[FrozenSet[str]]  # None: everything may have changed
+    sequence: int
+
+    def merge(self, newer: "Change") -> "Change":
+        ids = None if self.ids is None or newer.ids is None else self.ids | newer.ids
+        if ids is not None and len(ids) > MAX_IDS:
+            ids = None
+        return Change(self.type, max(self.version, newer.version), ids, newer.sequence)
+
+    def to_dict(self) -> dict:
+        return {"type": self.type, "version": self.version,
+                "ids": sorted(self.ids) if self.ids is not None else None}
+
+
+def sse_event(event: str, data: dict, event_id: Optional[int] = None) -> bytes:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":")))
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, types: Optional[Set[str]] = None):
+        self.loop = loop
+        self.types = types
+        self.pending: Dict[str, Change] = {}
+        self.lock = threading.Lock()
+        self.wakeup = asyncio.Event()
+
+    def offer(self, change: Change) -> None:
+        if self.types is not None and change.type not in self.types:
+            return
+        with self.lock:
+            queued = self.pending.get(change.type)
+            self.pending[change.type] = change if queued is None else queued.merge(change)
+        self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    async def next_batch(self) -> List[Change]:
+        await self.wakeup.wait()
+        await asyncio.sleep(COALESCE_WINDOW)
+        self.wakeup.clear()
+        with self.lock:
+            batch = sorted(self.pending.values(), key=lambda change: change.sequence)
+            self.pending.clear()
+        return batch
+
+
+class ChangeFeed:
+    def __init__(self):
+        self.versions: Dict[str, int] = {}
+        self.sequence = 0
+        self._subscribers: Set[Subscriber] = set()
+        self._lock = threading.Lock()
+
+    def publish(self, type: str, version: int, ids: Optional[Iterable[str]] = None) -> None:
+        ids = frozenset(ids) if ids is not None else None
+        if ids is not None and len(ids) > MAX_IDS:
+            ids = None
+        with self._lock:
+            self.sequence += 1
+            self.versions[type] = max(version, self.versions.get(type, version))
+            change = Change(type, version, ids, self.sequence)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.offer(change)
+
+    def subscribe(self, types: Optional[Iterable[str]] = None) -> Subscriber:
+        """Register a subscriber on the running event loop."""
+        subscriber = Subscriber(asyncio.get_running_loop(), set(types) if types else None)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    async def stream(self, types: Optional[Iterable[str]] = None) -> AsyncIterator[bytes]:
+        """SSE body: current versions first, then coalesced changes until the client leaves."""
+        subscriber = self.subscribe(types)
+        try:
+            with self._lock:
+                versions = {t: v for t, v in self.versions.items()
+                            if subscriber.types is None or t in subscriber.types}
+                sequence = self.sequence
+            yield sse_event("versions", versions, sequence)
+            while True:
+                for change in await subscriber.next_batch():
+                    # Sending waits for the client, so a slow reader simply
+                    # accumulates merged changes instead of queued events.
+                    yield sse_event("change", change.to_dict(), change.sequence)
+        finally:
+            self.unsubscribe(subscriber)
@@ -0,0 +1,110 @@
+"""Bounded, compacted change logs for ``?since=<version>`` delta sync.
+
+A ``ChangeLog`` remembers, for one collection, the version at which each
+record id last changed.  It is kept in version order and holds every id at
+most once -- a record edited a hundred times costs one entry -- so answering
+"what changed since v" walks back from the newest entry and stops at the
+first one at or before v.  Past ``capacity`` ids the oldest entries are
+dropped and ``floor`` moves up; a client whose ``since`` is below the floor
+gets a full snapshot instead of a delta.
+
+Versions of the workbook-backed datasets restart with the process, so the
+version handed to clients is a token ``<run epoch>.<version>``.  A token
+from another run -- or a bare number, whose run is unknown -- gets a full
+snapshot: its version may well be reached again in this run with different
+content.
+
+Whether a changed id is an upsert or a tombstone is decided when the delta
+is served, by looking the record up in the current data.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Set
+
+DEFAULT_CAPACITY = 10000
+# Identifies this server run in version tokens.
+RUN_EPOCH = format(time.time_ns() // 1000, "x")
+
+
+def version_token(version: int, epoch: str = RUN_EPOCH) -> str:
+    return f"{epoch}.{version}"
+
+
+def parse_since(token: Optional[str], epoch: str = RUN_EPOCH) -> Optional[int]:
+    """The version of a ``since`` token issued by this run; None when only a full snapshot will do."""
+    token_epoch, _, version = (token or "").partition(".")
+    if token_epoch != epoch or not version.isdigit():
+        return None
+    return int(version)
+
+
+class ChangeLog:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, epoch: str = RUN_EPOCH):
+        self.capacity = capacity
+        self.epoch = epoch
+        self.version = 0
+        # Oldest version a delta can be computed from; ``since=0`` ("I have
+        # nothing") always gets a full snapshot.
+        self.floor = 1
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, version: int, ids: Optional[Iterable[str]] = None) -> None:
+        """Note that ``ids`` changed at ``version``; ``None`` means "everything".
+
+        The log never goes back: a version older than the newest recorded
+        one (a late publisher) is filed under the newest, which keeps the
+        entries in version order for ``since`` and at worst sends a client
+        a record it already has.
+        """
+        with self._lock:
+            version = self.version = max(version, self.version)
+            if ids is None:
+                self._entries.clear()
+                self.floor = version
+                return
+            for record_id in ids:
+                self._entries[record_id] = version
+                self._entries.move_to_end(record_id)
+            while len(self._entries) > self.capacity:
+                _, dropped = self._entries.popitem(last=False)
+                self.floor = max(self.floor, dropped)
+
+    def since(self, version: Optional[int]) -> Optional[Set[str]]:
+        """Ids changed after ``version``, or None if only a full snapshot will do."""
+        with self._lock:
+            if version is None or version < self.floor or version > self.version:
+                return None
+            changed = set()
+            for record_id in reversed(self._entries):
+                if self._entries[record_id] <= version:
+                    break
+                changed.add(record_id)
+            return changed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def delta(log: ChangeLog, since: str, lookup: Callable[[str], Optional[dict]],
+          everything: Callable[[], Iterable[dict]]) -> dict:
+    """The ``?since=<token>`` response body for one collection.
+
+    ``lookup(id)`` returns the current record or None if it was deleted;
+    ``everything()`` produces the full collection for snapshot fallbacks.
+    """
+    version = version_token(log.version, log.epoch)
+    changed = log.since(parse_since(since, log.epoch))
+    if changed is None:
+        return {"version": version, "since": since, "full": True, "upserts": list(everything()), "deleted": []}
+    upserts: List[dict] = []
+    deleted: List[str] = []
+    for record_id in sorted(changed):
+        record = lookup(record_id)
+        if record is None:
+            deleted.append(record_id)
+        else:
+            upserts.append(record)
+    return {"version": version, "since": since, "full": False, "upserts": upserts, "deleted": deleted}
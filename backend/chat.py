@@ -0,0 +1,354 @@
+"""Backend for the floating chat assistant.
+
+Most questions people type into the chat are directory lookups -- a
+manager, an extension, who is free in which office -- and the answers are
+already in memory.  ``DirectoryAssistant`` recognises those with a short
+list of patterns and answers them straight from the directory, the org
+graph and the meeting-room index; only messages no pattern claims go to the
+``ChatBackend``, which is where a hosted model plugs in (``load_backend``).
+The default ``LocalBackend`` makes no network calls and is what tests use.
+
+Conversation history lives in ``SessionStore``: an LRU of sessions bounded by
+count and by total message bytes, with idle sessions expiring after a TTL.
+Eviction is done on write, so reads never pay for it.
+"""
+
+import importlib
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Callable, Deque, List, NamedTuple, Optional, Tuple
+
+from directory import Directory, Employee
+from hierarchy import OrgGraph
+from meeting_rooms import MeetingRooms
+from record_store import timestamp
+from search_index import PrefixIndex
+
+MAX_MESSAGE_CHARS = 2000
+# Bookkeeping cost charged per message on top of its text.
+MESSAGE_OVERHEAD = 200
+
+
+class ChatMessage(NamedTuple):
+    id: str
+    session_id: str
+    user_message: str
+    bot_response: str
+    created_at: str
+    source: str            # "directory" or the backend's name
+    intent: Optional[str]
+
+    @property
+    def size(self) -> int:
+        return len(self.user_message) + len(self.bot_response) + MESSAGE_OVERHEAD
+
+    def to_dict(self) -> dict:
+        # ``response`` is what FloatingChatbot reads after a send.
+        return dict(self._asdict(), response=self.bot_response)
+
+
+class SessionStore:
+    """Per-session message histories, least recently used evicted first."""
+
+    def __init__(self, max_sessions: int = 10000, max_messages: int = 50, max_bytes: int = 16 << 20,
+                 ttl: float = 4 * 3600, clock: Callable[[], float] = time.monotonic):
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.bytes = 0
+        # session id -> (last used, messages); ordered oldest use first.
+        self._sessions: "OrderedDict[str, Tuple[float, Deque[ChatMessage]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def history(self, session_id: str) -> List[ChatMessage]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or self.clock() - entry[0] > self.ttl:
+                return []
+            return list(entry[1])
+
+    def append(self, message: ChatMessage) -> None:
+        with self._lock:
+            now = self.clock()
+            entry = self._sessions.pop(message.session_id, None)
+            if entry is None or now - entry[0] > self.ttl:
+                if entry is not None:
+                    self.bytes -= sum(old.size for old in entry[1])
+                messages: Deque[ChatMessage] = deque()
+            else:
+                messages = entry[1]
+            messages.append(message)
+            self.bytes += message.size
+            if len(messages) > self.max_messages:
+                self.bytes -= messages.popleft().size
+            self._sessions[message.session_id] = (now, messages)
+            self._evict(now)
+
+    def clear(self, session_id: str) -> bool:
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is None:
+                return False
+            self.bytes -= sum(message.size for message in entry[1])
+            return True
+
+    def _evict(self, now: float) -> None:
+        # Oldest use first, so expired sessions are always at the front.
+        while self._sessions:
+            session_id, (last_used, messages) = next(iter(self._sessions.items()))
+            if (now - last_used <= self.ttl and len(self._sessions) <= self.max_sessions
+                    and self.bytes <= self.max_bytes):
+                break
+            del self._sessions[session_id]
+            self.bytes -= sum(message.size for message in messages)
+
+
+class ChatBackend:
+    """Answers whatever the directory fast path does not recognise."""
+
+    name = "backend"
+
+    def reply(self, message: str, history: List[ChatMessage]) -> str:
+        raise NotImplementedError
+
+
+class LocalBackend(ChatBackend):
+    """No model: explains what the assistant can answer."""
+
+    name = "local"
+
+    def reply(self, message: str, history: List[ChatMessage]) -> str:
+        return ("I can answer directory questions without a model, for example:\n"
+                "• \"Who is 80024's manager?\"\n"
+                "• \"Extension of Vikas\"\n"
+                "• \"Who reports to 80024?\"\n"
+                "• \"Rooms free at IFC now\"\n"
+                "No general-purpose model is configured on this server.")
+
+
+def load_backend(spec: Optional[str]) -> ChatBackend:
+    """``module:attribute`` naming a ``ChatBackend`` class or factory; empty means ``LocalBackend``."""
+    if not spec:
+        return LocalBackend()
+    module_name, _, attribute = spec.partition(":")
+    if not attribute:
+        raise ValueError(f"Chat backend must look like 'module:attribute', got {spec!r}")
+    return getattr(importlib.import_module(module_name), attribute)()
+
+
+# ---------- Directory fast path ----------
+FIELDS = {
+    "extension": "extension", "ext": "extension",
+    "phone": "mobile", "phone number": "mobile", "mobile": "mobile", "mobile number": "mobile",
+    "number": "mobile", "contact": "mobile",
+    "email": "email", "email address": "email", "mail": "email",
+    "department": "department", "location": "location", "office": "location", "grade": "grade",
+}
+FIELD_LABELS = {"extension": "extension", "mobile": "mobile number", "email": "email",
+                "department": "department", "location": "location", "grade": "grade"}
+FIELD = "|".join(sorted((re.escape(name) for name in FIELDS), key=len, reverse=True))
+POSSESSIVE = r"(?:'s|’s|s')"
+ASK = r"(?:(?:what|who)(?:\s+is|'s|’s)\s+|tell\s+me\s+|give\s+me\s+)?(?:the\s+)?"
+MANAGER = r"(?:reporting\s+manager|manager|boss|supervisor|reporting\s+head)"
+
+INTENTS = [
+    ("manager", re.compile(rf"^{ASK}{MANAGER}\s+(?:of|for)\s+(?P<who>.+)$", re.I)),
+    ("manager", re.compile(rf"^{ASK}(?P<who>.+?){POSSESSIVE}\s+{MANAGER}$", re.I)),
+    ("manager", re.compile(r"^who\s+(?:does|do)\s+(?P<who>.+?)\s+report\s+to$", re.I)),
+    ("reports", re.compile(r"^(?:who\s+reports?\s+to|(?:list\s+)?(?:the\s+)?(?:direct\s+reports|team|reportees)\s+"
+                           r"(?:of|for|under))\s+(?P<who>.+)$", re.I)),
+    ("field", re.compile(rf"^{ASK}(?P<field>{FIELD})\s+(?:of|for)\s+(?P<who>.+)$", re.I)),
+    ("field", re.compile(rf"^{ASK}(?P<who>.+?){POSSESSIVE}\s+(?P<field>{FIELD})$", re.I)),
+    ("rooms", re.compile(r"^(?:(?:which|any|are\s+there(?:\s+any)?|show(?:\s+me)?|list)\s+)?(?:free|available|vacant)?"
+                         r"\s*(?:meeting\s+|conference\s+)?rooms?(?:\s+(?:are|is))?(?:\s+(?:free|available|vacant))?"
+                         r"(?:\s+(?:at|in)\s+(?P<where>.+?))?(?:\s+(?:right\s+)?now)?$", re.I)),
+    ("lookup", re.compile(r"^(?:who\s+is|who's|who’s|find|search(?:\s+for)?|look\s*up|show(?:\s+me)?)\s+(?P<who>.+)$",
+                          re.I)),
+    ("greeting", re.compile(r"^(?:hi|hello|hey|help|good\s+(?:morning|afternoon|evening))\b", re.I)),
+]
+ROOM_WINDOW = 30 * 60
+MAX_CANDIDATES = 5
+
+
+class DirectoryAssistant:
+    """Pattern-matched answers from the in-memory indexes; ``None`` when a question is not recognised."""
+
+    def __init__(self, directory: Callable[[], Directory], graph: Callable[[], OrgGraph], index: PrefixIndex,
+                 rooms: MeetingRooms, clock: Callable[[], float] = time.time):
+        self.directory = directory
+        self.graph = graph
+        self.index = index
+        self.rooms = rooms
+        self.clock = clock
+
+    def answer(self, message: str) -> Optional[Tuple[str, str]]:
+        """``(intent, reply)`` or None."""
+        text = " ".join(message.split()).rstrip("?.! ")
+        for intent, pattern in INTENTS:
+            match = pattern.match(text)
+            if match is None:
+                continue
+            reply = getattr(self, f"_{intent}")(**match.groupdict())
+            if reply is not None:
+                return intent, reply
+        return None
+
+    # ---------- resolving people ----------
+    def resolve(self, who: str) -> List[Employee]:
+        """Employees ``who`` may refer to: an id, a name prefix, or words of a name."""
+        directory = self.directory()
+        who = who.strip().strip("\"'").strip()
+        if who.lower().startswith(("employee ", "emp ")):
+            who = who.split(None, 1)[1]
+        emp = directory.get(who)
+        if emp is not None:
+            return [emp]
+        if not who:
+            return []
+        term = who.lower()
+        found = [emp for emp in directory.in_order(self.index.lookup(term)) if emp.name.lower().startswith(term)]
+        if not found:
+            words = term.split()
+            found = [emp for emp in directory.employees
+                     if all(any(part.startswith(word) for part in emp.name.lower().split()) for word in words)]
+        exact = [emp for emp in found if emp.name.lower() == term]
+        return exact or found
+
+    def _one(self, who: str) -> Tuple[Optional[Employee], Optional[str]]:
+        """The single employee ``who`` names, or a reply explaining why there is none."""
+        found = self.resolve(who)
+        if not found:
+            return None, self._not_found(who)
+        if len(found) > 1:
+            lines = [f"• {describe(emp)}" for emp in found[:MAX_CANDIDATES]]
+            more = f"\n…and {len(found) - MAX_CANDIDATES} more." if len(found) > MAX_CANDIDATES else ""
+            return None, (f"{len(found)} people match \"{who}\":\n" + "\n".join(lines) + more
+                          + "\nAsk again with the employee id to be specific.")
+        return found[0], None
+
+    @staticmethod
+    def _not_found(who: str) -> str:
+        return f"I couldn't find anyone matching \"{who}\" in the directory."
+
+    # ---------- intents ----------
+    def _manager(self, who: str) -> str:
+        emp, problem = self._one(who)
+        if emp is None:
+            return problem
+        graph = self.graph()
+        position = graph.position(emp.id)
+        if position is None:  # the directory was reloaded after the lookup
+            return self._not_found(who)
+        parent = graph.parent[position]
+        if parent < 0:
+            return f"{emp.name} ({emp.id}) has no reporting manager in the directory."
+        return f"{emp.name}'s reporting manager is {describe(graph.directory.employees[parent])}."
+
+    def _reports(self, who: str) -> str:
+        emp, problem = self._one(who)
+        if emp is None:
+            return problem
+        graph = self.graph()
+        position = graph.position(emp.id)
+        if position is None:  # the directory was reloaded after the lookup
+            return self._not_found(who)
+        children = graph.children[position]
+        if not children:
+            return f"Nobody reports directly to {emp.name} ({emp.id})."
+        employees = graph.directory.employees
+        lines = [f"• {describe(employees[child])}" for child in children[:20]]
+        more = f"\n…and {len(children) - 20} more." if len(children) > 20 else ""
+        return (f"{len(children)} people report directly to {emp.name} "
+                f"({graph.headcount(position)} in the whole team):\n" + "\n".join(lines) + more)
+
+    def _field(self, who: str, field: str) -> Optional[str]:
+        attribute = FIELDS[field.lower()]
+        emp, problem = self._one(who)
+        if emp is None:
+            return problem
+        value = getattr(emp, attribute)
+        label = FIELD_LABELS[attribute]
+        if not listed(value):
+            return f"No {label} is listed for {emp.name} ({emp.id})."
+        return f"{emp.name}'s {label} is {value}."
+
+    def _rooms(self, where: Optional[str] = None) -> Optional[str]:
+        location = None
+        if where:
+            wanted = where.lower().strip()
+            locations = [name for name in self.rooms.by_location if name]
+            location = next((name for name in locations if name.lower() == wanted), None) or \
+                next((name for name in locations if name.lower().startswith(wanted)), None)
+            if location is None:
+                return f"There are no meeting rooms at \"{where}\". Locations: {', '.join(sorted(locations))}."
+        now = self.clock()
+        result = self.rooms.available(now, now + ROOM_WINDOW, location=location, now=now)
+        place = f" at {location}" if location else ""
+        if not result["rooms"]:
+            reply = f"No rooms{place} are free for the next 30 minutes."
+            if result["nextSlots"]:
+                slot = result["nextSlots"][0]
+                reply += f" {slot['name']} is next free from {slot['start_time'][11:]}."
+            return reply
+        lines = [f"• {room['name']} ({room['floor']}, seats {room['capacity']})" for room in result["rooms"]]
+        count = "1 room is" if len(lines) == 1 else f"{len(lines)} rooms are"
+        return f"{count} free{place} for the next 30 minutes:\n" + "\n".join(lines)
+
+    def _lookup(self, who: str) -> Optional[str]:
+        found = self.resolve(who)
+        if not found:
+            return None  # "who is the CEO of Google" is a question for the backend
+        emp, problem = self._one(who)
+        if emp is None:
+            return problem
+        details = [f"{emp.name} ({emp.id})", f"{emp.grade}, {emp.department}" if emp.grade else emp.department,
+                   f"Location: {emp.location}"]
+        if listed(emp.extension):
+            details.append(f"Extension: {emp.extension}")
+        if emp.email:
+            details.append(f"Email: {emp.email}")
+        return "\n".join(part for part in details if part)
+
+    def _greeting(self) -> str:
+        return ("Hi! Ask me about people and rooms, for example \"Who is 80024's manager?\", "
+                "\"Extension of Vikas\" or \"Rooms free at IFC now\".")
+
+
+def listed(value: str) -> bool:
+    # The workbook uses "0" for "no extension".
+    return bool(value) and value != "0"
+
+
+def describe(emp: Employee) -> str:
+    return f"{emp.name} ({emp.id}, {emp.department})" if emp.department else f"{emp.name} ({emp.id})"
+
+
+class ChatService:
+    def __init__(self, assistant: DirectoryAssistant, backend: ChatBackend, sessions: SessionStore):
+        self.assistant = assistant
+        self.backend = backend
+        self.sessions = sessions
+
+    def send(self, session_id: str, message: str) -> ChatMessage:
+        message = message.strip()
+        if not message:
+            raise ValueError("Message is empty")
+        if len(message) > MAX_MESSAGE_CHARS:
+            raise ValueError(f"Message is longer than {MAX_MESSAGE_CHARS} characters")
+        answered = self.assistant.answer(message)
+        if answered is not None:
+            (intent, reply), source = answered, "directory"
+        else:
+            intent, source = None, self.backend.name
+            reply = self.backend.reply(message, self.sessions.history(session_id))
+        record = ChatMessage(f"msg_{uuid.uuid4().hex[:12]}", session_id, message, reply, timestamp(), source, intent)
+        self.sessions.append(record)
+        return record
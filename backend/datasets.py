@@ -0,0 +1,102 @@
+"""Dataset versions and strong ETags for conditional GETs.
+
+Every dataset the API serves (employees, hierarchy, attendance, ...) carries
+a monotonically increasing version and the content hash it was built from.
+A response's ETag is derived from the versions of the datasets it reads plus
+the request variant (query string and ``Accept``), so a client that already
+holds the current representation gets a 304 before any body is built.
+"""
+
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from starlette.requests import Request
+
+
+class Dataset:
+    __slots__ = ("name", "version", "content_hash", "digest", "updated_at", "refresh")
+
+    def __init__(self, name: str, refresh: Optional[Callable[[], object]] = None):
+        self.name = name
+        self.version = 0
+        self.content_hash = ""
+        self.digest = ""
+        self.updated_at = 0.0
+        # Called before reading the version so hot-reloaded files are noticed.
+        self.refresh = refresh
+
+    def update(self, content_hash: str) -> bool:
+        """Record new content; bumps the version only if the hash changed."""
+        if content_hash == self.content_hash:
+            return False
+        self.content_hash = content_hash
+        # Hashes are often composite ("<sha>:<edits version>", joined source
+        # hashes) and what changes is at the end, so the tag digests all of it.
+        # Versions restart with the process; the digest is what keeps a tag
+        # from an earlier run from matching different content.
+        self.digest = hashlib.sha1(content_hash.encode()).hexdigest()[:16]
+        self.version += 1
+        self.updated_at = time.time()
+        return True
+
+    def tag(self) -> str:
+        return f"{self.name}.{self.version}.{self.digest}"
+
+    def to_dict(self) -> dict:
+        return {"version": self.version, "hash": self.content_hash, "updatedAt": self.updated_at}
+
+
+class DatasetRegistry:
+    def __init__(self):
+        self._datasets: Dict[str, Dataset] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, refresh: Optional[Callable[[], object]] = None) -> Dataset:
+        with self._lock:
+            dataset = self._datasets.get(name)
+            if dataset is None:
+                dataset = self._datasets[name] = Dataset(name, refresh)
+            elif refresh is not None:
+                dataset.refresh = refresh
+            return dataset
+
+    def __getitem__(self, name: str) -> Dataset:
+        return self._datasets[name]
+
+    def update(self, name: str, content_hash: str) -> bool:
+        with self._lock:
+            return self._datasets[name].update(content_hash)
+
+    def versions(self) -> Dict[str, dict]:
+        return {name: dataset.to_dict() for name, dataset in self._datasets.items()}
+
+    def etag(self, names: Iterable[str], variant: str = "") -> str:
+        parts = []
+        for name in names:
+            dataset = self._datasets[name]
+            if dataset.refresh is not None:
+                dataset.refresh()
+            parts.append(dataset.tag())
+        if variant:
+            parts.append(hashlib.sha1(variant.encode()).hexdigest()[:10])
+        return '"' + "-".join(parts) + '"'
+
+
+def request_variant(request: Request) -> str:
+    """What distinguishes representations of the same resource."""
+    return f"{request.url.path}?{request.url.query}|{request.headers.get('accept', '')}"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class NotModified(Exception):
+    def __init__(self, etag: str):
+        self.etag = etag
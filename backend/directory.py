@@ -0,0 +1,285 @@
+"""Server-side employee directory backed by employee_directory.xlsx.
+
+The workbook is parsed once into a compact, immutable ``Directory``
+generation.  ``DirectoryStore`` (see ``sources.WatchedFile``) swaps in a
+freshly parsed generation whenever the workbook's content changes, so request
+handlers always read a consistent snapshot without locking.
+"""
+
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import quote
+
+from snapshot import StringTable
+from sources import WatchedFile
+from taxonomy import TAXONOMY_FIELDS, Column, Taxonomy, dictionary_encode
+
+# Excel serial dates count days from 1899-12-30 (this absorbs Excel's
+# fictitious 1900-02-29), matching the conversion done in dataService.js.
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+# Initials avatar (images.initials_svg) for employees without an upload.
+PLACEHOLDER_IMAGE = "/api/placeholder/150/150"
+
+# Workbook header -> record field, as documented in contracts.md.
+COLUMN_MAP = {
+    "EMP ID": "id",
+    "EMP NAME": "name",
+    "DEPARTMENT": "department",
+    "GRADE": "grade",
+    "REPORTING MANAGER": "reporting_manager",
+    "LOCATION": "location",
+    "MOBILE": "mobile",
+    "EXTENSION NUMBER": "extension",
+    "EMAIL ID": "email",
+    "DATE OF JOINING": "date_of_joining",
+    "REPORTING ID": "reporting_id",
+}
+
+
+def id_sort_key(employee_id: str) -> Tuple[int, str]:
+    """Orders numeric ids numerically ("9" < "10") and everything else lexically."""
+    return (len(employee_id), employee_id)
+
+
+class Employee(NamedTuple):
+    id: str
+    name: str
+    department: str
+    grade: str
+    reporting_manager: str
+    reporting_id: Optional[str]
+    location: str
+    mobile: str
+    extension: str
+    email: str
+    date_of_joining: str
+
+    def to_dict(self, profile_image: Optional[str] = None) -> dict:
+        if profile_image is None:
+            profile_image = f"{PLACEHOLDER_IMAGE}?name={quote(self.name)}"
+        return {
+            "id": self.id,
+            "name": self.name,
+            "department": self.department,
+            "grade": self.grade,
+            "reportingManager": self.reporting_manager,
+            "reportingId": self.reporting_id,
+            "location": self.location,
+            "mobile": self.mobile,
+            "extension": self.extension,
+            "email": self.email,
+            "dateOfJoining": self.date_of_joining,
+            "profileImage": profile_image,
+        }
+
+
+def _clean_str(value) -> str:
+    """Stringify a cell, dropping the ``.0`` openpyxl adds to integral floats."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def clean_id(value) -> Optional[str]:
+    """Normalize an employee id cell; ``*`` and blanks mean "no manager"."""
+    text = _clean_str(value)
+    if text.endswith(".0") and text[:-2].isdigit():
+        text = text[:-2]
+    if not text or text == "*":
+        return None
+    return text
+
+
+def _parse_date(value) -> str:
+    if value is None or value == "":
+        return ""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (int, float)):
+        return (EXCEL_EPOCH + timedelta(days=float(value))).date().isoformat()
+    text = str(value).strip()
+    for fmt in ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d-%m-%Y", "%d/%m/%Y", "%m/%d/%Y"):
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return text.split(" ")[0]
+
+
+def employee_from_row(row: Dict[str, object]) -> Optional[Employee]:
+    emp_id = clean_id(row.get("id"))
+    if emp_id is None:
+        return None
+    manager = _clean_str(row.get("reporting_manager"))
+    return Employee(
+        id=emp_id,
+        name=_clean_str(row.get("name")),
+        # Facet values repeat across thousands of rows; share one copy each.
+        department=sys.intern(_clean_str(row.get("department"))),
+        grade=sys.intern(_clean_str(row.get("grade"))),
+        reporting_manager=manager or "*",
+        reporting_id=clean_id(row.get("reporting_id")),
+        location=sys.intern(_clean_str(row.get("location"))),
+        mobile=_clean_str(row.get("mobile")),
+        extension=_clean_str(row.get("extension")) or "0",
+        email=_clean_str(row.get("email")),
+        date_of_joining=_parse_date(row.get("date_of_joining")),
+    )
+
+
+def parse_workbook(path: str) -> List[Employee]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[workbook.sheetnames[0]]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return []
+        fields = [COLUMN_MAP.get(_clean_str(h).upper()) for h in header]
+        employees = []
+        for values in rows:
+            row = {field: value for field, value in zip(fields, values) if field}
+            employee = employee_from_row(row)
+            if employee is not None:
+                employees.append(employee)
+        return employees
+    finally:
+        workbook.close()
+
+
+class Directory:
+    """One immutable, fully parsed generation of the employee directory."""
+
+    __slots__ = ("employees", "by_id", "positions", "version", "source_hash", "loaded_at",
+                 "load_seconds", "loaded_from", "derived", "columns", "unmapped", "raw_columns")
+
+    def __init__(self, employees: List[Employee], version: int, source_hash: str,
+                 load_seconds: float = 0.0, columns: Optional[Dict[str, Column]] = None,
+                 unmapped: Optional[Dict[str, Counter]] = None, raw_columns: Optional[Dict[str, Column]] = None):
+        self.employees: Tuple[Employee, ...] = tuple(employees)
+        self.by_id: Dict[str, Employee] = {emp.id: emp for emp in self.employees}
+        self.positions: Dict[str, int] = {emp.id: i for i, emp in enumerate(self.employees)}
+        self.version = version
+        self.source_hash = source_hash
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+        self.loaded_from = "source"
+        # Per-generation structures built by store listeners (facets, graphs...).
+        self.derived: Dict[str, object] = {}
+        # Dictionary-encoded taxonomy fields, and raw values the taxonomy did not map.
+        self.columns: Dict[str, Column] = columns or {}
+        self.unmapped: Dict[str, Counter] = unmapped or {}
+        # The same fields as written in the workbook; snapshots store these.
+        self.raw_columns: Dict[str, Column] = raw_columns or {}
+
+    def __len__(self) -> int:
+        return len(self.employees)
+
+    def get(self, employee_id: str) -> Optional[Employee]:
+        return self.by_id.get(employee_id)
+
+    def changed_ids(self, previous: "Directory") -> Set[str]:
+        """Ids added, removed or edited since ``previous``."""
+        old, new = previous.by_id, self.by_id
+        changed = {emp_id for emp_id, emp in new.items() if old.get(emp_id) != emp}
+        changed.update(emp_id for emp_id in old if emp_id not in new)
+        return changed
+
+    def in_order(self, ids: Set[str]) -> List[Employee]:
+        """Employees for ``ids`` in workbook order, skipping unknown ids."""
+        positions = self.positions
+        ordered = sorted(positions[emp_id] for emp_id in ids if emp_id in positions)
+        return [self.employees[i] for i in ordered]
+
+    def search(self, search: Optional[str] = None, department: Optional[str] = None,
+               location: Optional[str] = None, index=None) -> List[Employee]:
+        """Filter with the same semantics as ``dataService.getEmployees()``.
+
+        ``index`` is an optional ``search_index.PrefixIndex``; without it the
+        search term is matched by a linear scan.
+        """
+        results = self.employees
+        if search and index is not None:
+            results = self.in_order(index.lookup(search))
+        elif search:
+            term = search.lower()
+            results = [
+                emp for emp in results
+                if emp.name.lower().startswith(term)
+                or emp.id.lower().startswith(term)
+                or emp.department.lower().startswith(term)
+                or emp.location.lower().startswith(term)
+                or emp.grade.lower().startswith(term)
+                or emp.mobile.startswith(term)
+            ]
+        if department and department != "All Departments":
+            results = [emp for emp in results if emp.department == department]
+        if location and location != "All Locations":
+            results = [emp for emp in results if emp.location == location]
+        return list(results)
+
+
+class DirectoryStore(WatchedFile):
+    """Keeps the current ``Directory`` in sync with the workbook on disk."""
+
+    description = "employee workbook"
+    snapshot_kind = "employees"
+
+    def __init__(self, path: str, check_interval: float = 1.0, snapshot_dir: Optional[str] = None,
+                 taxonomy: Optional[Taxonomy] = None):
+        self.taxonomy = taxonomy or Taxonomy()
+        super().__init__(path, check_interval, snapshot_dir)
+
+    def empty(self) -> Directory:
+        return Directory([], version=0, source_hash="")
+
+    def load(self, source_hash: str, version: int) -> Directory:
+        return self.canonicalize(parse_workbook(self.path), version, source_hash)
+
+    def canonicalize(self, employees: List[Employee], version: int, source_hash: str) -> Directory:
+        """Map department and location to canonical values, keeping their codes."""
+        raw_columns, columns, unmapped = {}, {}, {}
+        for field in TAXONOMY_FIELDS:
+            raw_columns[field] = dictionary_encode(getattr(emp, field) for emp in employees)
+            columns[field], unmapped[field] = self.taxonomy.encode_column(field, raw_columns[field])
+        departments, locations = columns["department"], columns["location"]
+        canonical = []
+        for emp, department, location in zip(employees, departments.codes, locations.codes):
+            department, location = departments.values[department], locations.values[location]
+            if emp.department is not department or emp.location is not location:
+                emp = emp._replace(department=department, location=location)
+            canonical.append(emp)
+        return Directory(canonical, version=version, source_hash=source_hash, columns=columns, unmapped=unmapped,
+                         raw_columns=raw_columns)
+
+    def to_snapshot(self, directory: Directory) -> dict:
+        # Taxonomy fields are stored as written, so the snapshot does not
+        # depend on the alias table it was built under.
+        strings = StringTable()
+        sections = {}
+        for field in Employee._fields:
+            raw = directory.raw_columns.get(field)
+            values = ((raw.values[code] for code in raw.codes) if raw is not None
+                      else (getattr(emp, field) for emp in directory.employees))
+            sections[f"employees.{field}"] = strings.column(values)
+        sections.update(strings.sections("strings"))
+        return sections
+
+    def from_snapshot(self, snapshot, version: int) -> Directory:
+        # Index -1 (snapshot.NULL) lands on the trailing None.  Equal strings
+        # come back as one shared object, so facet values stay interned.
+        strings = snapshot.strings("strings") + [None]
+        columns = [snapshot.array(f"employees.{field}").tolist() for field in Employee._fields]
+        employees = [Employee._make([strings[i] for i in row]) for row in zip(*columns)]
+        # Stored as written, so alias table edits take effect without a re-parse.
+        return self.canonicalize(employees, version, snapshot.source_hash)
@@ -0,0 +1,168 @@
+"""Dictionary-encoded facet columns with bitmap filtering.
+
+Each facet (department, location, grade) is stored as a table of distinct
+values plus one bitmap per value, where bit ``i`` is set when the employee at
+workbook position ``i`` has that value.  Bitmaps are plain Python ints, so a
+multi-facet filter is a handful of ``&`` operations and a facet count is a
+popcount, independent of how many records the filter touches.
+
+A ``FacetIndex`` is tied to one ``Directory`` generation (positions change on
+reload); ``attach`` builds it as a ``DirectoryStore`` listener.
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from directory import Directory, Employee, id_sort_key
+from pagination import decode_cursor, encode_cursor
+from taxonomy import Column
+
+FACET_FIELDS = ("department", "location", "grade")
+
+# "All Departments" / "All Locations" are the dropdown sentinels used by the UI.
+ALL_SENTINELS = {"All Departments", "All Locations", "All Grades"}
+
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def _popcount(bitmap: int) -> int:
+    return bin(bitmap).count("1")
+
+
+popcount = getattr(int, "bit_count", _popcount)
+
+
+def iter_bits(bitmap: int) -> Iterator[int]:
+    """Positions of the set bits in ascending order."""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    for offset, byte in enumerate(data):
+        if byte:
+            base = offset * 8
+            for bit in _BYTE_BITS[byte]:
+                yield base + bit
+
+
+class FacetColumn:
+    __slots__ = ("values", "codes", "bitmaps", "lookup")
+
+    def __init__(self, raw: Iterable[str] = (), encoded: Optional[Column] = None):
+        """Encode ``raw`` values, or adopt a column the taxonomy already encoded."""
+        if encoded is None:
+            lookup: Dict[str, int] = {}
+            values: List[str] = []
+            codes = array("I")
+            for value in raw:
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(values)
+                    values.append(value)
+                codes.append(code)
+        else:
+            values, codes = encoded
+        self.values: List[str] = values
+        self.codes = codes
+        self.lookup: Dict[str, int] = {value: code for code, value in enumerate(values)}
+        width = (len(codes) + 7) // 8
+        bits = [bytearray(width) for _ in values]
+        for position, code in enumerate(codes):
+            bits[code][position >> 3] |= 1 << (position & 7)
+        self.bitmaps: List[int] = [int.from_bytes(b, "little") for b in bits]
+
+    def bitmap(self, value: str) -> int:
+        code = self.lookup.get(value)
+        return 0 if code is None else self.bitmaps[code]
+
+    def counts(self, bitmap: int, total: int) -> Dict[str, int]:
+        if total == 0:
+            return {}
+        if total * 32 < len(self.codes):
+            # Sparse result: tallying the few selected codes beats
+            # intersecting every value bitmap.
+            tally: Dict[int, int] = {}
+            for position in iter_bits(bitmap):
+                code = self.codes[position]
+                tally[code] = tally.get(code, 0) + 1
+            return {self.values[code]: n for code, n in tally.items() if self.values[code]}
+        counts = {}
+        for code, value_bitmap in enumerate(self.bitmaps):
+            n = popcount(value_bitmap & bitmap)
+            if n and self.values[code]:
+                counts[self.values[code]] = n
+        return counts
+
+
+class FacetIndex:
+    def __init__(self, directory: Directory):
+        self.directory = directory
+        self.size = len(directory)
+        self.all = (1 << self.size) - 1
+        self.columns: Dict[str, FacetColumn] = {
+            field: FacetColumn((getattr(emp, field) for emp in directory.employees),
+                               encoded=directory.columns.get(field))
+            for field in FACET_FIELDS
+        }
+        # Keyset pagination walks employees in id order.
+        self.id_order = sorted(range(self.size), key=lambda p: id_sort_key(directory.employees[p].id))
+        self.id_keys = [id_sort_key(directory.employees[p].id) for p in self.id_order]
+
+    @classmethod
+    def of(cls, directory: Directory) -> "FacetIndex":
+        index = directory.derived.get("facets")
+        if index is None:
+            index = directory.derived["facets"] = cls(directory)
+        return index
+
+    def bitmap_of_ids(self, ids: Iterable[str]) -> int:
+        positions = self.directory.positions
+        bits = bytearray((self.size + 7) // 8)
+        for emp_id in ids:
+            position = positions.get(emp_id)
+            if position is not None:
+                bits[position >> 3] |= 1 << (position & 7)
+        return int.from_bytes(bits, "little")
+
+    def filter(self, base: Optional[int] = None, **facets: Optional[str]) -> int:
+        """Intersect ``base`` (default: everyone) with each requested facet value."""
+        bitmap = self.all if base is None else base
+        for field, value in facets.items():
+            if value and value not in ALL_SENTINELS:
+                bitmap &= self.columns[field].bitmap(value)
+        return bitmap
+
+    def employees(self, bitmap: int) -> List[Employee]:
+        return list(self.iter_employees(bitmap))
+
+    def iter_employees(self, bitmap: int) -> Iterator[Employee]:
+        employees = self.directory.employees
+        for position in iter_bits(bitmap):
+            yield employees[position]
+
+    def page(self, bitmap: int, after: Optional[str], limit: int) -> Tuple[List[Employee], Optional[str]]:
+        """Up to ``limit`` selected employees with ids after ``after``, in id order.
+
+        ``after`` is a cursor returned by a previous page.  Returns the page
+        and the cursor to resume from, or None on the last page.
+        """
+        employees = self.directory.employees
+        bits = bitmap.to_bytes((self.size + 7) // 8, "little")
+        start = bisect_right(self.id_keys, id_sort_key(decode_cursor(after, 1)[0])) if after else 0
+        page: List[Employee] = []
+        for i in range(start, self.size):
+            position = self.id_order[i]
+            if bits[position >> 3] >> (position & 7) & 1:
+                if len(page) == limit:
+                    return page, encode_cursor(page[-1].id)
+                page.append(employees[position])
+        return page, None
+
+    def counts(self, bitmap: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """Per-facet value counts for the employees selected by ``bitmap``."""
+        bitmap = self.all if bitmap is None else bitmap
+        total = popcount(bitmap)
+        return {field: column.counts(bitmap, total) for field, column in self.columns.items()}
+
+
+def attach(directory: Directory) -> None:
+    """``DirectoryStore`` listener: build the facet index before publishing."""
+    FacetIndex.of(directory)
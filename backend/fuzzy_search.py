@@ -0,0 +1,213 @@
+"""Typo-tolerant name search.
+
+``PrefixIndex`` only finds names that start with exactly what was typed, so
+"Jyotsana" never finds "Jyotsna" and "Malhothra" never finds "Malhotra".
+``TrigramIndex`` indexes the distinct name *tokens* (far fewer than
+employees) by their character trigrams, with the token padded as ``$tok$``.
+One edit changes at most three of a token's trigrams, so any token within
+edit distance ``k`` of the query shares at least ``len(trigrams) - 3k`` of
+them.  Counting shared trigrams over the posting lists therefore yields a
+small candidate set, and only those candidates get an exact, banded
+Levenshtein check.
+
+Every query token must match some token of an employee's name, either
+within its edit budget or as an exact prefix (so typing ahead still works);
+employees are ranked by the total distance.  ``sync()`` diffs against the
+previous directory like ``PrefixIndex.sync`` and only touches changed names.
+"""
+
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from directory import Directory, Employee
+
+WORD = re.compile(r"[^\W\d_]+")
+# Score of a query token that is a strict prefix of a name token: worse than
+# an exact token, better than any typo.
+PREFIX_PENALTY = 0.5
+
+
+def name_tokens(name: str) -> Set[str]:
+    return set(WORD.findall(name.lower()))
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(token: str) -> int:
+    """Edit budget for a query token: none below 4 letters, two from 8.
+
+    The thresholds keep ``len(trigrams) - 3k`` at least 1, so the trigram
+    filter can never drop a token that is within the budget.
+    """
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+
+def bounded_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """Levenshtein distance of ``a`` and ``b`` if it is at most ``limit``, else None."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    over = limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        # Cells off the diagonal band |i - j| <= limit can never come back under it.
+        current = [i] + [over] * len(b)
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != b[j - 1]))
+        if min(current) > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+class TrigramIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records: Dict[str, Employee] = {}
+        self._tokens_of: Dict[str, Tuple[str, ...]] = {}  # employee id -> name tokens
+        self._rank: Dict[str, Tuple[int, str, str]] = {}  # tie-break: shorter names first
+        self._token_ids: Dict[str, Set[str]] = {}       # name token -> employee ids
+        self._grams: Dict[str, Set[str]] = {}           # trigram -> name tokens
+        self._sorted: List[str] = []                    # tokens, for prefix matches
+        self._sorted_stale = False
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def token_count(self) -> int:
+        return len(self._token_ids)
+
+    def sync(self, directory: Directory) -> Tuple[int, int]:
+        """Bring the index in line with ``directory``; returns (added, removed)."""
+        incoming = directory.by_id
+        with self._lock:
+            stale = [emp for emp_id, emp in self._records.items() if incoming.get(emp_id) != emp]
+            fresh = [emp for emp_id, emp in incoming.items() if self._records.get(emp_id) != emp]
+            for emp in stale:
+                self._remove(emp)
+            for emp in fresh:
+                self._add(emp)
+            self.version = directory.version
+        return len(fresh), len(stale)
+
+    def _add(self, emp: Employee) -> None:
+        self._records[emp.id] = emp
+        tokens = self._tokens_of[emp.id] = tuple(name_tokens(emp.name))
+        self._rank[emp.id] = (len(emp.name), emp.name, emp.id)
+        for token in tokens:
+            ids = self._token_ids.get(token)
+            if ids is None:
+                ids = self._token_ids[token] = set()
+                for gram in trigrams(token):
+                    self._grams.setdefault(gram, set()).add(token)
+                self._sorted_stale = True
+            ids.add(emp.id)
+
+    def _remove(self, emp: Employee) -> None:
+        del self._records[emp.id]
+        del self._rank[emp.id]
+        for token in self._tokens_of.pop(emp.id):
+            ids = self._token_ids[token]
+            ids.discard(emp.id)
+            if not ids:
+                del self._token_ids[token]
+                for gram in trigrams(token):
+                    tokens = self._grams[gram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._grams[gram]
+                self._sorted_stale = True
+
+    def _matches(self, query: str) -> Dict[str, float]:
+        """Name tokens close to ``query`` -> score (0 for an exact match)."""
+        found: Dict[str, float] = {}
+        limit = max_edits(query)
+        if limit:
+            grams = trigrams(query)
+            needed = len(grams) - 3 * limit
+            shared = Counter()
+            for gram in grams:
+                shared.update(self._grams.get(gram, ()))
+            for token, count in shared.items():
+                if count >= needed:
+                    distance = bounded_distance(query, token, limit)
+                    if distance is not None:
+                        found[token] = distance
+        elif query in self._token_ids:
+            found[query] = 0
+        if self._sorted_stale:
+            self._sorted = sorted(self._token_ids)
+            self._sorted_stale = False
+        i = bisect_left(self._sorted, query)
+        while i < len(self._sorted) and self._sorted[i].startswith(query):
+            token = self._sorted[i]
+            if token != query:
+                found[token] = min(found.get(token, PREFIX_PENALTY), PREFIX_PENALTY)
+            i += 1
+        return found
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """``(employee id, score)`` best first; every query word must match a name word."""
+        words = list(dict.fromkeys(WORD.findall(query.lower())))
+        if not words:
+            return []
+        with self._lock:
+            matches = [self._matches(word) for word in words]
+            if not all(matches):
+                return []
+            # The word matching the fewest employees drives; the others only
+            # filter and score its candidates.
+            matches.sort(key=lambda found: sum(len(self._token_ids[token]) for token in found))
+            driver, others = matches[0], matches[1:]
+            groups: Dict[float, Set[str]] = {}
+            for token, score in driver.items():
+                groups.setdefault(score, set()).update(self._token_ids[token])
+            rank = self._rank.__getitem__
+            results: List[Tuple[str, float]] = []
+            seen: Set[str] = set()
+            if not others:
+                # Groups are disjoint score bands, so the first ``limit`` hits
+                # never need anything from a later band.
+                for score in sorted(groups):
+                    ids = groups[score] - seen
+                    seen |= ids
+                    wanted = None if limit is None else limit - len(results)
+                    best = sorted(ids, key=rank) if wanted is None else heapq.nsmallest(wanted, ids, key=rank)
+                    results.extend((emp_id, score) for emp_id in best)
+                    if limit is not None and len(results) >= limit:
+                        break
+                return results
+            # Set intersections (in C) leave only employees matching every word.
+            allowed = []
+            for found in others:
+                union: Set[str] = set()
+                for token in found:
+                    union.update(self._token_ids[token])
+                allowed.append(union)
+            totals: Dict[str, float] = {}
+            for score in sorted(groups):
+                ids = groups[score] - seen
+                seen |= ids
+                for other in allowed:
+                    ids &= other
+                for emp_id in ids:
+                    total = score
+                    for found in others:
+                        total += min(found[token] for token in self._tokens_of[emp_id] if token in found)
+                    totals[emp_id] = total
+            def key(item: Tuple[str, float]):
+                return item[1], rank(item[0])
+
+            if limit is None:
+                return sorted(totals.items(), key=key)
+            return heapq.nsmallest(limit, totals.items(), key=key)
@@ -0,0 +1,226 @@
+"""Reporting-hierarchy graph built once per directory generation.
+
+Managers are resolved from ``reportingId`` (``"80006"``, ``"80006.0"``) and,
+when that is blank, from the ``"Ashish Jerath(80006)"`` form of
+``reportingManager``.  A pre-order Euler tour over the resulting forest gives
+every employee an interval ``[tin, tin + size)`` covering exactly their
+subtree, which turns "is X in Y's org" and "headcount under Y" into O(1)
+lookups.  Cycles and managers missing from the directory are detected and
+reported while building instead of surfacing at render time.
+
+Manual hierarchy edits are passed in as ``overrides`` (employee id -> manager
+id, or None to detach) and take precedence over the workbook.  The graph is
+cached on the directory generation per overrides version.
+"""
+
+import re
+import time
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+from directory import Directory, Employee, clean_id
+from pagination import decode_cursor, encode_cursor
+
+_MANAGER_ID = re.compile(r"\((\d+)(?:\.0)?\)\s*$")
+
+
+def manager_id(emp: Employee) -> Optional[str]:
+    reporting_id = clean_id(emp.reporting_id)
+    if reporting_id:
+        return reporting_id
+    match = _MANAGER_ID.search(emp.reporting_manager or "")
+    return match.group(1) if match else None
+
+
+class OrgGraph:
+    """Parent/children adjacency plus Euler-tour labels, indexed by position."""
+
+    def __init__(self, directory: Directory, overrides: Optional[Dict[str, Optional[str]]] = None):
+        started = time.perf_counter()
+        self.directory = directory
+        overrides = overrides or {}
+        n = len(directory)
+        positions = directory.positions
+
+        self.parent = array("i", [-1]) * n
+        self.children: List[List[int]] = [[] for _ in range(n)]
+        self.orphans: List[Dict[str, str]] = []
+        self.cycles: List[List[str]] = []
+
+        for position, emp in enumerate(directory.employees):
+            boss = overrides[emp.id] if emp.id in overrides else manager_id(emp)
+            if boss is None:
+                continue
+            boss_position = positions.get(boss)
+            if boss_position is None:
+                self.orphans.append({"employeeId": emp.id, "reportingId": boss})
+            else:
+                self.parent[position] = boss_position
+
+        self._break_cycles()
+        for position in range(n):
+            if self.parent[position] >= 0:
+                self.children[self.parent[position]].append(position)
+        self.roots = [position for position in range(n) if self.parent[position] < 0]
+        self._euler_tour()
+        self.build_seconds = time.perf_counter() - started
+
+    def _break_cycles(self) -> None:
+        # Colour walk along parent pointers: 0 = unvisited, 1 = on the current
+        # path, 2 = known to reach a root.  Meeting a 1 again closes a cycle,
+        # which is cut at its smallest employee id so the build stays stable.
+        n = len(self.parent)
+        state = bytearray(n)
+        employees = self.directory.employees
+        for start in range(n):
+            path = []
+            node = start
+            while node >= 0 and state[node] == 0:
+                state[node] = 1
+                path.append(node)
+                node = self.parent[node]
+            if node >= 0 and state[node] == 1:
+                cycle = path[path.index(node):]
+                self.cycles.append([employees[p].id for p in cycle])
+                self.parent[min(cycle, key=lambda p: employees[p].id)] = -1
+            for p in path:
+                state[p] = 2
+
+    def _euler_tour(self) -> None:
+        n = len(self.parent)
+        self.tin = array("i", [0]) * n
+        self.size = array("i", [1]) * n
+        self.depth = array("i", [0]) * n
+        self.order = array("i")
+        clock = 0
+        for root in self.roots:
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                self.tin[node] = clock
+                self.order.append(node)
+                clock += 1
+                children = self.children[node]
+                for child in reversed(children):
+                    self.depth[child] = self.depth[node] + 1
+                    stack.append(child)
+        # Subtree sizes: children always come after their parent in pre-order.
+        for node in reversed(self.order):
+            parent = self.parent[node]
+            if parent >= 0:
+                self.size[parent] += self.size[node]
+
+    @classmethod
+    def of(cls, directory: Directory, overrides: Optional[Dict[str, Optional[str]]] = None,
+           overrides_version: int = 0) -> "OrgGraph":
+        if not overrides:
+            graph = directory.derived.get("org")
+            if graph is None:
+                graph = directory.derived["org"] = cls(directory)
+            return graph
+        # Only the graph for the latest edits is kept: each is O(n), and an
+        # older edit version is never asked for again.
+        cached = directory.derived.get("org.edited")
+        if cached is not None and cached[0] == overrides_version:
+            return cached[1]
+        graph = cls(directory, overrides)
+        latest = directory.derived.get("org.edited")
+        if latest is None or latest[0] < overrides_version:  # a slower, older build never wins
+            directory.derived["org.edited"] = (overrides_version, graph)
+        return graph
+
+    def position(self, employee_id: str) -> Optional[int]:
+        return self.directory.positions.get(employee_id)
+
+    def contains(self, manager: int, employee: int) -> bool:
+        """True when ``employee`` is ``manager`` or anywhere below them."""
+        start = self.tin[manager]
+        return start <= self.tin[employee] < start + self.size[manager]
+
+    def headcount(self, manager: int) -> int:
+        return self.size[manager] - 1
+
+    def chain(self, employee: int) -> List[int]:
+        """Managers from the direct manager up to the top of the tree."""
+        chain = []
+        node = self.parent[employee]
+        while node >= 0:
+            chain.append(node)
+            node = self.parent[node]
+        return chain
+
+    def node(self, position: int) -> dict:
+        emp = self.directory.employees[position]
+        return {
+            "id": emp.id,
+            "name": emp.name,
+            "grade": emp.grade,
+            "department": emp.department,
+            "location": emp.location,
+            "childCount": len(self.children[position]),
+            "subtreeSize": self.size[position],
+        }
+
+    def subtree(self, root: int, depth: int, limit: int, cursor: Optional[str] = None) -> dict:
+        """``root`` with at most ``depth`` levels below it.
+
+        Every child list is cut to ``limit`` entries; a truncated list carries
+        a ``nextCursor`` that continues it via ``subtree(that_node, cursor=...)``.
+        ``cursor`` only applies to the children of ``root`` itself.
+        """
+        start = self._cursor_offset(root, cursor) if cursor else 0
+        tree = self.node(root)
+        # Iterative breadth-first expansion so very deep requests cannot hit
+        # the recursion limit.
+        frontier = [(root, tree, start)]
+        for _ in range(depth):
+            next_frontier = []
+            for position, payload, offset in frontier:
+                children = self.children[position]
+                page = children[offset:offset + limit]
+                payload["children"] = []
+                for child in page:
+                    child_payload = self.node(child)
+                    payload["children"].append(child_payload)
+                    next_frontier.append((child, child_payload, 0))
+                if offset + limit < len(children):
+                    payload["nextCursor"] = encode_cursor(
+                        self.directory.employees[position].id,
+                        self.directory.employees[page[-1]].id,
+                    )
+            frontier = next_frontier
+        return tree
+
+    def _cursor_offset(self, root: int, cursor: str) -> int:
+        parent_id, last_id = decode_cursor(cursor, 2)
+        employees = self.directory.employees
+        last = self.directory.positions.get(last_id)
+        if parent_id != employees[root].id or last is None or self.parent[last] != root:
+            raise ValueError("Cursor does not belong to this node's children")
+        # Children are laid out in pre-order, so their tin values ascend.
+        tins = [self.tin[child] for child in self.children[root]]
+        return bisect_right(tins, self.tin[last])
+
+    def relationships(self) -> List[Dict[str, str]]:
+        employees = self.directory.employees
+        return [
+            {"employeeId": employees[p].id, "reportsTo": employees[self.parent[p]].id}
+            for p in range(len(employees)) if self.parent[p] >= 0
+        ]
+
+    def report(self) -> dict:
+        employees = self.directory.employees
+        return {
+            "employees": len(employees),
+            "roots": [employees[p].id for p in self.roots],
+            "maxDepth": max(self.depth, default=0),
+            "cycles": self.cycles,
+            "orphans": self.orphans,
+            "buildSeconds": round(self.build_seconds, 6),
+        }
+
+
+def attach(directory: Directory) -> None:
+    """``DirectoryStore`` listener: build the org graph before publishing."""
+    OrgGraph.of(directory)
@@ -0,0 +1,134 @@
+"""Content-addressed profile images and initials placeholders.
+
+An upload is hashed (SHA-256 of the original bytes) and stored once no
+matter how many employees or re-uploads use it; the same photo uploaded
+twice costs nothing after the hash lookup.  Each new image is decoded once
+and rendered to square WebP variants (48, 150 and 400 px) on a small thread
+pool -- Pillow releases the GIL while resampling -- so the directory grid
+downloads a few kilobytes per card instead of the original photo.
+
+Variant URLs contain the content hash, so they never change meaning and are
+served as immutable.  ``initials_svg`` renders the placeholder avatars; the
+output only depends on the URL, so it is cached and immutable as well.
+"""
+
+import hashlib
+import html
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from PIL import Image, ImageOps
+
+VARIANT_SIZES = (48, 150, 400)
+VARIANT_FORMAT = "WEBP"
+VARIANT_MEDIA_TYPE = "image/webp"
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+# Decompression-bomb guard: refuse anything above ~40 megapixels.
+MAX_PIXELS = 40_000_000
+
+AVATAR_COLOURS = ("#1d4ed8", "#0f766e", "#7c3aed", "#b45309", "#be123c", "#15803d", "#0369a1", "#4338ca")
+
+
+class ImageStore:
+    """``{directory}/{hash[:2]}/{hash}-{size}.webp`` for every stored image."""
+
+    def __init__(self, directory: str, workers: int = 2):
+        self.directory = directory
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-variants")
+        # digest -> [lock, holders]; dropped when the last holder is done.
+        self._locks: Dict[str, List] = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, digest: str, size: int) -> str:
+        return os.path.join(self.directory, digest[:2], f"{digest}-{size}.webp")
+
+    def exists(self, digest: str) -> bool:
+        return all(os.path.exists(self.path(digest, size)) for size in VARIANT_SIZES)
+
+    def put(self, data: bytes) -> str:
+        """Store ``data`` (any format Pillow reads); returns its content hash.
+
+        Raises ``ValueError`` for oversized or undecodable uploads.
+        """
+        if len(data) > MAX_UPLOAD_BYTES:
+            raise ValueError(f"Image is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+        digest = hashlib.sha256(data).hexdigest()
+        with self._locked(digest):
+            if self.exists(digest):
+                return digest
+            try:
+                image = Image.open(io.BytesIO(data))
+                if image.width * image.height > MAX_PIXELS:
+                    raise ValueError("Image dimensions are too large")
+                image = ImageOps.exif_transpose(image).convert("RGB")
+            except (OSError, Image.DecompressionBombError) as exc:
+                raise ValueError(f"Unreadable image: {exc}")
+            os.makedirs(os.path.dirname(self.path(digest, VARIANT_SIZES[0])), exist_ok=True)
+            jobs = [self._pool.submit(self._render, image, digest, size) for size in VARIANT_SIZES]
+            for job in jobs:
+                job.result()
+        return digest
+
+    def variant(self, digest: str, size: int) -> Optional[str]:
+        """Path of the smallest stored variant at least ``size`` px (else the largest)."""
+        if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+            return None
+        chosen = next((s for s in VARIANT_SIZES if s >= size), VARIANT_SIZES[-1])
+        path = self.path(digest, chosen)
+        return path if os.path.exists(path) else None
+
+    def _render(self, image: Image.Image, digest: str, size: int) -> None:
+        thumb = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        target = self.path(digest, size)
+        tmp = f"{target}.{threading.get_ident()}.tmp"
+        thumb.save(tmp, VARIANT_FORMAT, quality=80, method=4)
+        os.replace(tmp, target)
+
+    @contextmanager
+    def _locked(self, digest: str):
+        with self._locks_guard:
+            entry = self._locks.setdefault(digest, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[digest]
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+def initials(name: str) -> str:
+    parts = [part for part in name.replace(".", " ").split() if part[:1].isalpha()]
+    if not parts:
+        return ""
+    if len(parts) == 1:
+        return parts[0][:2].upper()
+    return (parts[0][0] + parts[-1][0]).upper()
+
+
+@lru_cache(maxsize=4096)
+def initials_svg(width: int, height: int, name: str = "") -> bytes:
+    """A flat-colour avatar with the name's initials (a plain silhouette without one)."""
+    text = html.escape(initials(name))
+    colour = AVATAR_COLOURS[int(hashlib.md5(name.encode()).hexdigest(), 16) % len(AVATAR_COLOURS)] if text else "#cbd5e1"
+    font = round(min(width, height) * 0.4)
+    if text:
+        body = (f'<text x="50%" y="50%" dy=".35em" text-anchor="middle" fill="#fff" '
+                f'font-family="Helvetica,Arial,sans-serif" font-size="{font}" font-weight="600">{text}</text>')
+    else:
+        r = min(width, height)
+        body = (f'<circle cx="{width / 2}" cy="{height * 0.4}" r="{r * 0.18}" fill="#f8fafc"/>'
+                f'<ellipse cx="{width / 2}" cy="{height * 0.95}" rx="{r * 0.32}" ry="{r * 0.28}" fill="#f8fafc"/>')
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}"><rect width="100%" height="100%" fill="{colour}"/>{body}</svg>').encode()
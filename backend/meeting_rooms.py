@@ -0,0 +1,376 @@
+"""Server-side meeting room bookings.
+
+Each room keeps its bookings as a sorted interval list: parallel ``starts`` /
+``ends`` arrays ordered by start time.  Bookings in one room never overlap,
+so the ends are sorted too, and the only candidate for a conflict with
+``[start, end)`` is the first booking whose end is after ``start`` -- one
+bisect.  Check-and-insert happens under the room's lock, which makes
+concurrent requests for the same slot serialise: exactly one wins and the
+rest get a ``BookingConflict`` naming the booking they collided with.
+
+Availability searches walk per-location room lists that are kept sorted by
+capacity, so ``min_capacity`` is a bisect and the first free rooms found are
+the best fits.  Past bookings are dropped lazily: a heap of booking end times
+says which rooms have anything to expire, and because a room's ends are
+sorted the expired bookings are always a prefix of its lists.
+
+Bookings are persisted, when a record-store collection is given, by
+writing each booking (and deleting each cancellation) while the room's lock
+is still held, so the disk never disagrees with a conflict check.  At
+startup the upcoming bookings are restored and finished ones deleted; the
+version continues from the collection's seq, so it never repeats across
+restarts.  Listeners are told about changes strictly in version order.
+
+Times are half-open, so a 9:00-10:00 booking and a 10:00-11:00 booking do
+not conflict.  ISO strings without an offset are read as server local time,
+matching ``new Date(...)`` in the browser.
+"""
+
+import heapq
+import threading
+import time
+import uuid
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+# Same catalogue as dataService.generateMeetingRooms().
+DEFAULT_ROOMS = [
+    ("ifc-11-001", "IFC Conference Room 11A", "IFC", "11th Floor", 10, "Projector, Whiteboard, Video Conference"),
+    ("ifc-12-001", "IFC Conference Room 12B", "IFC", "12th Floor", 6, "Projector, Whiteboard"),
+    ("ifc-14-001", "OVAL MEETING ROOM", "IFC", "14th Floor", 10, "Projector, Video Conference, Whiteboard"),
+    ("ifc-14-002", "PETRONAS MEETING ROOM", "IFC", "14th Floor", 5, "Projector, Whiteboard"),
+    ("ifc-14-003", "GLOBAL CENTER MEETING ROOM", "IFC", "14th Floor", 5, "Projector, Whiteboard"),
+    ("ifc-14-004", "LOUVRE MEETING ROOM", "IFC", "14th Floor", 5, "Projector, Whiteboard"),
+    ("ifc-14-005", "GOLDEN GATE MEETING ROOM", "IFC", "14th Floor", 10, "Projector, Video Conference, Whiteboard"),
+    ("ifc-14-006", "EMPIRE STATE MEETING ROOM", "IFC", "14th Floor", 5, "Projector, Whiteboard"),
+    ("ifc-14-007", "MARINA BAY MEETING ROOM", "IFC", "14th Floor", 5, "Projector, Whiteboard"),
+    ("ifc-14-008", "BURJ MEETING ROOM", "IFC", "14th Floor", 5, "Projector, Whiteboard"),
+    ("ifc-14-009", "BOARD ROOM", "IFC", "14th Floor", 20, "Projector, Video Conference, Whiteboard, Audio System"),
+    ("central-1-001", "Central Office Conference Room", "Central Office 75", "1st Floor", 8, "Projector, Whiteboard"),
+    ("office75-1-001", "Office 75 Meeting Room", "Office 75", "1st Floor", 6, "Projector, Whiteboard"),
+    ("noida-1-001", "Noida Conference Room", "Noida", "1st Floor", 12, "Projector, Video Conference, Whiteboard"),
+    ("project-1-001", "Project Office Meeting Room", "Project Office", "1st Floor", 8, "Projector, Whiteboard"),
+]
+
+
+def parse_time(value) -> float:
+    """Epoch seconds for an ISO timestamp (``Z`` and offsets honoured)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).strip().replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {value!r}")
+
+
+def amenity_set(amenities) -> FrozenSet[str]:
+    """``"Projector, Whiteboard"`` (or an iterable of names) as a lower-case set."""
+    if isinstance(amenities, str):
+        amenities = amenities.split(",")
+    return frozenset(name.strip().lower() for name in amenities if name and name.strip())
+
+
+def _iso(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds).isoformat(timespec="minutes")
+
+
+class Booking(NamedTuple):
+    id: str
+    room_id: str
+    room_name: str
+    employee_id: str
+    employee_name: str
+    start: float
+    end: float
+    start_time: str
+    end_time: str
+    purpose: str
+    created_at: str
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "room_id": self.room_id,
+            "room_name": self.room_name,
+            "employee_id": self.employee_id,
+            "employee_name": self.employee_name,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "purpose": self.purpose,
+            "created_at": self.created_at,
+        }
+
+
+class BookingConflict(ValueError):
+    def __init__(self, booking: Booking):
+        super().__init__(f"{booking.room_name} is already booked from {booking.start_time} to {booking.end_time}")
+        self.booking = booking
+
+
+class Room:
+    """A room and its non-overlapping bookings, sorted by start time."""
+
+    def __init__(self, id: str, name: str, location: str, floor: str, capacity: int, amenities: str):
+        self.id = id
+        self.name = name
+        self.location = location
+        self.floor = floor
+        self.capacity = capacity
+        self.amenities = amenities
+        self.amenity_set = amenity_set(amenities)
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        self.bookings: List[Booking] = []
+        self.lock = threading.Lock()
+
+    def conflict(self, start: float, end: float) -> Optional[Booking]:
+        """The booking overlapping ``[start, end)``, if any.  Caller holds the lock."""
+        i = bisect_right(self.ends, start)
+        if i < len(self.starts) and self.starts[i] < end:
+            return self.bookings[i]
+        return None
+
+    def insert(self, booking: Booking) -> None:
+        i = bisect_left(self.starts, booking.start)
+        self.starts.insert(i, booking.start)
+        self.ends.insert(i, booking.end)
+        self.bookings.insert(i, booking)
+
+    def remove(self, index: int) -> Booking:
+        del self.starts[index]
+        del self.ends[index]
+        return self.bookings.pop(index)
+
+    def expire(self, now: float) -> int:
+        """Drop bookings that ended at or before ``now``; returns how many."""
+        with self.lock:
+            count = bisect_right(self.ends, now)
+            if count:
+                del self.starts[:count], self.ends[:count], self.bookings[:count]
+            return count
+
+    def next_free(self, start: float, duration: float) -> float:
+        """Earliest time at or after ``start`` with ``duration`` seconds free."""
+        with self.lock:
+            i = bisect_right(self.ends, start)
+            while i < len(self.starts) and self.starts[i] < start + duration:
+                start = max(start, self.ends[i])
+                i += 1
+            return start
+
+    def summary(self) -> dict:
+        return {"id": self.id, "name": self.name, "location": self.location, "floor": self.floor,
+                "capacity": self.capacity, "amenities": self.amenities}
+
+    def between(self, start: float, end: float) -> List[Booking]:
+        """Bookings overlapping ``[start, end)``, in start order."""
+        with self.lock:
+            return self.bookings[bisect_right(self.ends, start):bisect_left(self.starts, end)]
+
+    def to_dict(self, now: Optional[float] = None) -> dict:
+        """The room in the shape ``dataService.getMeetingRooms()`` returns."""
+        now = time.time() if now is None else now
+        upcoming = self.between(now, float("inf"))
+        current = upcoming[0] if upcoming and upcoming[0].start <= now else None
+        return dict(
+            self.summary(),
+            status="occupied" if current else "vacant",
+            bookings=[booking.to_dict() for booking in upcoming],
+            current_booking=current.to_dict() if current else None,
+        )
+
+
+class MeetingRooms:
+    def __init__(self, rooms: Iterable[Tuple] = DEFAULT_ROOMS, bookings=None, now: Optional[float] = None):
+        self.rooms: Dict[str, Room] = {}
+        for row in rooms:
+            room = Room(*row)
+            self.rooms[room.id] = room
+        # None -> every room; each list sorted by (capacity, name).
+        self.by_location: Dict[Optional[str], List[Room]] = {None: []}
+        for room in self.rooms.values():
+            self.by_location[None].append(room)
+            self.by_location.setdefault(room.location, []).append(room)
+        self.capacities: Dict[Optional[str], List[int]] = {}
+        for location, members in self.by_location.items():
+            members.sort(key=lambda room: (room.capacity, room.name))
+            self.capacities[location] = [room.capacity for room in members]
+        # (booking end, room id); stale entries for cancelled bookings are harmless.
+        self._expiry: List[Tuple[float, str]] = []
+        self._expiry_lock = threading.Lock()
+        # Record-store collection of bookings (see record_store.Collection).
+        self.store = bookings
+        if bookings is not None:
+            self._restore(time.time() if now is None else now)
+        # Version 1 is the bare catalogue; bumped by every booking or cancellation.
+        self.version = 1 + (bookings.version if bookings is not None else 0)
+        self._version_lock = threading.Lock()
+        self._published = self.version
+        self._turn = threading.Condition()
+        self._listeners: List[Callable[[int, List[str]], None]] = []
+
+    def add_listener(self, callback: Callable[[int, List[str]], None]) -> None:
+        """Run ``callback(version, room_ids)`` after every booking change."""
+        self._listeners.append(callback)
+
+    def _changed(self, room_id: str) -> None:
+        with self._version_lock:
+            self.version += 1
+            version = self.version
+        with self._turn:
+            while self._published < version - 1:
+                self._turn.wait()
+            try:
+                for callback in self._listeners:
+                    callback(version, [room_id])
+            finally:
+                self._published = version
+                self._turn.notify_all()
+
+    @staticmethod
+    def _record(booking: Booking) -> dict:
+        return dict(booking.to_dict(), start=booking.start, end=booking.end, booked_at=booking.created_at)
+
+    def _restore(self, now: float) -> None:
+        for record in self.store.list():
+            room = self.rooms.get(record["room_id"])
+            if room is None or record["end"] <= now:
+                self.store.delete(record["id"])
+                continue
+            booking = Booking(
+                id=record["id"], room_id=room.id, room_name=room.name, employee_id=record["employee_id"],
+                employee_name=record["employee_name"], start=record["start"], end=record["end"],
+                start_time=record["start_time"], end_time=record["end_time"], purpose=record["purpose"],
+                created_at=record["booked_at"],
+            )
+            if room.conflict(booking.start, booking.end) is None:
+                room.insert(booking)
+                heapq.heappush(self._expiry, (booking.end, room.id))
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop finished bookings from the rooms that have any; cheap when none have."""
+        now = time.time() if now is None else now
+        expired = 0
+        with self._expiry_lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                _, room_id = heapq.heappop(self._expiry)
+                expired += self.rooms[room_id].expire(now)
+        return expired
+
+    def room(self, room_id: str) -> Room:
+        """The room with ``room_id``; ``KeyError`` if there is none."""
+        return self.rooms[room_id]
+
+    def next_change(self, now: Optional[float] = None) -> float:
+        """When the listing next changes on its own: a booking starting or ending after ``now``."""
+        now = time.time() if now is None else now
+        upcoming = float("inf")
+        for room in self.rooms.values():
+            with room.lock:
+                index = bisect_right(room.ends, now)
+                if index < len(room.bookings):
+                    booking = room.bookings[index]
+                    upcoming = min(upcoming, booking.start if booking.start > now else booking.end)
+        return upcoming
+
+    def list_rooms(self, location: Optional[str] = None, floor: Optional[str] = None,
+                   status: Optional[str] = None, now: Optional[float] = None) -> List[dict]:
+        now = time.time() if now is None else now
+        self.expire(now)
+        rooms = []
+        for room in self.rooms.values():
+            if (location and room.location != location) or (floor and room.floor != floor):
+                continue
+            view = room.to_dict(now)
+            if status and view["status"] != status:
+                continue
+            rooms.append(view)
+        return rooms
+
+    def book(self, room_id: str, employee_id: str, employee_name: str, start_time: str, end_time: str,
+             purpose: str = "", now: Optional[float] = None) -> Booking:
+        """Atomically check for overlaps and insert; raises ``BookingConflict`` on a clash."""
+        room = self.room(room_id)
+        start, end = parse_time(start_time), parse_time(end_time)
+        now = time.time() if now is None else now
+        if start < now:
+            raise ValueError("Cannot book a room for past time")
+        if end <= start:
+            raise ValueError("End time must be after start time")
+        booking = Booking(
+            id=f"booking_{uuid.uuid4().hex[:12]}", room_id=room.id, room_name=room.name,
+            employee_id=employee_id, employee_name=employee_name, start=start, end=end,
+            start_time=str(start_time), end_time=str(end_time), purpose=purpose or "",
+            created_at=datetime.fromtimestamp(now).isoformat(),
+        )
+        with room.lock:
+            clash = room.conflict(start, end)
+            if clash is not None:
+                raise BookingConflict(clash)
+            room.insert(booking)
+            if self.store is not None:
+                try:
+                    self.store.create(self._record(booking), record_id=booking.id)
+                except Exception:
+                    room.remove(room.bookings.index(booking))
+                    raise
+        with self._expiry_lock:
+            heapq.heappush(self._expiry, (end, room.id))
+        self._changed(room.id)
+        return booking
+
+    def cancel(self, room_id: str, booking_id: Optional[str] = None, now: Optional[float] = None) -> Booking:
+        """Cancel ``booking_id``, or without one the room's current (else next) booking."""
+        room = self.room(room_id)
+        now = time.time() if now is None else now
+        with room.lock:
+            if booking_id is None:
+                index = bisect_right(room.ends, now)
+                if index == len(room.bookings):
+                    raise LookupError("No booking found to cancel")
+            else:
+                index = next((i for i, b in enumerate(room.bookings) if b.id == booking_id), None)
+                if index is None:
+                    raise LookupError(f"Booking {booking_id} not found")
+            if self.store is not None and self.store.get(room.bookings[index].id) is not None:
+                self.store.delete(room.bookings[index].id)
+            booking = room.remove(index)
+        self._changed(room.id)
+        return booking
+
+    def available(self, start_time, end_time, min_capacity: int = 0, location: Optional[str] = None,
+                  amenities: Iterable[str] = (), next_slots: int = 5, now: Optional[float] = None) -> dict:
+        """Free rooms for ``[start, end)``, smallest adequate room first.
+
+        Rooms that match but are busy contribute their next free slot of the
+        same length, earliest first.
+        """
+        start, end = parse_time(start_time), parse_time(end_time)
+        if end <= start:
+            raise ValueError("End time must be after start time")
+        self.expire(now)
+        wanted = amenity_set(amenities)
+        candidates = self.by_location.get(location or None, [])
+        first = bisect_left(self.capacities.get(location or None, []), min_capacity)
+        free, later = [], []
+        for room in candidates[first:]:
+            if not wanted <= room.amenity_set:
+                continue
+            with room.lock:
+                clash = room.conflict(start, end)
+            if clash is None:
+                free.append(room.summary())
+            else:
+                slot = room.next_free(start, end - start)
+                later.append((slot, room.capacity, room.name, room))
+        later.sort(key=lambda item: item[:3])
+        return {
+            "start": _iso(start),
+            "end": _iso(end),
+            "rooms": free,
+            "nextSlots": [
+                dict(room.summary(), start_time=_iso(slot), end_time=_iso(slot + end - start))
+                for slot, _, _, room in later[:next_slots]
+            ],
+        }
@@ -0,0 +1,195 @@
+"""Prometheus metrics for the API and the in-memory engines.
+
+``MetricsMiddleware`` is plain ASGI (no ``BaseHTTPMiddleware``, which would
+buffer streamed bodies): per request it takes two clock readings, counts
+the body bytes as they are sent and does one locked update of a few
+integers.  Requests are labelled with the *route template*
+(``/api/hierarchy/{employee_id}/chain``), read from the endpoint the router
+stored in the scope, so ids in paths never create new series.
+
+Engine state is not tracked continuously; collectors registered with
+``MetricsRegistry.register`` are called at scrape time and return
+``Metric`` values built from counters the engines already keep.  The text
+is rendered by hand in the exposition format, so there is no client
+library to install.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Seconds.  Most indexed lookups finish in the first few buckets; full
+# exports and bootstrap payloads land in the upper ones.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Metric(NamedTuple):
+    name: str
+    kind: str  # "counter" | "gauge"
+    help: str
+    samples: List[Tuple[Dict[str, object], float]]
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Iterable[Tuple[str, object]]) -> str:
+    text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return f"{{{text}}}" if text else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def render(self, name: str, labels: Labels, lines: List[str]) -> None:
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(self.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+
+
+class RequestMetrics:
+    """Request counts, latency and response-size histograms per (method, route), and requests in flight."""
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS, size_buckets=SIZE_BUCKETS):
+        self.latency_buckets = latency_buckets
+        self.size_buckets = size_buckets
+        self.in_flight = 0
+        self._requests: Dict[Tuple[str, str, int], int] = {}
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._sizes: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method: str, route: str, status: int, seconds: float, size: int) -> None:
+        key = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            counted = (method, route, status)
+            self._requests[counted] = self._requests.get(counted, 0) + 1
+            latency = self._latency.get(key)
+            if latency is None:
+                latency = self._latency[key] = Histogram(self.latency_buckets)
+                self._sizes[key] = Histogram(self.size_buckets)
+            latency.observe(seconds)
+            self._sizes[key].observe(size)
+
+    def render(self, lines: List[str]) -> None:
+        with self._lock:
+            requests = sorted(self._requests.items())
+            histograms = [(key, self._latency[key], self._sizes[key]) for key in sorted(self._latency)]
+            # Copies, so rendering does not hold up requests.
+            histograms = [(key, _copy(latency), _copy(size)) for key, latency, size in histograms]
+            in_flight = self.in_flight
+        lines += ["# HELP http_requests_total Requests handled, by route template and status.",
+                  "# TYPE http_requests_total counter"]
+        for (method, route, status), count in requests:
+            lines.append(f"http_requests_total{_labels((('method', method), ('route', route), ('status', status)))} {count}")
+        lines += ["# HELP http_request_duration_seconds Time from request to the last body byte.",
+                  "# TYPE http_request_duration_seconds histogram"]
+        for (method, route), latency, _ in histograms:
+            latency.render("http_request_duration_seconds", (("method", method), ("route", route)), lines)
+        lines += ["# HELP http_response_size_bytes Response body size.",
+                  "# TYPE http_response_size_bytes histogram"]
+        for (method, route), _, size in histograms:
+            size.render("http_response_size_bytes", (("method", method), ("route", route)), lines)
+        lines += ["# HELP http_requests_in_flight Requests being handled right now (open SSE streams included).",
+                  "# TYPE http_requests_in_flight gauge", f"http_requests_in_flight {in_flight}"]
+
+
+def _copy(histogram: Histogram) -> Histogram:
+    copy = Histogram(histogram.bounds)
+    copy.counts = list(histogram.counts)
+    copy.sum = histogram.sum
+    return copy
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.requests = RequestMetrics()
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        self.requests.render(lines)
+        for collector in self._collectors:
+            for metric in collector():
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                for labels, value in metric.samples:
+                    lines.append(f"{metric.name}{_labels(sorted(labels.items()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.metrics = registry.requests
+        self._routes: Optional[Dict[object, str]] = None
+
+    def route_of(self, scope) -> str:
+        """Template of the route that handled ``scope``; mounts show as ``<prefix>/{path}``."""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._routes is None or endpoint not in self._routes:
+            routes: Dict[object, str] = {}
+            for route in scope["app"].routes:
+                if hasattr(route, "endpoint"):
+                    routes.setdefault(route.endpoint, route.path)
+                else:
+                    routes.setdefault(route.app, f"{route.path}/{{path}}")
+            self._routes = routes
+        return self._routes.setdefault(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status, size = 500, 0
+
+        async def counting_send(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics.started()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, counting_send)
+        finally:
+            self.metrics.finished(scope["method"], self.route_of(scope), status,
+                                  time.perf_counter() - started, size)
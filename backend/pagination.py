@@ -0,0 +1,63 @@
+"""Keyset cursors and NDJSON streaming shared by the listing endpoints.
+
+Cursors are opaque, URL-safe encodings of the sort key of the last record a
+client has seen.  Resuming "after" a key instead of at an offset keeps pages
+stable when records are added or removed between requests.
+"""
+
+import base64
+import json
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Tuple
+
+from fastapi.responses import StreamingResponse
+from starlette.requests import Request
+
+from profiling import span
+
+NDJSON = "application/x-ndjson"
+
+# Records are serialised in batches so each chunk written to the socket is
+# reasonably sized without ever holding the full body in memory.
+STREAM_BATCH = 500
+
+
+def encode_cursor(*parts: str) -> str:
+    raw = "\x1f".join(parts).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, parts: int) -> Tuple[str, ...]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Malformed cursor")
+    values = tuple(raw.split("\x1f"))
+    if len(values) != parts:
+        raise ValueError("Malformed cursor")
+    return values
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON in request.headers.get("accept", "")
+
+
+def _ndjson_lines(records: Iterable[dict]) -> Iterator[bytes]:
+    records = iter(records)
+    while True:
+        with span("serialize"):
+            batch = [json.dumps(record, separators=(",", ":")) for record in islice(records, STREAM_BATCH)]
+        if not batch:
+            return
+        yield ("\n".join(batch) + "\n").encode()
+
+
+def ndjson_response(records: Iterable[dict], next_cursor: Optional[str] = None,
+                    total: Optional[int] = None, headers: Optional[dict] = None) -> StreamingResponse:
+    """Stream ``records`` (typically a generator) one JSON object per line."""
+    headers = dict(headers or {})
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    return StreamingResponse(_ndjson_lines(records), media_type=NDJSON, headers=headers)
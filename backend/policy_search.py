@@ -0,0 +1,271 @@
+"""Full-text search over the company policy PDFs.
+
+Text is extracted once per PDF (pypdf is slow: a few hundred milliseconds a
+file) and cached as a snapshot keyed by the file's SHA-256, so restarts and
+unchanged files never touch pypdf again.  Every page is a search document;
+the inverted index maps a term to the pages containing it and the character
+offsets of each occurrence within the page text, which gives BM25 its term
+frequencies and the snippets their highlights without rescanning the text.
+
+Like ``WatchedFile``, ``current()`` rescans the folder at most every
+``check_interval`` seconds.  A file is re-hashed only when its mtime or size
+changed and re-indexed only when its hash did; its old postings are removed
+and the new ones added, leaving every other file's postings in place.
+"""
+
+import glob
+import html
+import logging
+import math
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+
+from profiling import span
+from snapshot import open_snapshot, pack_strings, snapshot_path, write_snapshot
+from sources import file_digest
+
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r"[A-Za-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or shall should that the this to will with".split())
+# BM25 parameters (the usual defaults).
+K1 = 1.2
+B = 0.75
+SNIPPET_CHARS = 200
+SNAPSHOT_KIND = "policy-text"
+# Upload prefix the intranet adds to policy file names: "_14_33_<16 hex>_".
+UPLOAD_PREFIX = re.compile(r"^_\d+_\d+_[0-9a-f]{16}_")
+
+PageKey = Tuple[str, int]  # (file name, 0-based page)
+
+
+def normalize(term: str) -> str:
+    """Lower-case and fold plurals so "leaves" finds "leave" and "policies" "policy"."""
+    term = term.lower()
+    if len(term) > 4 and term.endswith("ies"):
+        return term[:-3] + "y"
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def tokenize(text: str) -> Iterator[Tuple[str, int, int]]:
+    """``(term, start, end)`` for every indexable word in ``text``."""
+    for match in TOKEN.finditer(text):
+        term = normalize(match.group())
+        if term not in STOPWORDS:
+            yield term, match.start(), match.end()
+
+
+def policy_title(name: str) -> str:
+    title = UPLOAD_PREFIX.sub("", os.path.splitext(name)[0])
+    return title[:-5] if title.endswith(".xlsx") else title
+
+
+class PolicyDocument(NamedTuple):
+    name: str
+    title: str
+    source_hash: str
+    pages: List[str]  # whitespace-normalised text, one entry per page
+
+    def to_dict(self, url_prefix: str) -> dict:
+        return {"name": self.name, "title": self.title, "url": quote(f"{url_prefix}/{self.name}"), "pages": len(self.pages)}
+
+
+def extract_pages(path: str) -> List[str]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return [" ".join((page.extract_text() or "").split()) for page in reader.pages]
+
+
+class PolicyIndex:
+    def __init__(self, directory: str, cache_dir: Optional[str] = None, url_prefix: str = "/company policies",
+                 check_interval: float = 5.0):
+        self.directory = directory
+        self.cache_dir = cache_dir
+        self.url_prefix = url_prefix
+        self.check_interval = check_interval
+        self.version = 0
+        self.documents: Dict[str, PolicyDocument] = {}
+        self.postings: Dict[str, Dict[PageKey, List[int]]] = {}  # term -> page -> match starts
+        self.lengths: Dict[PageKey, int] = {}
+        self.total_length = 0
+        self._stats: Dict[str, Tuple[int, int]] = {}  # name -> (mtime_ns, size)
+        self._lock = threading.Lock()  # postings, lengths and documents
+        self._scan_lock = threading.Lock()  # one refresh at a time
+        self._next_check = 0.0
+
+    def current(self) -> "PolicyIndex":
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            with span("io"):
+                self.refresh()
+        return self
+
+    def refresh(self) -> bool:
+        """Re-index PDFs added, removed or edited since the last scan; True if any were."""
+        # Hashing and text extraction happen outside ``_lock`` so searches are
+        # answered from the old postings meanwhile; only the swap holds it.
+        with self._scan_lock:
+            seen, updates = set(), []
+            for path in sorted(glob.glob(os.path.join(self.directory, "*.pdf"))):
+                name = os.path.basename(path)
+                seen.add(name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                key = (stat.st_mtime_ns, stat.st_size)
+                if self._stats.get(name) == key:
+                    continue
+                source_hash = file_digest(path)
+                previous = self.documents.get(name)
+                if previous is None or previous.source_hash != source_hash:
+                    pages = self._pages(path, source_hash)
+                    if pages is None:
+                        continue
+                    updates.append((PolicyDocument(name, policy_title(name), source_hash, pages), key))
+                else:
+                    self._stats[name] = key
+            removed = set(self.documents) - seen
+            if not updates and not removed:
+                return False
+            with self._lock:
+                for document, _ in updates:
+                    self._remove(document.name)
+                    self._add(document)
+                for name in removed:
+                    self._remove(name)
+                self.version += 1
+            for document, key in updates:
+                self._stats[document.name] = key
+            for name in removed:
+                self._stats.pop(name, None)
+            self._prune_cache()
+            return True
+
+    def _pages(self, path: str, source_hash: str) -> Optional[List[str]]:
+        if self.cache_dir:
+            snapshot = open_snapshot(self.cache_dir, SNAPSHOT_KIND, source_hash)
+            if snapshot is not None and "pages.offsets" in snapshot:
+                return snapshot.strings("pages")
+        started = time.perf_counter()
+        try:
+            pages = extract_pages(path)
+        except Exception:
+            logger.exception("Could not extract text from %s", path)
+            return None
+        logger.info("Extracted %d pages from %s in %.3fs", len(pages), path, time.perf_counter() - started)
+        if self.cache_dir:
+            offsets, data = pack_strings(pages)
+            try:
+                write_snapshot(snapshot_path(self.cache_dir, SNAPSHOT_KIND, source_hash), source_hash,
+                               {"pages.offsets": offsets, "pages.data": data})
+            except OSError:
+                logger.exception("Could not cache text of %s", path)
+        return pages
+
+    def _prune_cache(self) -> None:
+        if not self.cache_dir:
+            return
+        keep = {os.path.abspath(snapshot_path(self.cache_dir, SNAPSHOT_KIND, doc.source_hash))
+                for doc in self.documents.values()}
+        for path in glob.glob(os.path.join(self.cache_dir, f"{SNAPSHOT_KIND}-*.snap")):
+            if os.path.abspath(path) not in keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _add(self, document: PolicyDocument) -> None:
+        self.documents[document.name] = document
+        for number, text in enumerate(document.pages):
+            key = (document.name, number)
+            length = 0
+            for term, start, _ in tokenize(text):
+                self.postings.setdefault(term, {}).setdefault(key, []).append(start)
+                length += 1
+            self.lengths[key] = length
+            self.total_length += length
+
+    def _remove(self, name: str) -> None:
+        document = self.documents.pop(name, None)
+        if document is None:
+            return
+        for number, text in enumerate(document.pages):
+            key = (name, number)
+            for term in {term for term, _, _ in tokenize(text)}:
+                pages = self.postings[term]
+                del pages[key]
+                if not pages:
+                    del self.postings[term]
+            self.total_length -= self.lengths.pop(key)
+
+    def listing(self) -> List[dict]:
+        with self._lock:
+            documents = sorted(self.documents.values(), key=lambda d: d.title)
+        return [doc.to_dict(self.url_prefix) for doc in documents]
+
+    def search(self, query: str, limit: int = 10) -> dict:
+        """Best-matching pages for ``query`` by BM25, each with a highlighted snippet."""
+        terms = list(dict.fromkeys(term for term, _, _ in tokenize(query)))
+        results = []
+        with self._lock:
+            pages = len(self.lengths)
+            average = self.total_length / pages if pages else 0.0
+            scores: Dict[PageKey, float] = {}
+            for term in terms:
+                postings = self.postings.get(term, {})
+                idf = math.log(1 + (pages - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, starts in postings.items():
+                    tf = len(starts)
+                    norm = K1 * (1 - B + B * self.lengths[key] / average)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            for (name, number), score in ranked[:limit]:
+                document = self.documents[name]
+                text = document.pages[number]
+                starts = sorted(start for term in terms for start in self.postings.get(term, {}).get((name, number), ()))
+                matches = [(start, TOKEN.match(text, start).end()) for start in starts]
+                result = document.to_dict(self.url_prefix)
+                del result["pages"]
+                result.update(page=number + 1, score=round(score, 4), snippet=snippet(text, matches),
+                              matches=[list(match) for match in matches])
+                results.append(result)
+        return {"query": query, "total": len(scores), "results": results}
+
+
+def snippet(text: str, matches: List[Tuple[int, int]], width: int = SNIPPET_CHARS) -> str:
+    """HTML-escaped excerpt around the densest run of ``matches``, with ``<mark>`` highlights."""
+    if not matches:
+        return html.escape(text[:width], quote=False)
+    best, best_count, right = 0, 0, 0
+    for left, (start, _) in enumerate(matches):
+        while right < len(matches) and matches[right][1] <= start + width:
+            right += 1
+        if right - left > best_count:
+            best, best_count = left, right - left
+    start = max(0, matches[best][0] - width // 4)
+    if start:
+        start = text.find(" ", start) + 1 or start
+    end = min(len(text), start + width)
+    if end < len(text):
+        space = text.rfind(" ", start, end)
+        if space > matches[best][1]:
+            end = space
+    parts, position = [], start
+    for match_start, match_end in matches:
+        if match_start < start or match_end > end:
+            continue
+        parts.append(html.escape(text[position:match_start], quote=False))
+        parts.append(f"<mark>{html.escape(text[match_start:match_end], quote=False)}</mark>")
+        position = match_end
+    parts.append(html.escape(text[position:end], quote=False))
+    return ("…" if start else "") + "".join(parts) + ("…" if end < len(text) else "")
@@ -0,0 +1,277 @@
+"""On-demand request profiling and the slow-request span log.
+
+Both are off unless configured, and off means a branch, not a cost:
+
+* ``span(name)`` marks a phase of a handler (``parse``, ``lookup``,
+  ``serialize``, ``io``).  Outside a traced request it is one context-var
+  read returning a shared no-op context manager.
+* ``ProfilingMiddleware`` is only installed when a profile token or a
+  slow-request threshold is set.
+
+A request carrying ``X-Profile: <token>`` runs under a sampling profiler: a
+background thread reads the stacks of the threads working on that request
+every few milliseconds via ``sys._current_frames()``.  The event-loop thread is attributed by the
+middleware's own frame for this scope, worker threads by the frame of the
+matched endpoint, so other requests running concurrently only leak in when
+they run the same endpoint in a worker at the same moment.  The result is
+kept in memory as collapsed stacks (``frame;frame;frame count``, the input
+format of flamegraph.pl, speedscope and inferno) and its id is returned in
+the ``X-Profile-Id`` header.
+
+With ``slow_ms`` set every request is traced: spans add their duration to
+the request's ``Trace``, and requests slower than the threshold go to a
+bounded in-memory log (and the application log) with their per-phase
+timings.  The trace is a context variable, so sync handlers running in the
+thread pool and streamed bodies record into the same trace.
+"""
+
+import hmac
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Deque, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+COLLAPSED_CONTENT_TYPE = "text/plain; charset=utf-8"
+
+_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+
+
+class Trace:
+    """Span totals of one request: name -> [calls, seconds]."""
+
+    __slots__ = ("spans", "depth", "attributed")
+
+    def __init__(self):
+        self.spans: Dict[str, List[float]] = {}
+        self.depth = 0
+        # Seconds inside top-level spans; the rest of the request is routing,
+        # validation and response encoding by the framework.
+        self.attributed = 0.0
+
+
+class _Span:
+    __slots__ = ("trace", "name", "begun")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.trace.depth += 1
+        self.begun = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.begun
+        trace = self.trace
+        trace.depth -= 1
+        if trace.depth == 0:
+            trace.attributed += seconds
+        totals = trace.spans.get(self.name)
+        if totals is None:
+            trace.spans[self.name] = [1, seconds]
+        else:
+            totals[0] += 1
+            totals[1] += seconds
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+def span(name: str):
+    """Time a phase of the current request; a no-op when the request is not traced."""
+    trace = _trace.get()
+    return NO_SPAN if trace is None else _Span(trace, name)
+
+
+def frame_label(code) -> str:
+    # co_qualname is new in Python 3.11.
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks working on one ASGI ``scope`` until ``stop()``."""
+
+    def __init__(self, scope, interval: float):
+        self.scope = scope
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.ticks = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        own = threading.get_ident()
+        middleware = ProfilingMiddleware.__call__.__code__
+        stopping = SamplingProfiler.stop.__code__
+        while not self._stop.wait(self.interval):
+            self.ticks += 1
+            endpoint = getattr(self.scope.get("endpoint"), "__code__", None)
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    if code is stopping:  # the request is over and waiting for this thread
+                        break
+                    stack.append(code)
+                    if code is endpoint or (code is middleware and frame.f_locals.get("scope") is self.scope):
+                        self.samples[";".join(frame_label(code) for code in reversed(stack))] += 1
+                        break
+                    frame = frame.f_back
+
+
+class Profile(NamedTuple):
+    id: str
+    created: float
+    method: str
+    path: str
+    status: int
+    seconds: float
+    ticks: int
+    samples: Counter
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "createdAt": self.created, "method": self.method, "path": self.path,
+                "status": self.status, "ms": round(self.seconds * 1e3, 3), "ticks": self.ticks,
+                "samples": sum(self.samples.values())}
+
+
+class RequestProfiler:
+    """Configuration plus the kept profiles and slow requests; see the module docstring."""
+
+    def __init__(self, token: Optional[str] = None, slow_ms: Optional[float] = None,
+                 interval: float = 0.005, keep_profiles: int = 20, keep_slow: int = 200,
+                 exclude: str = "/debug/"):
+        self.token = token or None
+        self.exclude = exclude  # reading profiles should not profile (or log) itself
+        self.slow_seconds = slow_ms / 1e3 if slow_ms is not None else None
+        self.interval = interval
+        self.profiles: Deque[Profile] = deque(maxlen=keep_profiles)
+        self.slow: Deque[dict] = deque(maxlen=keep_slow)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.token is not None or self.slow_seconds is not None
+
+    def authorized(self, headers) -> bool:
+        """Whether a request presents the profile token.
+
+        Header only: a query parameter would put the token in access logs.
+        """
+        if self.token is None:
+            return False
+        for name, value in headers:
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(value, self.token.encode())
+        return False
+
+    def next_id(self) -> str:
+        return f"{int(time.time())}-{next(self._ids)}"
+
+    def keep_profile(self, profile: Profile) -> None:
+        with self._lock:
+            self.profiles.append(profile)
+
+    def profile(self, profile_id: str) -> Optional[Profile]:
+        with self._lock:
+            return next((profile for profile in self.profiles if profile.id == profile_id), None)
+
+    def listing(self) -> List[dict]:
+        with self._lock:
+            return [profile.to_dict() for profile in reversed(self.profiles)]
+
+    def finished(self, method: str, path: str, status: int, seconds: float, trace: Trace) -> None:
+        if self.slow_seconds is None or seconds < self.slow_seconds:
+            return
+        entry = {
+            "at": time.time(), "method": method, "path": path, "status": status,
+            "ms": round(seconds * 1e3, 3),
+            "spans": {name: {"calls": calls, "ms": round(total * 1e3, 3)}
+                      for name, (calls, total) in trace.spans.items()},
+            "frameworkMs": round(max(0.0, seconds - trace.attributed) * 1e3, 3),
+        }
+        with self._lock:
+            self.slow.append(entry)
+        logger.warning("Slow request %s %s: %d in %.1f ms (%s)", method, path, status, entry["ms"],
+                       ", ".join(f"{name} {span['ms']:.1f} ms" for name, span in entry["spans"].items()) or "no spans")
+
+    def slow_requests(self) -> List[dict]:
+        with self._lock:
+            return list(reversed(self.slow))
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        profiler = self.profiler
+        if scope["type"] != "http" or scope["path"].startswith(profiler.exclude):
+            await self.app(scope, receive, send)
+            return
+        profiled = profiler.token is not None and profiler.authorized(scope["headers"])
+        if not profiled and profiler.slow_seconds is None:
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        profile_id = profiler.next_id() if profiled else None
+
+        async def tracing_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile_id is not None:
+                    message = dict(message, headers=list(message.get("headers", [])) +
+                                   [(b"x-profile-id", profile_id.encode())])
+            await send(message)
+
+        trace = Trace()
+        reset = _trace.set(trace)
+        sampler = SamplingProfiler(scope, profiler.interval).start() if profiled else None
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, tracing_send)
+        finally:
+            seconds = time.perf_counter() - started
+            _trace.reset(reset)
+            if sampler is not None:
+                samples = sampler.stop()
+                profiler.keep_profile(Profile(profile_id, time.time(), scope["method"], scope["path"], status,
+                                              seconds, sampler.ticks, samples))
+            profiler.finished(scope["method"], scope["path"], status, seconds, trace)
@@ -0,0 +1,306 @@
+"""Durable, append-only storage for the small mutable collections.
+
+News, tasks, knowledge articles, help requests, workflows, alerts and
+hierarchy edits are kept in memory as ``Collection`` objects and persisted
+per collection as
+
+* ``<name>.wal``  -- one JSON line per change: ``{"seq", "op", "id", "record"}``
+  where ``op`` is ``put``, ``delete`` or ``clear``;
+* ``<name>.snapshot.json`` -- every record as of some ``seq``.
+
+A write appends one line, so its cost is proportional to the change rather
+than the collection.  Writers apply their change in memory, queue the log
+line and block until it is durable; a single committer thread drains the
+queue, writes everything pending and issues one ``fsync`` per touched file
+(group commit), so a burst of concurrent writes shares a single disk flush.
+Listeners then run strictly in ``seq`` order: a writer whose change is
+durable waits its turn behind the writers of earlier changes, so change
+logs and the change feed never see versions go backwards.
+
+At startup the snapshot is loaded and the log tail replayed (entries with a
+``seq`` above the snapshot's).  A torn final line from a crash mid-write is
+dropped.  Once a log holds ``compact_after`` entries the committer writes a
+fresh snapshot and starts an empty log; lines for entries the snapshot
+already covers may still follow and are skipped on replay.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COMPACT_AFTER = 1000
+
+
+def timestamp() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()) + "Z"
+
+
+def _fsync_replace(path: str, data: bytes) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+class Collection:
+    """One collection's records, newest first, with change versions."""
+
+    def __init__(self, store: "RecordStore", name: str, prefix: str):
+        self.store = store
+        self.name = name
+        self.prefix = prefix
+        self.version = 0  # seq of the last applied change
+        self.published = 0  # seq of the last change listeners were told about
+        self._turn = threading.Condition()
+        self.records: "OrderedDict[str, dict]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.pending_entries = 0  # log lines since the last snapshot
+        self._listeners: List[Callable[[int, Optional[List[str]]], None]] = []
+
+    def add_listener(self, callback: Callable[[int, Optional[List[str]]], None]) -> None:
+        """Run ``callback(version, ids)`` after each durable change; ``ids`` is None for a clear."""
+        self._listeners.append(callback)
+
+    # ---------- reads ----------
+    def list(self) -> List[dict]:
+        with self.lock:
+            return list(reversed(self.records.values()))
+
+    def get(self, record_id: str) -> Optional[dict]:
+        return self.records.get(record_id)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    # ---------- writes ----------
+    def create(self, data: dict, record_id: Optional[str] = None) -> dict:
+        """Insert (or replace) a record; ids default to ``<prefix>_<random>``."""
+        stamp = timestamp()
+        record_id = record_id or f"{self.prefix}_{uuid.uuid4().hex[:12]}"
+        record = dict(data, id=record_id, created_at=stamp, updated_at=stamp)
+        return self._apply("put", record_id, record)
+
+    def update(self, record_id: str, changes) -> dict:
+        """Shallow-merge ``changes`` into a record; ``KeyError`` if it does not exist.
+
+        ``changes`` may be a function of the current record, for
+        read-modify-write updates such as appending a reply.
+        """
+        def merge(current: Optional[dict]) -> dict:
+            if current is None:
+                raise KeyError(record_id)
+            fields = changes(current) if callable(changes) else changes
+            return dict(current, **{k: v for k, v in fields.items() if k not in ("id", "created_at")},
+                        updated_at=timestamp())
+        return self._apply("put", record_id, merge)
+
+    def delete(self, record_id: str) -> dict:
+        return self._apply("delete", record_id, None)
+
+    def clear(self) -> None:
+        self._apply("clear", None, None)
+
+    def _apply(self, op: str, record_id: Optional[str], record) -> Optional[dict]:
+        with self.lock:
+            if callable(record):
+                record = record(self.records.get(record_id))
+            if op == "delete":
+                if record_id not in self.records:
+                    raise KeyError(record_id)
+                result = self.records.pop(record_id)
+            elif op == "clear":
+                self.records.clear()
+                result = None
+            else:
+                # Records are replaced, never mutated, so snapshots can share them.
+                self.records[record_id] = record
+                result = record
+            self.version += 1
+            version = self.version
+            ticket = self.store.enqueue(self, {"seq": version, "op": op, "id": record_id, "record": record})
+        try:
+            self.store.wait_durable(ticket)
+        except BaseException:
+            self._publish(version, None, durable=False)
+            raise
+        self._publish(version, None if op == "clear" else [record_id])
+        return result
+
+    def _publish(self, version: int, ids: Optional[List[str]], durable: bool = True) -> None:
+        """Run the listeners for ``version`` once every earlier version has had its turn."""
+        with self._turn:
+            while self.published < version - 1:
+                self._turn.wait()
+            try:
+                if durable:
+                    for callback in self._listeners:
+                        callback(version, ids)
+            finally:
+                self.published = version
+                self._turn.notify_all()
+
+    # ---------- persistence ----------
+    def replay(self, entry: dict) -> None:
+        if entry["seq"] <= self.version:
+            return
+        if entry["op"] == "put":
+            self.records[entry["id"]] = entry["record"]
+        elif entry["op"] == "delete":
+            self.records.pop(entry["id"], None)
+        elif entry["op"] == "clear":
+            self.records.clear()
+        self.version = entry["seq"]
+
+
+class RecordStore:
+    def __init__(self, directory: str, compact_after: int = COMPACT_AFTER, fsync: bool = True):
+        self.directory = directory
+        self.compact_after = compact_after
+        self.fsync = fsync
+        self.collections: Dict[str, Collection] = {}
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue: List[Tuple[Collection, bytes]] = []
+        self._cond = threading.Condition()
+        self._issued = 0     # tickets handed to writers
+        self._durable = 0    # highest ticket known to be on disk
+        self.commits = 0     # fsync batches written
+        self._failure: Optional[BaseException] = None
+        self._closed = False
+        self._files: Dict[str, object] = {}
+        self._committer = threading.Thread(target=self._commit_loop, name="record-store-commit", daemon=True)
+        self._committer.start()
+
+    def _path(self, name: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{name}{suffix}")
+
+    def collection(self, name: str, prefix: Optional[str] = None) -> Collection:
+        """The named collection, loading it from disk on first use."""
+        collection = self.collections.get(name)
+        if collection is None:
+            collection = self.collections[name] = Collection(self, name, prefix or name)
+            self._load(collection)
+        return collection
+
+    def _load(self, collection: Collection) -> None:
+        started = time.perf_counter()
+        snapshot_path = self._path(collection.name, ".snapshot.json")
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, "rb") as fh:
+                snapshot = json.load(fh)
+            collection.records = OrderedDict((record["id"], record) for record in snapshot["records"])
+            collection.version = snapshot["seq"]
+        wal_path = self._path(collection.name, ".wal")
+        replayed, valid_bytes = 0, 0
+        if os.path.exists(wal_path):
+            with open(wal_path, "rb") as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logger.warning("Dropping torn tail of %s at byte %d", wal_path, valid_bytes)
+                        break
+                    if not line.endswith(b"\n"):
+                        break
+                    collection.replay(entry)
+                    valid_bytes += len(line)
+                    replayed += 1
+            if valid_bytes != os.path.getsize(wal_path):
+                with open(wal_path, "r+b") as fh:
+                    fh.truncate(valid_bytes)
+        collection.pending_entries = replayed
+        collection.published = collection.version
+        logger.info("Loaded collection %s (%d records, %d log entries) in %.3fs", collection.name,
+                    len(collection), replayed, time.perf_counter() - started)
+
+    # ---------- group commit ----------
+    def enqueue(self, collection: Collection, entry: dict) -> int:
+        line = json.dumps(entry, separators=(",", ":")).encode() + b"\n"
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Record store is closed")
+            self._queue.append((collection, line))
+            self._issued += 1
+            self._cond.notify_all()
+            return self._issued
+
+    def wait_durable(self, ticket: int) -> None:
+        with self._cond:
+            while self._durable < ticket and self._failure is None:
+                self._cond.wait()
+            if self._failure is not None:
+                raise RuntimeError("Record store write failed") from self._failure
+
+    def _commit_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue and self._closed:
+                    return
+                batch, self._queue = self._queue, []
+                ticket = self._issued
+            try:
+                touched = {}
+                for collection, line in batch:
+                    fh = self._wal(collection.name)
+                    fh.write(line)
+                    touched[collection.name] = fh
+                    collection.pending_entries += 1
+                for fh in touched.values():
+                    fh.flush()
+                    if self.fsync:
+                        os.fsync(fh.fileno())
+            except BaseException as exc:  # surface to every waiting writer
+                logger.exception("Record store commit failed")
+                with self._cond:
+                    self._failure = exc
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._durable = ticket
+                self.commits += 1
+                self._cond.notify_all()
+            for name in touched:
+                collection = self.collections[name]
+                if collection.pending_entries >= self.compact_after:
+                    self.compact(collection)
+
+    def _wal(self, name: str):
+        fh = self._files.get(name)
+        if fh is None:
+            fh = self._files[name] = open(self._path(name, ".wal"), "ab")
+        return fh
+
+    def compact(self, collection: Collection) -> None:
+        """Snapshot ``collection`` and start an empty log (committer thread only)."""
+        with collection.lock:
+            records, seq = list(collection.records.values()), collection.version
+        body = json.dumps({"seq": seq, "records": records}, separators=(",", ":")).encode()
+        _fsync_replace(self._path(collection.name, ".snapshot.json"), body)
+        fh = self._files.pop(collection.name, None)
+        if fh is not None:
+            fh.close()
+        # Lines with seq <= snapshot seq that are still queued land in the
+        # new log and are skipped on replay.
+        _fsync_replace(self._path(collection.name, ".wal"), b"")
+        collection.pending_entries = 0
+        logger.info("Compacted collection %s at seq %d (%d records)", collection.name, seq, len(records))
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._committer.join()
+        for fh in self._files.values():
+            fh.close()
+        self._files.clear()
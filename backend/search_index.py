@@ -0,0 +1,107 @@
+"""Prefix index for directory search.
+
+``dataService.getEmployees()`` matches a search term with ``startsWith``
+against the lower-cased name, id, department, location, grade and mobile of
+every employee.  ``PrefixIndex`` answers the same question from a sorted
+array of distinct field values: a prefix query is one ``bisect`` followed by
+a walk over the contiguous run of keys sharing that prefix.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Set, Tuple
+
+from directory import Directory, Employee
+
+SEARCH_FIELDS = ("name", "id", "department", "location", "grade", "mobile")
+
+
+def search_keys(emp: Employee) -> Tuple[str, ...]:
+    keys = {getattr(emp, field).lower() for field in SEARCH_FIELDS}
+    keys.discard("")
+    return tuple(keys)
+
+
+class PrefixIndex:
+    """Sorted distinct keys plus a posting set of employee ids per key.
+
+    The index is maintained incrementally: ``sync()`` diffs the incoming
+    directory against the records it already holds and only re-indexes the
+    employees that were added, removed or edited.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: List[str] = []
+        self._postings: Dict[str, Set[str]] = {}
+        self._records: Dict[str, Employee] = {}
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def key_count(self) -> int:
+        return len(self._keys)
+
+    def sync(self, directory: Directory) -> Tuple[int, int]:
+        """Bring the index in line with ``directory``; returns (added, removed)."""
+        incoming = directory.by_id
+        with self._lock:
+            stale = [emp for emp_id, emp in self._records.items() if incoming.get(emp_id) != emp]
+            fresh = [emp for emp_id, emp in incoming.items() if self._records.get(emp_id) != emp]
+            dropped: List[str] = []
+            added: List[str] = []
+            for emp in stale:
+                self._remove(emp, dropped)
+            for emp in fresh:
+                self._add(emp, added)
+            self._merge_keys(added, dropped)
+            self.version = directory.version
+        return len(fresh), len(stale)
+
+    def lookup(self, term: str) -> Set[str]:
+        """Ids of employees with any indexed field starting with ``term``."""
+        term = term.lower()
+        matches: Set[str] = set()
+        with self._lock:
+            keys = self._keys
+            i = bisect_left(keys, term)
+            while i < len(keys) and keys[i].startswith(term):
+                matches |= self._postings[keys[i]]
+                i += 1
+        return matches
+
+    def _add(self, emp: Employee, added: List[str]) -> None:
+        self._records[emp.id] = emp
+        for key in search_keys(emp):
+            posting = self._postings.get(key)
+            if posting is None:
+                self._postings[key] = {emp.id}
+                added.append(key)
+            else:
+                posting.add(emp.id)
+
+    def _remove(self, emp: Employee, dropped: List[str]) -> None:
+        del self._records[emp.id]
+        for key in search_keys(emp):
+            posting = self._postings[key]
+            posting.discard(emp.id)
+            if not posting:
+                del self._postings[key]
+                dropped.append(key)
+
+    def _merge_keys(self, added: List[str], dropped: List[str]) -> None:
+        # A handful of edits is cheapest as in-place insort/delete; a bulk
+        # load or mass edit is cheaper as one re-sort of the live keys.
+        if len(added) + len(dropped) > 64 and len(added) + len(dropped) > len(self._keys) // 16:
+            self._keys = sorted(self._postings)
+            return
+        for key in dropped:
+            i = bisect_left(self._keys, key)
+            if i < len(self._keys) and self._keys[i] == key and key not in self._postings:
+                del self._keys[i]
+        for key in added:
+            i = bisect_left(self._keys, key)
+            if i == len(self._keys) or self._keys[i] != key:
+                self._keys.insert(i, key)
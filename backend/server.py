@@ -1,41 +1,817 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import Body, Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from datetime import date
+from itertools import islice
+from typing import Optional
+import base64
+import binascii
+import logging
 import os
+import threading
+import time
+import uuid
+
+from attendance import AttendanceStore
+from changefeed import EVENT_STREAM, ChangeFeed
+from chat import ChatService, DirectoryAssistant, SessionStore, load_backend
+from bootstrap import SectionRegistry, parse_known
+from changelog import RUN_EPOCH, ChangeLog, delta
+from datasets import DatasetRegistry, NotModified, etag_matches, request_variant
+from directory import DirectoryStore
+from facets import ALL_SENTINELS, FacetIndex, attach as attach_facets, popcount
+from fuzzy_search import TrigramIndex
+from hierarchy import OrgGraph
+from images import MAX_UPLOAD_BYTES, VARIANT_MEDIA_TYPE, ImageStore, initials_svg
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Metric, MetricsMiddleware, MetricsRegistry
+from meeting_rooms import BookingConflict, MeetingRooms, parse_time
+from pagination import ndjson_response, wants_ndjson
+from policy_search import PolicyIndex
+from profiling import COLLAPSED_CONTENT_TYPE, ProfilingMiddleware, RequestProfiler, span
+from record_store import RecordStore, timestamp
+from search_index import PrefixIndex
+from static_assets import PrecompressedFiles
+from taxonomy import Taxonomy
+from work_calendar import WorkCalendar
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+boot_started = time.perf_counter()
 
 app = FastAPI()
+# Opt-in: X-Profile: $PROFILE_TOKEN samples one request's stacks, and
+# requests slower than $SLOW_REQUEST_MS are logged with their span timings.
+slow_ms = os.environ.get("SLOW_REQUEST_MS")
+profiler = RequestProfiler(os.environ.get("PROFILE_TOKEN"), float(slow_ms) if slow_ms else None,
+                           interval=float(os.environ.get("PROFILE_INTERVAL_MS", "5")) / 1e3)
+if profiler.enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+# Per-route request counts, latency and size histograms; see /metrics.
+metrics = MetricsRegistry()
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Path to your React build folder (also holds the Excel workbooks)
+frontend_path = os.path.join(os.path.dirname(__file__), "build")
+
+# Compiled snapshots of the parsed workbooks; startup maps these instead of
+# re-parsing the Excel files when their hashes are unchanged.
+snapshot_dir = os.environ.get("SNAPSHOT_DIR", os.path.join(os.path.dirname(__file__), ".snapshots"))
+
+# Canonical department/location values and the aliases that map onto them.
+taxonomy = Taxonomy.load(os.environ.get("TAXONOMY_PATH", os.path.join(os.path.dirname(__file__), "taxonomy.json")))
+employee_store = DirectoryStore(
+    os.environ.get("EMPLOYEE_DIRECTORY_PATH", os.path.join(frontend_path, "employee_directory.xlsx")),
+    snapshot_dir=snapshot_dir,
+    taxonomy=taxonomy,
+)
+attendance_store = AttendanceStore(
+    os.environ.get("ATTENDANCE_DATA_PATH", os.path.join(frontend_path, "attendance_data.xlsx")),
+    snapshot_dir=snapshot_dir,
+)
+# News, tasks, alerts, hierarchy edits...: write-ahead logged on local disk.
+record_store = RecordStore(os.environ.get("RECORD_STORE_DIR", os.path.join(os.path.dirname(__file__), "data")))
+# (collection, id prefix) as used by dataService.
+COLLECTIONS = {"news": "news", "tasks": "task", "knowledge": "knowledge", "help": "help",
+               "workflows": "workflow", "alerts": "alert"}
+for name, prefix in COLLECTIONS.items():
+    record_store.collection(name, prefix)
+# Manual reporting edits, keyed by employee id; they override the workbook.
+hierarchy_edits = record_store.collection("hierarchy", "hier")
+# Uploaded profile photos: content-addressed files plus employee id -> hash.
+image_store = ImageStore(os.environ.get("IMAGE_STORE_DIR", os.path.join(os.path.dirname(__file__), "data", "images")))
+employee_images = record_store.collection("employee_images", "img")
+
+def employee_dict(emp) -> dict:
+    image = employee_images.get(emp.id)
+    return emp.to_dict(f"/api/images/{image['hash']}/150") if image else emp.to_dict()
+
+def org_graph(directory=None):
+    directory = directory or employee_store.current()
+    overrides = {edit["employeeId"]: edit.get("reportsTo") for edit in hierarchy_edits.list()}
+    return OrgGraph.of(directory, overrides, hierarchy_edits.version)
+
+employee_index = PrefixIndex()
+employee_store.add_listener(employee_index.sync)
+fuzzy_index = TrigramIndex()
+employee_store.add_listener(fuzzy_index.sync)
+employee_store.add_listener(attach_facets)
+employee_store.add_listener(org_graph)
+# Bookings survive restarts; finished ones are dropped at startup.
+meeting_rooms = MeetingRooms(bookings=record_store.collection("meeting_room_bookings", "booking"))
+# Policy PDFs, served statically from the build folder; text cached with the snapshots.
+policy_index = PolicyIndex(os.environ.get("POLICY_DIR", os.path.join(frontend_path, "company policies")),
+                           cache_dir=snapshot_dir)
+# Working days, from the holiday lists among those PDFs.
+work_calendar = WorkCalendar()
+
+# ---------- Dataset versions / conditional GET ----------
+datasets = DatasetRegistry()
+datasets.register("employees", refresh=employee_store.current)
+datasets.register("hierarchy", refresh=employee_store.current)
+datasets.register("attendance", refresh=attendance_store.current)
+employee_store.add_listener(
+    lambda directory: datasets.update("employees", f"{directory.source_hash}:{employee_images.version}"))
+employee_store.add_listener(
+    lambda directory: datasets.update("hierarchy", f"{directory.source_hash}:{hierarchy_edits.version}"))
+attendance_store.add_listener(lambda table: datasets.update("attendance", table.source_hash))
+
+def holiday_calendar() -> WorkCalendar:
+    if work_calendar.sync(policy_index.current()):
+        datasets.update("calendar", ",".join(sorted(work_calendar.sources.values())))
+    return work_calendar
+
+datasets.register("calendar", refresh=holiday_calendar)
+# Occupancy also changes with the clock, at the next booking start or end.
+datasets.register("meetingRooms", refresh=lambda: datasets.update(
+    "meetingRooms", f"{meeting_rooms.version}:{meeting_rooms.next_change()}"))
+for name in COLLECTIONS:
+    datasets.register(name, refresh=lambda name=name: datasets.update(
+        name, str(record_store.collections[name].version)))
+
+# Set once the startup hook has loaded every store; /health?ready=1 reports it.
+stores_warmed = threading.Event()
+
+@app.on_event("startup")
+def warm_stores():
+    """Load every store before the first request and report where the time went."""
+    for store in (employee_store, attendance_store):
+        generation = store.current()
+        logger.info("Startup: %s ready (%d records from %s in %.3fs)", store.description,
+                    len(generation), generation.loaded_from, generation.load_seconds)
+    started = time.perf_counter()
+    policy_index.current()
+    logger.info("Startup: policy index ready (%d documents in %.3fs)", len(policy_index.documents),
+                time.perf_counter() - started)
+    logger.info("Startup: holiday lists for %s", holiday_calendar().listed_years)
+    logger.info("Startup: ready in %.3fs", time.perf_counter() - boot_started)
+    stores_warmed.set()
+
+@app.on_event("shutdown")
+def close_record_store():
+    image_store.close()
+    record_store.close()
+
+# ---------- Change feed / delta sync ----------
+changes = ChangeFeed()
+change_logs = {name: ChangeLog() for name in ("employees", "hierarchy", "attendance", "meetingRooms", *COLLECTIONS)}
+
+def publish(name: str, version: int, ids=None):
+    change_logs[name].record(version, ids)
+    changes.publish(name, version, ids)
+
+def relationship_map(directory):
+    return {rel["employeeId"]: rel["reportsTo"] for rel in org_graph(directory).relationships()}
+
+def publish_directory(directory):
+    # Listeners run before the new generation is published.
+    previous = employee_store.published
+    employees = hierarchy = None  # first load: everything is new
+    if previous.version:
+        employees = directory.changed_ids(previous)
+        old, new = relationship_map(previous), relationship_map(directory)
+        hierarchy = {emp_id for emp_id in old.keys() | new.keys() if old.get(emp_id) != new.get(emp_id)}
+    publish("employees", datasets["employees"].version, employees)
+    publish("hierarchy", datasets["hierarchy"].version, hierarchy)
+
+employee_store.add_listener(publish_directory)
+# Attendance rows have no stable ids, so every reload is a full change.
+attendance_store.add_listener(lambda table: publish("attendance", datasets["attendance"].version))
+meeting_rooms.add_listener(lambda version, room_ids: publish("meetingRooms", version, room_ids))
+publish("meetingRooms", meeting_rooms.version)
+
+def publish_hierarchy_edit(version, employee_ids):
+    directory = employee_store.current()
+    datasets.update("hierarchy", f"{directory.source_hash}:{version}")
+    publish("hierarchy", datasets["hierarchy"].version, employee_ids)
+
+hierarchy_edits.add_listener(publish_hierarchy_edit)
+
+def publish_image_change(version, employee_ids):
+    directory = employee_store.current()
+    datasets.update("employees", f"{directory.source_hash}:{version}")
+    publish("employees", datasets["employees"].version, employee_ids)
+
+employee_images.add_listener(publish_image_change)
+for name in COLLECTIONS:
+    # Collection versions survive restarts, so the log starts at the stored one.
+    collection = record_store.collections[name]
+    publish(name, collection.version)
+    collection.add_listener(lambda version, ids, name=name: publish(name, version, ids))
+
+# ---------- Bootstrap sections ----------
+sections = SectionRegistry(epoch=RUN_EPOCH)
+
+def dataset_version(name: str):
+    def version() -> int:
+        dataset = datasets[name]
+        dataset.refresh()
+        return dataset.version
+    return version
+
+def all_attendance():
+    table = attendance_store.current()
+    return list(table.records(table.ordered(table.select())))
+
+sections.register("employees", dataset_version("employees"),
+                  lambda: [employee_dict(emp) for emp in employee_store.current().employees])
+sections.register("hierarchy", dataset_version("hierarchy"), lambda: org_graph().relationships())
+sections.register("attendance", dataset_version("attendance"), all_attendance)
+# Versioned like the ETag: occupancy changes at booking starts and ends, too.
+sections.register("meetingRooms", dataset_version("meetingRooms"), meeting_rooms.list_rooms)
+for name, collection in record_store.collections.items():
+    if name in COLLECTIONS:
+        sections.register(name, lambda collection=collection: collection.version, collection.list)
+
+def conditional(*names: str):
+    """Dependency: strong ETag from dataset versions; short-circuits with 304 on a match."""
+    def dependency(request: Request, response: Response) -> str:
+        etag = datasets.etag(names, request_variant(request))
+        if etag_matches(request, etag):
+            raise NotModified(etag)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        return etag
+    return dependency
+
+@app.exception_handler(NotModified)
+async def not_modified_handler(request: Request, exc: NotModified):
+    return Response(status_code=304, headers={"ETag": exc.etag, "Cache-Control": "no-cache"})
+
+def workbook_response(request: Request, dataset: str, path: str):
+    etag = datasets.etag([dataset])
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, headers=headers,
+                        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
 
 @app.get("/")
 def root():
     return {"message": "Frontend-Only Employee Directory API", "status": "running", "mode": "minimal"}
 
 @app.get("/health")
-def health_check():
-    return {"status": "healthy", "mode": "frontend-only"}
+def health_check(ready: bool = False):
+    """Liveness by default; with ``?ready=1``, 503 until the data has finished loading."""
+    if not ready:
+        return {"status": "healthy", "mode": "frontend-only"}
+    stores = {}
+    for store in (employee_store, attendance_store):
+        generation = store.published
+        stores[store.description] = {"loaded": generation.version > 0, "version": generation.version,
+                                     "records": len(generation), "loadedFrom": generation.loaded_from}
+    loaded = stores_warmed.is_set() and employee_store.published.version > 0
+    return JSONResponse({"status": "ready" if loaded else "loading", "startupComplete": stores_warmed.is_set(),
+                         "stores": stores}, status_code=200 if loaded else 503)
 
 @app.get("/api/employees")
-def get_employees():
-    return {"message": "Data is now managed by frontend", "redirect": "Use frontend dataService"}
+def get_employees(request: Request, etag: str = Depends(conditional("employees")), search: Optional[str] = None, department: Optional[str] = None,
+                  location: Optional[str] = None, grade: Optional[str] = None,
+                  limit: Optional[int] = Query(None, ge=1, le=1000), after: Optional[str] = None,
+                  since: Optional[str] = None, fuzzy: bool = False):
+    if since is not None:
+        directory = employee_store.current()
+        def lookup(emp_id):
+            emp = directory.get(emp_id)
+            return employee_dict(emp) if emp else None
+        return delta(change_logs["employees"], since, lookup, lambda: (employee_dict(emp) for emp in directory.employees))
+    facets = FacetIndex.of(employee_store.current())
+    with span("parse"):
+        department, location = canonical_filter("department", department), canonical_filter("location", location)
+    if fuzzy and search:
+        return fuzzy_employees(request, etag, facets, search, limit, after,
+                               department=department, location=location, grade=grade)
+    with span("lookup"):
+        base = facets.bitmap_of_ids(employee_index.lookup(search)) if search else None
+        selected = facets.filter(base, department=department, location=location, grade=grade)
+        total = popcount(selected)
+        if limit is None and not after:
+            employees, next_cursor = facets.iter_employees(selected), None
+        else:
+            try:
+                employees, next_cursor = facets.page(selected, after, limit or 1000)
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+    records = (employee_dict(emp) for emp in employees)
+    if wants_ndjson(request):
+        return ndjson_response(records, next_cursor, total, headers={"ETag": etag})
+    with span("serialize"):
+        records = list(records)
+    with span("lookup"):
+        counts = facets.counts(selected)
+    return {"employees": records, "total": total, "facets": counts, "nextCursor": next_cursor}
+
+def canonical_filter(field: str, value: Optional[str]) -> Optional[str]:
+    """Filters accept any spelling the taxonomy maps, e.g. ?department=Human%20Resource."""
+    if not value or value in ALL_SENTINELS:
+        return value
+    return taxonomy.canonical(field, value)
+
+def fuzzy_employees(request: Request, etag: str, facets: FacetIndex, search: str, limit: Optional[int],
+                    after: Optional[str], **filters: Optional[str]):
+    """Typo-tolerant name matches, best first (ranked, so no cursors)."""
+    if after:
+        raise HTTPException(status_code=400, detail="Cursors are not supported with fuzzy search")
+    directory = facets.directory
+    with span("lookup"):
+        ranked = [(directory.get(emp_id), score) for emp_id, score in fuzzy_index.search(search)]
+        ranked = [(emp, score) for emp, score in ranked if emp is not None]
+        found = facets.bitmap_of_ids(emp.id for emp, _ in ranked)
+        selected = facets.filter(found, **filters)
+        total = popcount(selected)
+        # Filter and cut the page from the ranking first; only the page is serialised.
+        positions = directory.positions
+        matching = iter(ranked) if selected == found else \
+            ((emp, score) for emp, score in ranked if selected >> positions[emp.id] & 1)
+        page = list(islice(matching, limit)) if limit else list(matching)
+    with span("serialize"):
+        hits = [dict(employee_dict(emp), matchScore=score) for emp, score in page]
+    if wants_ndjson(request):
+        return ndjson_response(iter(hits), None, total, headers={"ETag": etag})
+    with span("lookup"):
+        counts = facets.counts(selected)
+    return {"employees": hits, "total": total, "facets": counts, "nextCursor": None}
+
+@app.post("/api/refresh-excel")
+def refresh_excel():
+    employee_store.refresh(force=True)
+    return {"message": "Data refreshed", "count": len(employee_store.current())}
+
+def facet_listing(field: str):
+    counts = FacetIndex.of(employee_store.current()).counts()[field]
+    return [{"name": name, "count": counts[name]} for name in sorted(counts)]
 
-@app.get("/api/departments")
+@app.get("/api/departments", dependencies=[Depends(conditional("employees"))])
 def get_departments():
-    return {"message": "Data is now managed by frontend", "redirect": "Use frontend dataService"}
+    return {"departments": facet_listing("department")}
 
-@app.get("/api/locations")
+@app.get("/api/locations", dependencies=[Depends(conditional("employees"))])
 def get_locations():
-    return {"message": "Data is now managed by frontend", "redirect": "Use frontend dataService"}
+    return {"locations": facet_listing("location")}
+
+@app.get("/api/taxonomy", dependencies=[Depends(conditional("employees"))])
+def get_taxonomy():
+    directory = employee_store.current()
+    return taxonomy.report(directory.columns, directory.unmapped)
+
+def org_position(graph: OrgGraph, employee_id: str) -> int:
+    position = graph.position(employee_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail=f"Employee {employee_id} not found")
+    return position
+
+@app.get("/api/hierarchy", dependencies=[Depends(conditional("hierarchy"))])
+def get_hierarchy(since: Optional[str] = None):
+    relationships = org_graph().relationships()
+    if since is None:
+        return relationships
+    by_id = {rel["employeeId"]: rel for rel in relationships}
+    return delta(change_logs["hierarchy"], since, by_id.get, lambda: relationships)
+
+@app.get("/api/hierarchy/edits")
+def get_hierarchy_edits():
+    return hierarchy_edits.list()
+
+@app.post("/api/hierarchy")
+def create_hierarchy(body: dict = Body(...)):
+    """Override an employee's manager; ``reportsTo: null`` detaches them."""
+    directory = employee_store.current()
+    employee_id, reports_to = body.get("employeeId"), body.get("reportsTo")
+    if not employee_id or directory.get(employee_id) is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    if reports_to is not None and directory.get(reports_to) is None:
+        raise HTTPException(status_code=404, detail="Manager not found")
+    if reports_to == employee_id:
+        raise HTTPException(status_code=400, detail="An employee cannot report to themselves")
+    return hierarchy_edits.create({"employeeId": employee_id, "reportsTo": reports_to}, record_id=employee_id)
+
+@app.delete("/api/hierarchy/clear")
+def clear_hierarchy():
+    hierarchy_edits.clear()
+    return {"message": "All hierarchy relationships cleared"}
+
+@app.delete("/api/hierarchy/{employee_id}")
+def delete_hierarchy(employee_id: str):
+    try:
+        hierarchy_edits.delete(employee_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Hierarchy relationship not found")
+    return {"message": "Hierarchy relationship deleted"}
+
+@app.get("/api/hierarchy/report", dependencies=[Depends(conditional("hierarchy"))])
+def get_hierarchy_report():
+    return org_graph().report()
+
+# Chain entries are employee records, profile images included.
+@app.get("/api/hierarchy/{employee_id}/chain", dependencies=[Depends(conditional("hierarchy", "employees"))])
+def get_chain_of_command(employee_id: str):
+    graph = org_graph()
+    employees = graph.directory.employees
+    with span("lookup"):
+        chain = graph.chain(org_position(graph, employee_id))
+    with span("serialize"):
+        return [employee_dict(employees[p]) for p in chain]
+
+@app.get("/api/hierarchy/{employee_id}/headcount", dependencies=[Depends(conditional("hierarchy"))])
+def get_headcount(employee_id: str):
+    graph = org_graph()
+    position = org_position(graph, employee_id)
+    return {
+        "employeeId": employee_id,
+        "directReports": len(graph.children[position]),
+        "headcount": graph.headcount(position),
+        "depth": graph.depth[position],
+    }
+
+@app.get("/api/hierarchy/{employee_id}/subtree", dependencies=[Depends(conditional("hierarchy"))])
+def get_subtree(employee_id: str, depth: int = Query(1, ge=0, le=20),
+                limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None):
+    directory = employee_store.current()
+    graph = org_graph(directory)
+    try:
+        with span("lookup"):
+            tree = graph.subtree(org_position(graph, employee_id), depth, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"version": directory.version, "node": tree}
+
+@app.get("/api/hierarchy/{manager_id}/contains/{employee_id}", dependencies=[Depends(conditional("hierarchy"))])
+def get_in_org(manager_id: str, employee_id: str):
+    graph = org_graph()
+    contains = graph.contains(org_position(graph, manager_id), org_position(graph, employee_id))
+    return {"managerId": manager_id, "employeeId": employee_id, "contains": contains}
+
+@app.get("/api/attendance")
+def get_attendance(request: Request, etag: str = Depends(conditional("attendance")), search: Optional[str] = None, employee_id: Optional[str] = None,
+                   start: Optional[date] = Query(None, alias="from"),
+                   end: Optional[date] = Query(None, alias="to"),
+                   limit: Optional[int] = Query(None, ge=1, le=5000), after: Optional[str] = None,
+                   since: Optional[str] = None):
+    table = attendance_store.current()
+    if since is not None:
+        return delta(change_logs["attendance"], since, lambda _: None,
+                     lambda: table.records(table.ordered(table.select())))
+    with span("lookup"):
+        mask = table.select(search, start, end, employee_id)
+        total = int(mask.sum())
+        if limit is None and not after:
+            rows, next_cursor = table.ordered(mask), None
+        else:
+            try:
+                rows, next_cursor = table.page(mask, after, limit or 5000)
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+    records = table.records(rows)
+    if wants_ndjson(request):
+        return ndjson_response(records, next_cursor, total, headers={"ETag": etag})
+    with span("serialize"):
+        records = list(records)
+    return {"records": records, "total": total, "nextCursor": next_cursor}
+
+@app.get("/api/attendance/summary", dependencies=[Depends(conditional("attendance", "employees", "calendar"))])
+def get_attendance_summary(start: Optional[date] = Query(None, alias="from"),
+                           end: Optional[date] = Query(None, alias="to"),
+                           group_by: str = "employee"):
+    try:
+        with span("lookup"):
+            return attendance_store.current().summary(start, end, group_by, employee_store.current(),
+                                                      holiday_calendar())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@app.get("/api/calendar/working-days", dependencies=[Depends(conditional("calendar", "employees"))])
+def get_working_days(start: date = Query(..., alias="from"), end: date = Query(..., alias="to"),
+                     location: Optional[str] = None):
+    if location:
+        location = canonical_filter("location", location)
+        if location not in FacetIndex.of(employee_store.current()).columns["location"].lookup:
+            raise HTTPException(status_code=404, detail=f"Location {location} not found")
+    try:
+        return holiday_calendar().summary(start, end, location)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@app.get("/api/policies")
+def get_policies():
+    return policy_index.current().listing()
+
+@app.get("/api/policies/search")
+def search_policies(q: str = Query(..., min_length=1, max_length=200), limit: int = Query(10, ge=1, le=50)):
+    policies = policy_index.current()
+    with span("lookup"):
+        return policies.search(q, limit)
+
+@app.get("/api/versions")
+def get_versions():
+    return datasets.versions()
+
+@app.get("/api/bootstrap")
+def bootstrap(include: Optional[str] = None, known: Optional[str] = None, epoch: Optional[str] = None):
+    """Startup collections in one response; ``known=employees:3,...`` skips sections the client has.
+
+    Versions restart with the server, so ``known`` from another run (``epoch``) is ignored.
+    """
+    names = [name for name in (include or "").split(",") if name] or sections.names()
+    if epoch is not None and epoch != RUN_EPOCH:
+        known = None
+    try:
+        with span("parse"):
+            known = parse_known(known)
+        with span("serialize"):
+            body = sections.assemble(names, known)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-cache"})
+
+@app.get("/api/changes")
+def change_stream(types: Optional[str] = None):
+    """Server-sent events: a ``versions`` event, then one ``change`` event per (coalesced) update."""
+    wanted = [name for name in (types or "").split(",") if name]
+    return StreamingResponse(changes.stream(wanted or None), media_type=EVENT_STREAM,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.get("/api/stats")
 def get_stats():
     return {"message": "Data is now managed by frontend", "redirect": "Use frontend dataService"}
 
-@app.get("/api/meeting-rooms")
-def get_meeting_rooms():
-    return {"message": "Meeting rooms API is now handled by frontend dataService", "redirect": "Use frontend dataService"}
+# ---------- Profile images ----------
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+def decode_image_url(image_url: str) -> bytes:
+    """Bytes of a ``data:image/...;base64,`` URL (the contract's ``imageUrl``)."""
+    header, _, payload = image_url.partition(",")
+    if not header.startswith("data:image/") or not header.endswith(";base64"):
+        raise ValueError("imageUrl must be a base64 data: URL")
+    try:
+        return base64.b64decode(payload, validate=True)
+    except binascii.Error:
+        raise ValueError("imageUrl is not valid base64")
+
+@app.put("/api/employees/{employee_id}/image")
+async def upload_employee_image(employee_id: str, request: Request):
+    """Accepts ``{"imageUrl": "data:image/..."}`` or a raw ``image/*`` body."""
+    # current() may re-read the workbook; keep that off the event loop.
+    if (await run_in_threadpool(employee_store.current)).get(employee_id) is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    # Base64 data URLs are a third larger than the image itself.
+    if int(request.headers.get("content-length") or 0) > 2 * MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
+    try:
+        if request.headers.get("content-type", "").startswith("image/"):
+            data = await request.body()
+        else:
+            body = await request.json()
+            if not isinstance(body, dict):
+                raise HTTPException(status_code=400, detail="Expected a JSON object with imageUrl")
+            data = decode_image_url(str(body.get("imageUrl") or ""))
+        if len(data) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Image is too large")
+        digest = await run_in_threadpool(image_store.put, data)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    current = employee_images.get(employee_id)
+    if current is None or current["hash"] != digest:
+        await run_in_threadpool(employee_images.create, {"hash": digest}, employee_id)
+    return {"employeeId": employee_id, "hash": digest, "profileImage": f"/api/images/{digest}/150"}
+
+@app.delete("/api/employees/{employee_id}/image")
+def delete_employee_image(employee_id: str):
+    try:
+        employee_images.delete(employee_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Employee has no profile image")
+    return {"message": "Profile image removed"}
+
+@app.get("/api/images/{digest}/{size}")
+def get_image(digest: str, size: int):
+    path = image_store.variant(digest, size)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(path, media_type=VARIANT_MEDIA_TYPE,
+                        headers={"Cache-Control": IMMUTABLE, "ETag": f'"{os.path.basename(path)}"'})
+
+@app.get("/api/placeholder/{width}/{height}")
+def get_placeholder(width: int, height: int, name: str = ""):
+    if not (1 <= width <= 1024 and 1 <= height <= 1024):
+        raise HTTPException(status_code=400, detail="Placeholder size must be between 1 and 1024")
+    return Response(initials_svg(width, height, name[:100]), media_type="image/svg+xml",
+                    headers={"Cache-Control": IMMUTABLE})
+
+# ---------- News, tasks, knowledge, help, workflows, alerts ----------
+ALERT_DEFAULTS = {"title": "Alert", "message": "", "type": "info", "priority": "normal", "isActive": True,
+                  "expiryDate": None, "createdBy": "admin"}
+
+def collection_routes(name: str, defaults: Optional[dict] = None):
+    collection = record_store.collections[name]
+    label = name.capitalize()
+
+    @app.get(f"/api/{name}", dependencies=[Depends(conditional(name))])
+    def list_records(since: Optional[str] = None):
+        if since is not None:
+            return delta(change_logs[name], since, collection.get, collection.list)
+        return collection.list()
+
+    @app.post(f"/api/{name}")
+    def create_record(body: dict = Body(...)):
+        return collection.create(dict(defaults or {}, **body))
+
+    @app.put(f"/api/{name}/{{record_id}}")
+    def update_record(record_id: str, body: dict = Body(...)):
+        try:
+            return collection.update(record_id, body)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"{label} item not found")
+
+    @app.delete(f"/api/{name}/{{record_id}}")
+    def delete_record(record_id: str):
+        try:
+            return collection.delete(record_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"{label} item not found")
+
+@app.get("/api/alerts/active")
+def get_active_alerts():
+    now = time.time()
+    def live(alert):
+        if not alert.get("isActive"):
+            return False
+        try:
+            return not alert.get("expiryDate") or parse_time(alert["expiryDate"]) > now
+        except ValueError:
+            return True
+    return [alert for alert in record_store.collections["alerts"].list() if live(alert)]
+
+@app.post("/api/alerts/{alert_id}/toggle")
+def toggle_alert(alert_id: str):
+    try:
+        return record_store.collections["alerts"].update(alert_id, lambda alert: {"isActive": not alert.get("isActive")})
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Alert not found")
+
+@app.post("/api/help/{help_id}/replies")
+def add_help_reply(help_id: str, body: dict = Body(...)):
+    reply = dict(body, id=f"reply_{uuid.uuid4().hex[:12]}", created_at=timestamp())
+    try:
+        record_store.collections["help"].update(help_id, lambda item: {"replies": item.get("replies", []) + [reply]})
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Help request not found")
+    return reply
+
+for name in COLLECTIONS:
+    collection_routes(name, ALERT_DEFAULTS if name == "alerts" else ({"replies": []} if name == "help" else None))
+
+# ---------- Meeting Rooms ----------
+class BookingRequest(BaseModel):
+    employee_id: str
+    employee_name: str = ""
+    start_time: str
+    end_time: str
+    purpose: str = ""
+
+def room_location(location: Optional[str]) -> Optional[str]:
+    """Room locations are taxonomy locations, so any mapped spelling (or "All Locations") works."""
+    location = canonical_filter("location", location)
+    return None if location in ALL_SENTINELS else location
+
+@app.get("/api/meeting-rooms", dependencies=[Depends(conditional("meetingRooms"))])
+def get_meeting_rooms(location: Optional[str] = None, floor: Optional[str] = None, status: Optional[str] = None,
+                      since: Optional[str] = None):
+    if since is not None:
+        return delta(change_logs["meetingRooms"], since,
+                     lambda room_id: meeting_rooms.room(room_id).to_dict() if room_id in meeting_rooms.rooms else None,
+                     meeting_rooms.list_rooms)
+    return meeting_rooms.list_rooms(room_location(location), floor, status)
+
+@app.get("/api/meeting-rooms/available")
+def get_available_rooms(start: str, end: str, min_capacity: int = Query(0, ge=0),
+                        location: Optional[str] = None, amenities: Optional[str] = None):
+    try:
+        return meeting_rooms.available(start, end, min_capacity, room_location(location), (amenities or "").split(","))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@app.get("/api/meeting-rooms/{room_id}/bookings")
+def get_room_bookings(room_id: str, start: Optional[str] = Query(None, alias="from"),
+                      end: Optional[str] = Query(None, alias="to")):
+    if room_id not in meeting_rooms.rooms:
+        raise HTTPException(status_code=404, detail="Meeting room not found")
+    try:
+        lower = parse_time(start) if start else time.time()
+        upper = parse_time(end) if end else float("inf")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return [booking.to_dict() for booking in meeting_rooms.room(room_id).between(lower, upper)]
 
 @app.post("/api/meeting-rooms/{room_id}/book")
-def book_meeting_room(room_id: str):
-    return {"message": f"Meeting room booking for {room_id} is now handled by frontend dataService", "redirect": "Use frontend dataService"}
+def book_meeting_room(room_id: str, body: BookingRequest):
+    try:
+        booking = meeting_rooms.book(room_id, body.employee_id, body.employee_name,
+                                     body.start_time, body.end_time, body.purpose)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Meeting room not found")
+    except BookingConflict as exc:
+        raise HTTPException(status_code=409, detail={"message": str(exc), "conflict": exc.booking.to_dict()})
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return booking.to_dict()
+
+@app.delete("/api/meeting-rooms/{room_id}/book")
+def cancel_meeting_room_booking(room_id: str, booking_id: Optional[str] = None):
+    try:
+        booking = meeting_rooms.cancel(room_id, booking_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Meeting room not found")
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return {"message": "Booking cancelled successfully", "room_name": booking.room_name, "booking": booking.to_dict()}
+
+# ---------- Chat ----------
+# Directory questions are answered in-process; everything else goes to the
+# backend named by CHAT_BACKEND ("module:attribute"), a local stub by default.
+chat = ChatService(DirectoryAssistant(employee_store.current, org_graph, employee_index, meeting_rooms),
+                   load_backend(os.environ.get("CHAT_BACKEND")), SessionStore())
+
+class ChatRequest(BaseModel):
+    session_id: str
+    message: str
+
+@app.post("/api/chat")
+def post_chat(request: ChatRequest):
+    try:
+        return chat.send(request.session_id, request.message).to_dict()
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@app.get("/api/chat/history/{session_id}")
+def get_chat_history(session_id: str):
+    return {"session_id": session_id, "messages": [message.to_dict() for message in chat.sessions.history(session_id)]}
+
+@app.delete("/api/chat/history/{session_id}")
+def clear_chat_history(session_id: str):
+    chat.sessions.clear(session_id)
+    return {"message": "Chat history cleared"}
+
+# ---------- Metrics ----------
+def engine_metrics():
+    """Gauges and counters read from the engines at scrape time."""
+    stores = (employee_store, attendance_store)
+    table = attendance_store.published
+    yield Metric("directory_dataset_version", "gauge", "Version of each dataset; bumps on every content change.",
+                 [({"dataset": name}, info["version"]) for name, info in datasets.versions().items()])
+    records = {"employees": len(employee_store.published), "attendance": len(table),
+               "policies": len(policy_index.documents), "holidays": len(work_calendar.holidays),
+               "meetingRooms": len(meeting_rooms.rooms)}
+    records.update((name, len(collection)) for name, collection in record_store.collections.items())
+    yield Metric("directory_records", "gauge", "Records held in memory.",
+                 [({"dataset": name}, count) for name, count in records.items()])
+    yield Metric("directory_store_load_seconds", "gauge",
+                 "Duration of the last reload of each data file, index builds included.",
+                 [({"store": store.description, "source": store.published.loaded_from}, store.published.load_seconds)
+                  for store in stores])
+    yield Metric("directory_index_build_seconds", "gauge", "Duration of each reload listener on the last reload.",
+                 [({"store": store.description, "listener": name}, seconds)
+                  for store in stores for name, seconds in store.listener_seconds.items()])
+    placeholders = initials_svg.cache_info()
+    caches = {"bootstrap": (sections.hits, sections.misses),
+              "attendanceSummary": (table.summary_hits, table.summary_misses),
+              "placeholderSvg": (placeholders.hits, placeholders.misses)}
+    yield Metric("directory_cache_hits_total", "counter", "Cache lookups answered from the cache.",
+                 [({"cache": name}, hits) for name, (hits, _) in caches.items()])
+    yield Metric("directory_cache_misses_total", "counter", "Cache lookups that had to build the value.",
+                 [({"cache": name}, misses) for name, (_, misses) in caches.items()])
+    yield Metric("directory_sse_subscribers", "gauge", "Open /api/changes streams.", [({}, len(changes))])
+    yield Metric("directory_chat_sessions", "gauge", "Chat sessions held in memory.", [({}, len(chat.sessions))])
+
+metrics.register(engine_metrics)
+
+@app.get("/metrics")
+def get_metrics():
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+# ---------- Profiling ----------
+def require_profile_token(request: Request):
+    """Debug routes need the profile token; without one configured they do not exist."""
+    if profiler.token is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not profiler.authorized(request.headers.raw):
+        raise HTTPException(status_code=403, detail="Profile token required")
+
+@app.get("/debug/profiles", dependencies=[Depends(require_profile_token)])
+def get_profiles():
+    return profiler.listing()
+
+@app.get("/debug/profiles/{profile_id}", dependencies=[Depends(require_profile_token)])
+def get_profile(profile_id: str):
+    """Collapsed stacks, one ``frame;frame;frame count`` line per stack: feed to flamegraph.pl or speedscope."""
+    profile = profiler.profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return Response(profile.collapsed(), media_type=COLLAPSED_CONTENT_TYPE)
+
+@app.get("/debug/slow-requests", dependencies=[Depends(require_profile_token)])
+def get_slow_requests():
+    return {"thresholdMs": profiler.slow_seconds * 1e3 if profiler.slow_seconds is not None else None,
+            "requests": profiler.slow_requests()}
 
 @app.get("/api/{path:path}")
 def catch_all_get(path: str):
@@ -46,17 +822,21 @@ def catch_all_post(path: str):
     return {"message": f"API endpoint /{path} is now handled by frontend dataService", "mode": "frontend-only", "redirect": "Use frontend dataService"}
 
 
-# ---------- React Frontend Serving ----------
-# Path to your React build folder
-frontend_path = os.path.join(os.path.dirname(__file__), "build")
+# ---------- Excel workbooks (fetched by the frontend dataService) ----------
+@app.get("/employee_directory.xlsx")
+def employee_workbook(request: Request):
+    return workbook_response(request, "employees", employee_store.path)
+
+@app.get("/attendance_data.xlsx")
+def attendance_workbook(request: Request):
+    return workbook_response(request, "attendance", attendance_store.path)
 
-# Serve static files (JS, CSS, images, etc.)
-app.mount("/", StaticFiles(directory=frontend_path, html=True), name="frontend")
 
-# Catch-all route to serve React index.html for client-side routing
-@app.get("/{full_path:path}")
-async def serve_react(full_path: str):
-    return FileResponse(os.path.join(frontend_path, "index.html"))
+# ---------- React Frontend Serving ----------
+# Serve static files (JS, CSS, images, etc.) with precompressed variants and
+# long-lived caching for hashed bundles; unknown routes fall back to
+# index.html for client-side routing.
+app.mount("/", PrecompressedFiles(frontend_path, sidecar_dir=os.environ.get("STATIC_SIDECAR_DIR")), name="frontend")
 
 
 if __name__ == "__main__":
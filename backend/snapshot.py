@@ -0,0 +1,153 @@
+"""Compiled binary snapshots of parsed data files.
+
+Parsing the Excel workbooks with openpyxl dominates cold start.  After the
+first successful parse each store writes a snapshot: a small header, a table
+of named sections, and the sections themselves as fixed-width little-endian
+arrays (strings go into a shared table of offsets + UTF-8 bytes).  Later
+startups memory-map the snapshot and wrap the sections with
+``numpy.frombuffer`` without copying.  The header records the SHA-256 of the
+source file, so a changed workbook simply misses and is re-parsed.
+
+Layout::
+
+    header   MAGIC | format version u32 | section count u32 | source sha256 (64 ascii)
+    entries  name (32 bytes) | numpy dtype str (4 bytes) | offset u64 | length u64
+    data     8-byte aligned sections
+"""
+
+import glob
+import logging
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"EDSNAP\x00\x01"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sII64s")
+ENTRY = struct.Struct("<32s4sQQ")
+
+NULL = -1  # string index meaning "no value" (e.g. an employee without a manager)
+
+
+def pack_strings(values: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Offsets (n + 1, uint64) and concatenated UTF-8 bytes for ``values``."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    if encoded:
+        np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+class StringTable:
+    """Deduplicating builder for a snapshot string table."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NULL
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def column(self, values: Iterable[Optional[str]]) -> np.ndarray:
+        return np.fromiter((self.add(value) for value in values), dtype=np.int32)
+
+    def sections(self, name: str) -> Dict[str, np.ndarray]:
+        offsets, data = pack_strings(self.values)
+        return {f"{name}.offsets": offsets, f"{name}.data": data}
+
+
+def write_snapshot(path: str, source_hash: str, sections: Dict[str, np.ndarray]) -> None:
+    """Atomically write ``sections`` to ``path``."""
+    names = list(sections)
+    offset = HEADER.size + ENTRY.size * len(names)
+    entries, blobs = [], []
+    for name in names:
+        array = np.ascontiguousarray(sections[name])
+        dtype = array.dtype.newbyteorder("<") if array.dtype.byteorder == ">" else array.dtype
+        offset += -offset % 8
+        data = array.astype(dtype, copy=False).tobytes()
+        entries.append(ENTRY.pack(name.encode(), dtype.str.encode(), offset, len(data)))
+        blobs.append((offset, data))
+        offset += len(data)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(names), source_hash.encode()))
+        for entry in entries:
+            fh.write(entry)
+        for position, data in blobs:
+            fh.write(b"\x00" * (position - fh.tell()))
+            fh.write(data)
+    os.replace(tmp, path)
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, source_hash = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a format {FORMAT_VERSION} snapshot")
+        self.source_hash = source_hash.decode()
+        self._sections: Dict[str, Tuple[str, int, int]] = {}
+        for i in range(count):
+            name, dtype, offset, length = ENTRY.unpack_from(self._map, HEADER.size + i * ENTRY.size)
+            self._sections[name.rstrip(b"\x00").decode()] = (dtype.rstrip(b"\x00").decode(), offset, length)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sections
+
+    def array(self, name: str) -> np.ndarray:
+        """Zero-copy array over the mapped file (kept alive by the array)."""
+        dtype, offset, length = self._sections[name]
+        dtype = np.dtype(dtype)
+        return np.frombuffer(self._map, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+
+    def strings(self, name: str) -> List[str]:
+        offsets = self.array(f"{name}.offsets").tolist()
+        _, start, length = self._sections[f"{name}.data"]
+        data = self._map[start:start + length]
+        return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+def snapshot_path(directory: str, kind: str, source_hash: str) -> str:
+    # The hash is part of the name so a new snapshot never has to replace a
+    # file that is still memory-mapped (which Windows refuses).
+    return os.path.join(directory, f"{kind}-{source_hash[:16]}.snap")
+
+
+def open_snapshot(directory: str, kind: str, source_hash: str) -> Optional[Snapshot]:
+    path = snapshot_path(directory, kind, source_hash)
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError, struct.error):
+        logger.warning("Ignoring unreadable snapshot %s", path)
+        return None
+    return snapshot if snapshot.source_hash == source_hash else None
+
+
+def prune_snapshots(directory: str, kind: str, keep: str) -> None:
+    """Best-effort removal of snapshots for older source versions."""
+    for path in glob.glob(os.path.join(directory, f"{kind}-*.snap")):
+        if os.path.abspath(path) != os.path.abspath(keep):
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # still mapped somewhere; the next prune will get it
@@ -0,0 +1,150 @@
+"""Hot-reloading of data files that back the API.
+
+``WatchedFile`` owns the current parsed generation of one file on disk.
+``current()`` costs one ``os.stat`` at most every ``check_interval`` seconds;
+a changed mtime triggers a hash check, and only a changed hash triggers a
+re-parse, so touching a file without editing it is free.  Subclasses provide
+``empty()`` and ``load()``; generations are expected to expose ``version``,
+``source_hash``, ``load_seconds``, ``loaded_from`` and a ``derived`` dict.
+
+Stores given a ``snapshot_dir`` that also implement ``to_snapshot()`` and
+``from_snapshot()`` are loaded from a memory-mapped binary snapshot (see
+``snapshot.py``) whenever one exists for the file's current hash.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from profiling import span
+from snapshot import open_snapshot, prune_snapshots, snapshot_path, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class WatchedFile:
+    description = "data file"
+    # Snapshot file prefix; None disables snapshots for the store.
+    snapshot_kind: Optional[str] = None
+
+    def __init__(self, path: str, check_interval: float = 1.0, snapshot_dir: Optional[str] = None):
+        self.path = path
+        self.check_interval = check_interval
+        self.snapshot_dir = snapshot_dir if self.snapshot_kind else None
+        self._lock = threading.Lock()
+        self._current = self.empty()
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._listeners: List[Callable] = []
+        # Seconds each listener (index build) took on the last reload, by name.
+        self.listener_seconds: Dict[str, float] = {}
+
+    def empty(self):
+        raise NotImplementedError
+
+    def load(self, source_hash: str, version: int):
+        """Parse ``self.path`` into a new generation."""
+        raise NotImplementedError
+
+    def to_snapshot(self, generation) -> Dict[str, object]:
+        """Sections (name -> 1-d numpy array) describing ``generation``."""
+        raise NotImplementedError
+
+    def from_snapshot(self, snapshot, version: int):
+        raise NotImplementedError
+
+    def _load(self, source_hash: str, version: int):
+        if self.snapshot_dir:
+            snapshot = open_snapshot(self.snapshot_dir, self.snapshot_kind, source_hash)
+            if snapshot is not None:
+                try:
+                    generation = self.from_snapshot(snapshot, version)
+                    generation.loaded_from = "snapshot"
+                    return generation
+                except Exception:
+                    logger.exception("Snapshot %s is unusable; parsing %s", snapshot.path, self.path)
+        generation = self.load(source_hash, version)
+        generation.loaded_from = "source"
+        if self.snapshot_dir:
+            path = snapshot_path(self.snapshot_dir, self.snapshot_kind, source_hash)
+            try:
+                write_snapshot(path, source_hash, self.to_snapshot(generation))
+                prune_snapshots(self.snapshot_dir, self.snapshot_kind, keep=path)
+            except OSError:
+                logger.exception("Could not write snapshot %s", path)
+        return generation
+
+    def add_listener(self, callback: Callable) -> None:
+        """Run ``callback(generation)`` for every new generation, before it is published.
+
+        The callback also runs immediately for the current generation so
+        derived indexes never start out empty.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+            if self._current.version:
+                callback(self._current)
+
+    @property
+    def published(self):
+        """The generation being served, without checking the file."""
+        return self._current
+
+    def current(self):
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            with span("io"):
+                self.refresh()
+        return self._current
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload the file if it changed; returns True when data was swapped."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            logger.warning("%s not found at %s", self.description.capitalize(), self.path)
+            return False
+        if not force and mtime == self._mtime:
+            return False
+        with self._lock:
+            if not force and mtime == self._mtime:
+                return False
+            source_hash = file_digest(self.path)
+            if not force and source_hash == self._current.source_hash:
+                self._mtime = mtime
+                return False
+            started = time.perf_counter()
+            try:
+                generation = self._load(source_hash, self._current.version + 1)
+            except Exception:
+                logger.exception("Failed to parse %s; keeping previous data", self.path)
+                return False
+            timings: Dict[str, float] = {}
+            for callback in self._listeners:
+                begun = time.perf_counter()
+                name = f"{callback.__module__}.{getattr(callback, '__qualname__', type(callback).__name__)}"
+                try:
+                    callback(generation)
+                except Exception:
+                    # One broken index must not keep the others (or the new data) from updating.
+                    logger.exception("Listener %s failed on %s %s", name, self.description, self.path)
+                timings[name] = timings.get(name, 0.0) + time.perf_counter() - begun
+            self.listener_seconds = timings
+            generation.load_seconds = time.perf_counter() - started
+            self._current = generation
+            self._mtime = mtime
+            logger.info("Loaded %s %s (%d records) from %s in %.3fs", self.description, self.path,
+                        len(generation), generation.loaded_from, generation.load_seconds)
+            return True
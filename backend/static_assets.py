@@ -0,0 +1,263 @@
+"""Static serving for the React build with precompressed sidecars.
+
+``PrecompressedFiles`` replaces the plain ``StaticFiles`` mount:
+
+* text assets get ``.gz`` (and ``.br`` when the ``brotli`` package is
+  installed) sidecars, built at startup or ahead of time with
+  ``python static_assets.py build``; requests negotiate them through
+  ``Accept-Encoding`` so nothing is compressed per request.  Sidecars sit
+  next to the files unless a separate ``sidecar_dir`` is given;
+* content-hashed files under ``static/`` (``main.f8e0194f.js``) are sent with
+  ``Cache-Control: public, max-age=31536000, immutable`` while ``index.html``
+  and other unhashed files are revalidated through a strong ETag;
+* bodies go out through the ASGI zero-copy extension when the server offers
+  it and in fixed-size chunks otherwise;
+* unknown paths without a file extension fall back to ``index.html`` for
+  client-side routing.
+
+The asset table is built at startup but not trusted blindly: every request
+costs one ``os.stat`` of the file it resolves to, and an entry whose size or
+mtime moved (a redeployed bundle, a re-published policy PDF) is rebuilt --
+digest, sidecars and all -- before it is served.  Files added later are
+picked up the same way and deleted ones drop out.
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import stat
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+
+try:
+    import brotli
+except ImportError:  # optional: gzip alone still covers every browser
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE = {".js", ".css", ".html", ".json", ".map", ".txt", ".svg", ".ico", ".xml"}
+MIN_COMPRESS_SIZE = 1024
+CHUNK_SIZE = 64 * 1024
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+_HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.")
+
+# Preferred order when a client accepts several encodings equally.
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def _compress(encoding: str, data: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class Asset:
+    __slots__ = ("path", "size", "signature", "etag", "content_type", "cache_control", "variants")
+
+    def __init__(self, path: str, relative: str, data: bytes, signature: Tuple[int, int] = (0, 0)):
+        self.path = path
+        self.size = len(data)
+        self.signature = signature  # (mtime_ns, size) the entry was built from
+        self.etag = hashlib.sha1(data).hexdigest()[:20]
+        content_type, _ = mimetypes.guess_type(path)
+        if content_type and (content_type.startswith("text/") or content_type.endswith("javascript")):
+            content_type += "; charset=utf-8"
+        self.content_type = content_type or "application/octet-stream"
+        hashed = relative.startswith("static/") and _HASHED_NAME.search(os.path.basename(relative))
+        self.cache_control = IMMUTABLE if hashed else REVALIDATE
+        # encoding -> (sidecar path, size)
+        self.variants: Dict[str, Tuple[str, int]] = {}
+
+
+def load_asset(path: str, relative: str, sidecar_dir: Optional[str] = None) -> Tuple[Asset, int]:
+    """Digest one file and (re)write its stale sidecars; returns the entry and the sidecars written."""
+    signature = _signature(os.stat(path))
+    with open(path, "rb") as fh:
+        data = fh.read()
+    asset = Asset(path, relative, data, signature)
+    written = 0
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE or len(data) < MIN_COMPRESS_SIZE:
+        return asset, written
+    for encoding, suffix in ENCODINGS:
+        if encoding == "br" and brotli is None:
+            continue
+        sidecar = (os.path.join(sidecar_dir, relative) if sidecar_dir else path) + suffix
+        stale = not os.path.exists(sidecar) or os.stat(sidecar).st_mtime_ns < signature[0]
+        if stale:
+            compressed = _compress(encoding, data)
+            if len(compressed) >= len(data) * 0.9:
+                if os.path.exists(sidecar):
+                    os.remove(sidecar)
+                continue
+            os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+            tmp = sidecar + ".tmp"
+            with open(tmp, "wb") as fh:
+                fh.write(compressed)
+            os.replace(tmp, sidecar)
+            written += 1
+        asset.variants[encoding] = (sidecar, os.path.getsize(sidecar))
+    return asset, written
+
+
+def _signature(info: os.stat_result) -> Tuple[int, int]:
+    return info.st_mtime_ns, info.st_size
+
+
+def _servable(name: str) -> bool:
+    return not name.endswith((".gz", ".br", ".tmp"))
+
+
+def build_sidecars(directory: str, sidecar_dir: Optional[str] = None) -> Dict[str, Asset]:
+    """Scan ``directory``, (re)writing stale compressed sidecars; returns the asset table."""
+    assets: Dict[str, Asset] = {}
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not _servable(name):
+                continue
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, directory).replace(os.sep, "/")
+            assets[relative], count = load_asset(path, relative, sidecar_dir)
+            written += count
+    logger.info("Static assets: %d files, %d compressed sidecars written", len(assets), written)
+    return assets
+
+
+def accepted_encodings(header: str) -> List[str]:
+    """Encodings from ``Accept-Encoding`` with q > 0, best first."""
+    weighted = []
+    for position, item in enumerate(header.split(",")):
+        parts = item.strip().split(";")
+        name = parts[0].strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            weighted.append((-quality, position, name))
+    return [name for _, _, name in sorted(weighted)]
+
+
+class PrecompressedFiles:
+    """ASGI app serving a React build directory."""
+
+    def __init__(self, directory: str, index: str = "index.html", sidecar_dir: Optional[str] = None):
+        self.directory = os.path.abspath(directory)
+        self.index = index
+        self.sidecar_dir = sidecar_dir
+        self.assets = build_sidecars(directory, sidecar_dir) if os.path.isdir(directory) else {}
+
+    async def lookup(self, path: str) -> Optional[Asset]:
+        relative = path.lstrip("/")
+        if relative == "" or relative.endswith("/"):
+            relative += self.index
+        asset = await self.current(relative)
+        if asset is None and "." not in os.path.basename(relative):
+            asset = await self.current(self.index)
+        return asset
+
+    async def current(self, relative: str) -> Optional[Asset]:
+        """The entry for ``relative``, rebuilt first if the file changed on disk since it was built."""
+        path = os.path.normpath(os.path.join(self.directory, relative))
+        if not path.startswith(self.directory + os.sep) or not _servable(path):
+            return None
+        relative = os.path.relpath(path, self.directory).replace(os.sep, "/")
+        try:
+            info = os.stat(path)
+        except OSError:
+            self.assets.pop(relative, None)
+            return None
+        if not stat.S_ISREG(info.st_mode):
+            return None
+        asset = self.assets.get(relative)
+        if asset is None or asset.signature != _signature(info):
+            asset, _ = await anyio.to_thread.run_sync(load_asset, path, relative, self.sidecar_dir)
+            self.assets[relative] = asset
+        return asset
+
+    async def __call__(self, scope, receive, send):
+        assert scope["type"] == "http"
+        method = scope["method"]
+        if method not in ("GET", "HEAD"):
+            await self._respond(send, 405, [(b"allow", b"GET, HEAD")])
+            return
+        asset = await self.lookup(scope["path"])
+        if asset is None:
+            await self._respond(send, 404, [(b"content-type", b"text/plain")], b"Not Found")
+            return
+
+        request_headers = dict(scope["headers"])
+        path, size, etag, encoding = asset.path, asset.size, asset.etag, None
+        if asset.variants:
+            for name in accepted_encodings(request_headers.get(b"accept-encoding", b"").decode("latin-1")):
+                if name in asset.variants:
+                    encoding = name
+                    path, size = asset.variants[name]
+                    etag = f"{asset.etag}-{name}"
+                    break
+        headers = [
+            (b"etag", f'"{etag}"'.encode()),
+            (b"cache-control", asset.cache_control.encode()),
+            (b"content-type", asset.content_type.encode()),
+        ]
+        if asset.variants:
+            headers.append((b"vary", b"Accept-Encoding"))
+        if encoding:
+            headers.append((b"content-encoding", encoding.encode()))
+
+        if_none_match = request_headers.get(b"if-none-match", b"").decode("latin-1")
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        if f'"{etag}"' in candidates or "*" in candidates:
+            await self._respond(send, 304, headers)
+            return
+
+        headers.append((b"content-length", str(size).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        if method == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await self._send_file(scope, send, path, size)
+
+    @staticmethod
+    async def _respond(send, status: int, headers, body: bytes = b""):
+        await send({"type": "http.response.start", "status": status,
+                    "headers": headers + [(b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _send_file(scope, send, path: str, size: int):
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            # The server sendfile()s straight from the page cache.
+            with open(path, "rb") as fh:
+                await send({"type": "http.response.zerocopysend", "file": fh.fileno(), "count": size})
+            return
+        # Never more than the Content-Length already sent, even if the file grew meanwhile.
+        remaining = size
+        async with await anyio.open_file(path, "rb") as fh:
+            while True:
+                chunk = await fh.read(min(CHUNK_SIZE, remaining))
+                remaining -= len(chunk)
+                more = bool(chunk) and remaining > 0
+                await send({"type": "http.response.body", "body": chunk, "more_body": more})
+                if not more:
+                    break
+
+
+if __name__ == "__main__":
+    # Build-time precompression: python static_assets.py build
+    logging.basicConfig(level=logging.INFO)
+    build_sidecars(sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "build"))
@@ -0,0 +1,157 @@
+"""Canonical department and location values.
+
+The workbook is typed by hand, so one department shows up as "Human
+Resource" and "Human Resources", and one office as "62 Sales Gallery",
+"62 sales Gallery" and "Sales Gallery 62".  Each variant used to become its
+own filter option.  ``taxonomy.json`` lists the canonical values per field
+plus aliases for variants that are not just spelling noise.  At ingestion
+every raw value is resolved in this order:
+
+1. an alias or canonical value with the same *key* -- case-folded, with
+   punctuation dropped and the words sorted, so capitalisation, a trailing
+   full stop or word order never need an alias of their own;
+2. otherwise the value is kept as written and reported as unmapped, with
+   close canonical values suggested for the alias table.
+
+The resolved column is dictionary-encoded: a table of distinct values
+(each string object shared by every record that uses it) and one small
+integer code per record, which the facet index turns into bitmaps without
+hashing a string per record.  The raw column is encoded the same way first,
+so each distinct spelling is resolved once, and kept: snapshots store the
+raw spellings, and an edited alias table applies to them on the next load.
+"""
+
+import difflib
+import json
+import logging
+import os
+import re
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TAXONOMY_FIELDS = ("department", "location")
+WORDS = re.compile(r"[\w&/]+")
+
+
+def value_key(value: str) -> str:
+    """Comparison key: case, punctuation, spacing and word order ignored."""
+    return " ".join(sorted(WORDS.findall(value.casefold())))
+
+
+def clean(value: str) -> str:
+    return " ".join(value.split())
+
+
+class Column(NamedTuple):
+    """A dictionary-encoded field: ``values[codes[position]]``."""
+
+    values: List[str]
+    codes: array
+
+
+def dictionary_encode(values: Iterable[str]) -> Column:
+    table: Dict[str, int] = {}
+    codes: List[int] = []
+    for value in values:
+        code = table.get(value)
+        if code is None:
+            code = table[value] = len(table)
+        codes.append(code)
+    return Column(list(table), array("H" if len(table) <= 0xFFFF else "I", codes))
+
+
+class Vocabulary:
+    def __init__(self, field: str, canonical: Iterable[str] = (), aliases: Optional[Dict[str, str]] = None):
+        self.field = field
+        self.canonical: List[str] = [clean(value) for value in canonical]
+        self.aliases: Dict[str, str] = dict(aliases or {})
+        self._by_key: Dict[str, str] = {value_key(value): value for value in self.canonical}
+        known = set(self.canonical)
+        for alias, target in self.aliases.items():
+            if target not in known:
+                raise ValueError(f"{field} alias {alias!r} points at {target!r}, which is not canonical")
+            self._by_key[value_key(alias)] = target
+        # Without a configured vocabulary every value stands for itself.
+        self.open = not self._by_key
+
+    def resolve(self, raw: str) -> Optional[str]:
+        """The canonical value for ``raw``, or None when it is unmapped.
+
+        Not memoised: query parameters reach this too, and a cache keyed by
+        them would grow with whatever clients send.  Loads resolve each
+        distinct spelling once (``Taxonomy.encode_column``).
+        """
+        value = self._by_key.get(value_key(raw))
+        if value is None and self.open:
+            value = clean(raw)
+        return value
+
+    def suggest(self, raw: str, limit: int = 3) -> List[str]:
+        keys = difflib.get_close_matches(value_key(raw), list(self._by_key), n=limit, cutoff=0.75)
+        return list(dict.fromkeys(self._by_key[key] for key in keys))
+
+
+class Taxonomy:
+    def __init__(self, vocabularies: Optional[Dict[str, Vocabulary]] = None):
+        self.vocabularies = {field: Vocabulary(field) for field in TAXONOMY_FIELDS}
+        self.vocabularies.update(vocabularies or {})
+
+    @classmethod
+    def load(cls, path: str) -> "Taxonomy":
+        """Read ``{field: {"canonical": [...], "aliases": {raw: canonical}}}``; a missing file maps nothing."""
+        if not os.path.exists(path):
+            logger.warning("Taxonomy %s not found; department and location values are used as written", path)
+            return cls()
+        with open(path, encoding="utf-8") as fh:
+            config = json.load(fh)
+        return cls({field: Vocabulary(field, spec.get("canonical", ()), spec.get("aliases"))
+                    for field, spec in config.items()})
+
+    def canonical(self, field: str, raw: str) -> str:
+        """``raw`` resolved for ``field``; unmapped values come back cleaned but otherwise as written."""
+        vocabulary = self.vocabularies.get(field)
+        resolved = vocabulary.resolve(raw) if vocabulary else None
+        return resolved if resolved is not None else clean(raw)
+
+    def encode(self, field: str, raw_values: Iterable[str]) -> Tuple[Column, Counter]:
+        """Dictionary-encode a column of raw values; also returns the unmapped raw values and their counts."""
+        return self.encode_column(field, dictionary_encode(raw_values))
+
+    def encode_column(self, field: str, raw: Column) -> Tuple[Column, Counter]:
+        """``encode`` for an already dictionary-encoded raw column: one resolve per distinct spelling."""
+        vocabulary = self.vocabularies[field]
+        values: List[str] = []
+        codes_by_value: Dict[str, int] = {}
+        translate: List[int] = []  # raw code -> canonical code
+        missing: List[bool] = []
+        for value in raw.values:
+            resolved = vocabulary.resolve(value) if value else ""
+            missing.append(resolved is None)
+            if resolved is None:
+                resolved = clean(value)
+            code = codes_by_value.get(resolved)
+            if code is None:
+                code = codes_by_value[resolved] = len(values)
+                values.append(resolved)
+            translate.append(code)
+        unmapped = Counter({raw.values[code]: count for code, count in Counter(raw.codes).items() if missing[code]})
+        codes = array("H" if len(values) <= 0xFFFF else "I", [translate[code] for code in raw.codes])
+        return Column(values, codes), unmapped
+
+    def report(self, columns: Dict[str, Column], unmapped: Dict[str, Counter]) -> Dict[str, dict]:
+        """Per field: value counts, the alias table, and unmapped values with suggestions."""
+        report = {}
+        for field, vocabulary in self.vocabularies.items():
+            column = columns.get(field)
+            counts = Counter(column.codes) if column else Counter()
+            report[field] = {
+                "values": [{"value": value, "code": code, "count": counts[code]}
+                           for code, value in enumerate(column.values if column else ()) if value],
+                "aliases": vocabulary.aliases,
+                "unmapped": [{"value": raw, "count": count, "suggestions": vocabulary.suggest(raw)}
+                             for raw, count in unmapped.get(field, Counter()).most_common()],
+            }
+        return report
@@ -0,0 +1,192 @@
+"""Working-day calendar built from the holiday-list PDFs.
+
+The holiday lists only exist as PDFs among the company policies ("Holiday
+List - 2023", "List of Holidays -2025"...).  Their text already comes out of
+``PolicyIndex``, extracted and cached once per file hash; this module parses
+the holiday rows out of that text, again once per hash, so a re-published
+list is picked up on the policy index's next scan and nothing else is
+re-read.
+
+Weekly offs follow the Business Hours Attendance Policy: Sundays and the
+2nd and 4th Saturdays.  Each year is precomputed as a bitset of its working
+days plus a prefix sum over it, so the number of working days between any
+two dates is two array lookups per calendar year spanned, never a loop over
+the days.  Years are built on first use and rebuilt only when the holiday
+lists change.
+"""
+
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+# Saturdays of the month (1-based) that are weekly offs; Sundays always are.
+OFF_SATURDAYS = (2, 4)
+# Hard limit on the span one query may cover.
+MAX_YEARS = 50
+
+HOLIDAY_ROW = re.compile(
+    r"\b\d{1,2}\s+(?P<name>[A-Za-z][A-Za-z .'/&-]*?)\s+"
+    r"(?P<day>\d{1,2})(?:st|nd|rd|th)?[\s-]*(?P<month>[A-Za-z]{3,9})\s*[\s,-]\s*(?P<year>\d{4}|\d{2})\s+"
+    r"(?P<weekday>Mon|Tues|Wednes|Thurs|Fri|Satur|Sun)day\b")
+
+
+class Holiday(NamedTuple):
+    day: date
+    name: str
+
+    def to_dict(self) -> dict:
+        return {"date": self.day.isoformat(), "name": self.name, "weekday": self.day.strftime("%A")}
+
+
+def parse_holidays(text: str) -> List[Holiday]:
+    """Holiday rows ("3 Holi 14th March,2025 Friday") found in a list's text.
+
+    Rows whose stated weekday does not match the date are skipped: the date
+    was either misread or misprinted, and neither should move a working day.
+    """
+    holidays = []
+    for match in HOLIDAY_ROW.finditer(text):
+        year = match["year"] if len(match["year"]) == 4 else f"20{match['year']}"
+        parsed = None
+        for pattern in ("%d %B %Y", "%d %b %Y"):
+            try:
+                parsed = datetime.strptime(f"{match['day']} {match['month']} {year}", pattern).date()
+                break
+            except ValueError:
+                continue
+        if parsed is None or not parsed.strftime("%A").startswith(match["weekday"]):
+            continue
+        holidays.append(Holiday(parsed, " ".join(match["name"].split())))
+    return holidays
+
+
+def is_holiday_list(title: str) -> bool:
+    return "holiday" in title.lower()
+
+
+class CalendarYear:
+    """Working days of one year: a bitset (bit ``i`` = day ``i`` of the year) and its prefix sum."""
+
+    __slots__ = ("year", "first", "bits", "prefix")
+
+    def __init__(self, year: int, holidays: List[date]):
+        days = np.arange(f"{year}-01-01", f"{year + 1}-01-01", dtype="datetime64[D]")
+        weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday; Monday = 0
+        week_of_month = (days - days.astype("datetime64[M]")).astype(np.int64) // 7 + 1
+        working = weekday < 5
+        working |= (weekday == 5) & ~np.isin(week_of_month, OFF_SATURDAYS)
+        self.year = year
+        self.first = date(year, 1, 1).toordinal()
+        working[[day.toordinal() - self.first for day in holidays]] = False
+        self.bits = np.packbits(working, bitorder="little")
+        self.prefix = np.zeros(len(days) + 1, dtype=np.int16)
+        np.cumsum(working, out=self.prefix[1:])
+
+    def is_working(self, day: date) -> bool:
+        offset = day.toordinal() - self.first
+        return bool(self.bits[offset >> 3] >> (offset & 7) & 1)
+
+    def count(self, start: date, end: date) -> int:
+        """Working days in ``[start, end]``, both within this year."""
+        return int(self.prefix[end.toordinal() - self.first + 1] - self.prefix[start.toordinal() - self.first])
+
+    @property
+    def total(self) -> int:
+        return int(self.prefix[-1])
+
+
+class WorkCalendar:
+    def __init__(self):
+        self.version = 0
+        self.holidays: List[Holiday] = []  # sorted by date
+        self.sources: Dict[str, str] = {}  # holiday list file name -> source hash
+        self._parsed: Dict[str, List[Holiday]] = {}  # source hash -> holidays
+        self._years: Dict[int, CalendarYear] = {}
+        self._synced = None
+        self._lock = threading.Lock()
+
+    def sync(self, policies) -> bool:
+        """Pick up holiday lists added, removed or edited in the ``PolicyIndex``; True if any were."""
+        if policies.version == self._synced:
+            return False
+        with self._lock:
+            documents = [doc for doc in policies.documents.values() if is_holiday_list(doc.title)]
+            sources = {doc.name: doc.source_hash for doc in documents}
+            self._synced = policies.version
+            if sources == self.sources:
+                return False
+            for doc in documents:
+                if doc.source_hash not in self._parsed:
+                    self._parsed[doc.source_hash] = parse_holidays(" ".join(doc.pages))
+            # Lists overlap (a re-issued year, a "proposed" list): one entry per date.
+            merged: Dict[date, str] = {}
+            for doc in sorted(documents, key=lambda doc: doc.name):
+                for holiday in self._parsed[doc.source_hash]:
+                    merged.setdefault(holiday.day, holiday.name)
+            self._parsed = {digest: self._parsed[digest] for digest in sources.values()}
+            self.holidays = [Holiday(day, name) for day, name in sorted(merged.items())]
+            self.sources = sources
+            self._years = {}
+            self.version += 1
+            return True
+
+    @property
+    def listed_years(self) -> List[int]:
+        """Years that have a holiday list; other years only know the weekly offs."""
+        return sorted({holiday.day.year for holiday in self.holidays})
+
+    def year(self, year: int) -> CalendarYear:
+        cached = self._years.get(year)
+        if cached is None:
+            with self._lock:
+                days = [h.day for h in self.holidays if h.day.year == year]
+                cached = self._years.setdefault(year, CalendarYear(year, days))
+        return cached
+
+    def is_working(self, day: date) -> bool:
+        return self.year(day.year).is_working(day)
+
+    def working_days(self, start: date, end: date) -> int:
+        """Working days in ``[start, end]`` (inclusive)."""
+        if end < start:
+            raise ValueError("'to' must not be before 'from'")
+        if end.year - start.year >= MAX_YEARS:
+            raise ValueError(f"Ranges are limited to {MAX_YEARS} years")
+        if start.year == end.year:
+            return self.year(start.year).count(start, end)
+        total = self.year(start.year).count(start, date(start.year, 12, 31))
+        total += sum(self.year(year).total for year in range(start.year + 1, end.year))
+        return total + self.year(end.year).count(date(end.year, 1, 1), end)
+
+    def holidays_between(self, start: date, end: date) -> List[Holiday]:
+        days = [holiday.day for holiday in self.holidays]
+        return self.holidays[bisect_left(days, start):bisect_right(days, end)]
+
+    def summary(self, start: date, end: date, location: Optional[str] = None) -> dict:
+        working = self.working_days(start, end)
+        holidays = self.holidays_between(start, end)
+        # Holidays that fall on a weekly off do not cost a working day.
+        closed = sum(1 for holiday in holidays if self._weekday_open(holiday.day))
+        calendar_days = end.toordinal() - start.toordinal() + 1
+        listed = set(self.listed_years)
+        return {
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "location": location,
+            "calendarDays": calendar_days,
+            "workingDays": working,
+            "weeklyOffs": calendar_days - working - closed,
+            "holidays": [holiday.to_dict() for holiday in holidays],
+            "yearsWithoutHolidayList": [year for year in range(start.year, end.year + 1) if year not in listed],
+            "version": self.version,
+        }
+
+    @staticmethod
+    def _weekday_open(day: date) -> bool:
+        """Whether ``day`` would be a working day if it were not a holiday."""
+        weekday = day.weekday()
+        return weekday < 5 or (weekday == 5 and (day.day - 1) // 7 + 1 not in OFF_SATURDAYS)
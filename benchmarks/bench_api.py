@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Latency and throughput of the API at synthetic org scale, with a regression gate.
+
+Usage: python benchmarks/bench_api.py [--sizes 10000,100000,1000000] [--requests 200]
+                                      [--output results.json] [--baseline baseline.json]
+                                      [--threshold 0.25] [--save-baseline baseline.json]
+
+Each size runs in a fresh interpreter: synthetic_org.materialize() writes
+the org and its attendance history as snapshots, the environment points
+server.py at them, and requests go through the ASGI app in-process
+(TestClient), so the numbers are the server's own cost without network or
+socket overhead.  Requests are sequential; throughput is requests per
+second of one client.
+
+With --baseline the run fails (exit status 1) when a scenario's p50 or p99
+is more than --threshold slower than the baseline's, ignoring differences
+under --floor-ms, which are timer noise on sub-millisecond endpoints.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.join(os.path.dirname(HERE), "backend")
+
+SEARCHES = ["vik", "sh", "ra", "kum", "am", "ne", "pr", "sa"]
+TYPOS = ["malhothra", "jyotsana", "kumr", "sharmaa", "agarwal"]
+ROOMS = ["ifc-11-001", "ifc-12-001", "ifc-14-001", "ifc-14-002", "ifc-14-003"]
+
+
+def scenarios(client, size, bootstrap_max):
+    """name -> (callable(i) -> response, request count cap or None, largest org size or None)."""
+    from synthetic_org import sample_ids
+
+    root, manager, leaf = sample_ids(size)
+    facets = client.get("/api/employees", params={"limit": 1}).json()["facets"]
+    departments = sorted(facets["department"], key=facets["department"].get, reverse=True)[:4]
+    locations = sorted(facets["location"], key=facets["location"].get, reverse=True)[:4]
+    slot = datetime(2031, 1, 6, 9, tzinfo=timezone.utc).timestamp()
+
+    def book(i):
+        start = slot + (i // len(ROOMS)) * 3600
+        body = {"employee_id": leaf, "employee_name": "Bench", "purpose": "benchmark",
+                "start_time": datetime.fromtimestamp(start, timezone.utc).isoformat(),
+                "end_time": datetime.fromtimestamp(start + 1800, timezone.utc).isoformat()}
+        return client.post(f"/api/meeting-rooms/{ROOMS[i % len(ROOMS)]}/book", json=body)
+
+    known = []
+
+    def bootstrap_known(i):
+        if not known:
+            versions = json.loads(client.get("/api/bootstrap").content)["versions"]
+            known.append(",".join(f"{name}:{version}" for name, version in versions.items()))
+        return client.get("/api/bootstrap", params={"known": known[0]})
+
+    return {
+        "search.prefix": (lambda i: client.get("/api/employees", params={
+            "search": SEARCHES[i % len(SEARCHES)], "limit": 50}), None, None),
+        "search.fuzzy": (lambda i: client.get("/api/employees", params={
+            "search": TYPOS[i % len(TYPOS)], "fuzzy": 1, "limit": 20}), None, None),
+        "facet.filter": (lambda i: client.get("/api/employees", params={
+            "department": departments[i % len(departments)], "location": locations[i % len(locations)],
+            "limit": 50}), None, None),
+        "facet.departments": (lambda i: client.get("/api/departments"), None, None),
+        "hierarchy.chain": (lambda i: client.get(f"/api/hierarchy/{leaf}/chain"), None, None),
+        "hierarchy.headcount": (lambda i: client.get(f"/api/hierarchy/{root}/headcount"), None, None),
+        "hierarchy.subtree": (lambda i: client.get(f"/api/hierarchy/{manager}/subtree",
+                                                   params={"depth": 2, "limit": 50}), None, None),
+        "attendance.summary": (lambda i: client.get("/api/attendance/summary",
+                                                    params={"group_by": "department"}), None, None),
+        "rooms.book": (book, None, None),
+        "rooms.available": (lambda i: client.get("/api/meeting-rooms/available", params={
+            "start": "2031-01-06T10:00:00Z", "end": "2031-01-06T11:00:00Z", "min_capacity": 4}), None, None),
+        # Bootstrap holds every section as one JSON fragment (~300 bytes per
+        # employee), so it is skipped past --bootstrap-max employees.
+        "bootstrap.known": (bootstrap_known, None, bootstrap_max),
+        "bootstrap.full": (lambda i: client.get("/api/bootstrap"), 20, bootstrap_max),
+    }
+
+
+def measure(call, requests, warmup):
+    for i in range(warmup):
+        call(i)
+    timings = []
+    started = time.perf_counter()
+    for i in range(warmup, warmup + requests):
+        begun = time.perf_counter()
+        response = call(i)
+        timings.append(time.perf_counter() - begun)
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    return {
+        "requests": requests,
+        "p50_ms": round(statistics.median(timings) * 1e3, 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1e3, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1e3, 3),
+        "rps": round(requests / elapsed, 1),
+    }
+
+
+def worker(args):
+    """Runs in the child interpreter: build the org, boot the server, measure every scenario."""
+    from synthetic_org import materialize
+
+    started = time.perf_counter()
+    env = materialize(args.size, args.data_dir, days=args.days, attendance_employees=args.attendance_employees)
+    generated = time.perf_counter() - started
+    scratch = tempfile.mkdtemp(prefix="bench-api-")
+    os.environ.update(env, RECORD_STORE_DIR=os.path.join(scratch, "records"),
+                      IMAGE_STORE_DIR=os.path.join(scratch, "images"),
+                      STATIC_SIDECAR_DIR=os.path.join(scratch, "sidecars"))
+    sys.path.insert(0, BACKEND)
+    os.chdir(BACKEND)
+
+    from fastapi.testclient import TestClient
+
+    started = time.perf_counter()
+    import server
+
+    with TestClient(server.app) as client:
+        ready = time.perf_counter() - started
+        results = {}
+        for name, (call, cap, max_size) in scenarios(client, args.size, args.bootstrap_max).items():
+            if args.only and not any(name.startswith(prefix) for prefix in args.only.split(",")):
+                continue
+            if max_size is not None and args.size > max_size:
+                continue
+            results[name] = measure(call, min(args.requests, cap or args.requests), args.warmup)
+    print(json.dumps({"size": args.size, "generate_s": round(generated, 3), "startup_s": round(ready, 3),
+                      "scenarios": results}))
+
+
+def run_size(args, size):
+    command = [sys.executable, os.path.abspath(__file__), "--worker", "--size", str(size),
+               "--requests", str(args.requests), "--warmup", str(args.warmup), "--days", str(args.days),
+               "--attendance-employees", str(args.attendance_employees), "--data-dir", args.data_dir,
+               "--bootstrap-max", str(args.bootstrap_max)]
+    if args.only:
+        command += ["--only", args.only]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def regressions(results, baseline, threshold, floor_ms):
+    """``(size, scenario, metric, baseline ms, current ms)`` for every metric over the threshold."""
+    found = []
+    for size, current in results["sizes"].items():
+        before = baseline.get("sizes", {}).get(size)
+        if before is None:
+            continue
+        for name, stats in current["scenarios"].items():
+            reference = before["scenarios"].get(name)
+            if reference is None:
+                continue
+            for metric in ("p50_ms", "p99_ms"):
+                if stats[metric] > reference[metric] * (1 + threshold) and \
+                        stats[metric] - reference[metric] > floor_ms:
+                    found.append((size, name, metric, reference[metric], stats[metric]))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--days", type=int, default=20, help="attendance history in working days")
+    parser.add_argument("--attendance-employees", type=int, default=20000)
+    parser.add_argument("--bootstrap-max", type=int, default=100000,
+                        help="largest org the bootstrap scenarios run against")
+    parser.add_argument("--only", help="comma-separated scenario prefixes, e.g. search,hierarchy")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "directory-bench"),
+                        help="generated orgs are cached here between runs")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--save-baseline", help="also write the results here")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, as a fraction")
+    parser.add_argument("--floor-ms", type=float, default=0.5)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+
+    results = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "requests": args.requests, "created": datetime.now(timezone.utc).isoformat()},
+        "sizes": {},
+    }
+    print(f"{'employees':>10} {'scenario':<20} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        run = results["sizes"][str(size)] = run_size(args, size)
+        print(f"{size:>10} {'(startup)':<20} {run['startup_s'] * 1e3:>8.0f}")
+        for name, stats in run["scenarios"].items():
+            print(f"{size:>10} {name:<20} {stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['rps']:>8.0f}")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(results, fh, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            found = regressions(results, json.load(fh), args.threshold, args.floor_ms)
+        for size, name, metric, before, after in found:
+            print(f"REGRESSION {size} {name} {metric}: {before:.2f} -> {after:.2f} ms", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
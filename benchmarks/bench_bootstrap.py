@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Time-to-interactive for a cold client: separate requests vs /api/bootstrap.
+
+"before" mirrors DataService startup: both Excel workbooks are downloaded
+and parsed client-side (openpyxl stands in for the browser's XLSX parser)
+and the other collections are fetched one request each.  "after" is a
+single /api/bootstrap call decoded with json.loads.  Requests go through
+the ASGI app in-process, so the numbers exclude network latency -- which
+only widens the gap, as "before" pays it once per request.
+
+Usage: python benchmarks/bench_bootstrap.py [--repeat 20]
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND)
+os.chdir(BACKEND)
+# Everything the server writes goes to a scratch directory, not the source tree.
+SCRATCH = tempfile.mkdtemp(prefix="bench-bootstrap-")
+for variable, name in (("RECORD_STORE_DIR", "records"), ("IMAGE_STORE_DIR", "images"),
+                       ("SNAPSHOT_DIR", "snapshots"), ("STATIC_SIDECAR_DIR", "sidecars")):
+    os.environ.setdefault(variable, os.path.join(SCRATCH, name))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from openpyxl import load_workbook  # noqa: E402
+
+import server  # noqa: E402
+
+COLLECTIONS = ["/api/hierarchy", "/api/meeting-rooms"]
+WORKBOOKS = ["/employee_directory.xlsx", "/attendance_data.xlsx"]
+
+
+def parse_xlsx(data: bytes) -> int:
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    rows = sum(1 for _ in workbook[workbook.sheetnames[0]].iter_rows(values_only=True))
+    workbook.close()
+    return rows
+
+
+def before(client):
+    requests, size = 0, 0
+    for path in WORKBOOKS:
+        response = client.get(path)
+        parse_xlsx(response.content)
+        requests, size = requests + 1, size + len(response.content)
+    for path in COLLECTIONS:
+        response = client.get(path)
+        response.json()
+        requests, size = requests + 1, size + len(response.content)
+    return requests, size
+
+
+def after(client):
+    response = client.get("/api/bootstrap", params={"include": "employees,attendance,hierarchy,meetingRooms"})
+    json.loads(response.content)
+    return 1, len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    client = TestClient(server.app)
+    with client:
+        print(f"{'':<8}{'requests':>10}{'bytes':>12}{'median':>12}{'p90':>12}")
+        for name, run in (("before", before), ("after", after)):
+            run(client)  # warm-up: store loads and fragment builds are not client TTI
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                requests, size = run(client)
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            p90 = timings[int(len(timings) * 0.9) - 1]
+            print(f"{name:<8}{requests:>10}{size:>12}{statistics.median(timings) * 1000:>10.1f}ms{p90 * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
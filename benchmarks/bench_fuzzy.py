@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: typo-tolerant trigram name search.
+
+Usage: python benchmarks/bench_fuzzy.py [--sizes 1000,10000,100000]
+
+Names come from bench_search.synthetic_directory(); one in three gets a
+random letter changed so the token vocabulary grows with the directory the
+way real surnames do.  Queries are misspellings of names in the workbook.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_search import synthetic_directory  # noqa: E402
+from directory import Directory  # noqa: E402
+from fuzzy_search import TrigramIndex  # noqa: E402
+
+QUERIES = ["Jyotsana", "Malhothra", "vikas", "kumr", "pratam monga", "sharmaa", "agarwal", "zzzzz", "vik", "singh"]
+
+
+def vocabulary_directory(size, seed=11):
+    rng = random.Random(seed)
+    employees = list(synthetic_directory(size).employees)
+    for i in range(0, size, 3):
+        first, last = employees[i].name.split(" ", 1)
+        position = rng.randrange(len(last))
+        last = last[:position] + rng.choice("aeioulnrst") + last[position + 1:]
+        employees[i] = employees[i]._replace(name=f"{first} {last}")
+    return Directory(employees, version=1, source_hash="synthetic")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'employees':>10} {'tokens':>7} {'build ms':>9} {'p50 ms':>7} {'max ms':>7} {'reindex 1% ms':>14}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        directory = vocabulary_directory(size)
+        index = TrigramIndex()
+        started = time.perf_counter()
+        index.sync(directory)
+        build = time.perf_counter() - started
+
+        timings = []
+        for query in QUERIES:
+            best = float("inf")
+            for _ in range(args.repeat):
+                begun = time.perf_counter()
+                index.search(query, args.top)
+                best = min(best, time.perf_counter() - begun)
+            timings.append(best)
+        timings.sort()
+
+        edited = list(directory.employees)
+        for i in range(0, size, 100):
+            edited[i] = edited[i]._replace(name=edited[i].name + " Jr")
+        started = time.perf_counter()
+        index.sync(Directory(edited, version=2, source_hash="edited"))
+        reindex = time.perf_counter() - started
+
+        print(f"{size:>10} {index.token_count:>7} {build * 1e3:>9.1f} {timings[len(timings) // 2] * 1e3:>7.3f} "
+              f"{timings[-1] * 1e3:>7.3f} {reindex * 1e3:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
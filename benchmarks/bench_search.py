@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: prefix index vs. linear scan for directory search.
+
+Usage: python benchmarks/bench_search.py [--sizes 1000,10000,100000]
+
+Synthetic directories are built by recombining the names, departments,
+locations and grades found in backend/build/employee_directory.xlsx.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from directory import Directory, DirectoryStore  # noqa: E402
+from search_index import PrefixIndex  # noqa: E402
+
+WORKBOOK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "backend", "build", "employee_directory.xlsx")
+QUERIES = ["a", "vik", "sh", "80", "ifc", "human", "sales", "9", "project", "zzz", "manager", "de"]
+
+
+def synthetic_directory(size, seed=7):
+    base = DirectoryStore(WORKBOOK).current().employees
+    rng = random.Random(seed)
+    first = [e.name.split()[0] for e in base if e.name]
+    last = [e.name.split()[-1] for e in base if e.name]
+    employees = []
+    for i in range(size):
+        template = base[i % len(base)]
+        employees.append(template._replace(
+            id=str(100000 + i),
+            name=f"{rng.choice(first)} {rng.choice(last)}",
+            mobile=str(rng.randrange(7000000000, 9999999999)),
+            department=rng.choice(base).department,
+            location=rng.choice(base).location,
+        ))
+    return Directory(employees, version=1, source_hash="synthetic")
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for query in QUERIES:
+            fn(query)
+        best = min(best, time.perf_counter() - started)
+    return best / len(QUERIES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'employees':>10} {'build ms':>9} {'linear ms':>10} {'index ms':>9} {'speedup':>8} {'reindex 1% ms':>14}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        directory = synthetic_directory(size)
+        index = PrefixIndex()
+        started = time.perf_counter()
+        index.sync(directory)
+        build = time.perf_counter() - started
+
+        for query in QUERIES:
+            assert directory.search(query, index=index) == directory.search(query), query
+
+        linear = timed(lambda q: directory.search(q), args.repeat)
+        indexed = timed(lambda q: directory.search(q, index=index), args.repeat)
+
+        edited = list(directory.employees)
+        for i in range(0, size, 100):
+            edited[i] = edited[i]._replace(name=edited[i].name + " Jr")
+        started = time.perf_counter()
+        index.sync(Directory(edited, version=2, source_hash="edited"))
+        reindex = time.perf_counter() - started
+
+        print(f"{size:>10} {build * 1e3:>9.1f} {linear * 1e3:>10.3f} {indexed * 1e3:>9.3f} "
+              f"{linear / indexed:>7.1f}x {reindex * 1e3:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
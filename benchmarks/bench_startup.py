@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Backend time-to-ready with and without binary snapshots.
+
+"cold" parses the Excel workbooks with openpyxl (empty snapshot directory);
+"warm" maps the snapshots the cold run wrote.  Each run is a fresh
+interpreter that imports server.py and runs its startup handler, so the
+numbers include imports and index builds, i.e. what a restart costs.
+
+Usage: python benchmarks/bench_startup.py [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+BOOT = """
+import json, time
+started = time.perf_counter()
+import server
+server.warm_stores()
+print(json.dumps({
+    "ready": time.perf_counter() - started,
+    "stores": {store.description: [store.current().loaded_from, store.current().load_seconds]
+               for store in (server.employee_store, server.attendance_store)},
+}))
+"""
+
+
+def boot(snapshot_dir: str, scratch: str) -> dict:
+    env = dict(os.environ, SNAPSHOT_DIR=snapshot_dir, RECORD_STORE_DIR=os.path.join(scratch, "records"),
+               IMAGE_STORE_DIR=os.path.join(scratch, "images"), STATIC_SIDECAR_DIR=os.path.join(scratch, "sidecars"))
+    output = subprocess.run([sys.executable, "-c", BOOT], cwd=BACKEND, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cold, warm, stores = [], [], {}
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory() as snapshot_dir, tempfile.TemporaryDirectory() as scratch:
+            result = boot(snapshot_dir, scratch)
+            cold.append(result["ready"])
+            for name, (source, seconds) in result["stores"].items():
+                stores.setdefault(name, {}).setdefault(source, []).append(seconds)
+            result = boot(snapshot_dir, scratch)
+            warm.append(result["ready"])
+            for name, (source, seconds) in result["stores"].items():
+                stores.setdefault(name, {}).setdefault(source, []).append(seconds)
+
+    print(f"{'run':<10}{'median ready':>14}")
+    print(f"{'cold':<10}{statistics.median(cold) * 1000:>12.1f}ms")
+    print(f"{'warm':<10}{statistics.median(warm) * 1000:>12.1f}ms")
+    for name, by_source in stores.items():
+        timings = ", ".join(f"{source} {statistics.median(values) * 1000:.1f}ms"
+                            for source, values in sorted(by_source.items()))
+        print(f"  {name}: {timings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Bytes on the wire and time to first byte for the React build, before/after.
+
+"before" is the plain StaticFiles mount server.py used to have; "after" is
+static_assets.PrecompressedFiles.  Requests are driven straight through the
+ASGI interface, so TTFB is server-side time until the first body chunk.
+
+Usage: python benchmarks/bench_static.py [--repeat 50]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND)
+
+from starlette.staticfiles import StaticFiles  # noqa: E402
+
+from static_assets import PrecompressedFiles  # noqa: E402
+
+BUILD = os.path.join(BACKEND, "build")
+PATHS = ["/index.html", "/static/js/main.f8e0194f.js", "/static/css/main.539f6eaa.css"]
+BROWSER_HEADERS = [(b"accept-encoding", b"gzip, deflate, br")]
+
+
+async def request(app, path, headers):
+    scope = {"type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "root_path": "",
+             "query_string": b"", "headers": headers, "http_version": "1.1", "scheme": "http",
+             "server": ("bench", 80), "client": ("bench", 1)}
+    started = time.perf_counter()
+    state = {"ttfb": None, "bytes": 0, "status": None, "headers": {}}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+            state["headers"] = dict(message["headers"])
+        elif message["type"] == "http.response.body":
+            if state["ttfb"] is None:
+                state["ttfb"] = time.perf_counter() - started
+            state["bytes"] += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    state["total"] = time.perf_counter() - started
+    return state
+
+
+async def measure(app, repeat):
+    rows = {}
+    for path in PATHS:
+        first = await request(app, path, BROWSER_HEADERS)
+        ttfb = statistics.median([(await request(app, path, BROWSER_HEADERS))["ttfb"] for _ in range(repeat)])
+        cache_control = first["headers"].get(b"cache-control", b"").decode()
+        if "immutable" in cache_control:
+            repeat_bytes = 0  # browsers do not even revalidate immutable assets
+        else:
+            etag = first["headers"].get(b"etag", b"")
+            repeat_bytes = (await request(app, path, BROWSER_HEADERS + [(b"if-none-match", etag)]))["bytes"]
+        rows[path] = (first["bytes"], repeat_bytes, ttfb * 1e3, cache_control or "-")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    before = asyncio.run(measure(StaticFiles(directory=BUILD, html=True), args.repeat))
+    after = asyncio.run(measure(PrecompressedFiles(BUILD), args.repeat))
+    print(f"{'path':<34} {'first visit bytes':>22} {'repeat visit bytes':>20} {'median TTFB ms':>18}")
+    for path in PATHS:
+        b, a = before[path], after[path]
+        print(f"{path:<34} {b[0]:>10} -> {a[0]:>9} {b[1]:>9} -> {a[1]:>8} {b[2]:>8.3f} -> {a[2]:>7.3f}")
+        print(f"{'':<34} cache-control: {a[3]}")
+    total_before = sum(before[p][0] for p in PATHS)
+    total_after = sum(after[p][0] for p in PATHS)
+    print(f"first visit total: {total_before} -> {total_after} bytes ({total_after / total_before:.1%})")
+
+
+if __name__ == "__main__":
+    main()
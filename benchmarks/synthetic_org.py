@@ -0,0 +1,159 @@
+"""Deterministic synthetic organisations for the API benchmarks.
+
+``all_employees.json`` is scaled to any size by recombining its first and
+last names, departments, grades and locations.  Employee ``i`` reports to
+one of the employees ``(i - 1) // 9 .. (i - 1) // 5``, so spans of control
+are 5-9 and a million employees sit about eight levels deep; most reports
+stay in their manager's department and location.  Attendance covers the
+most recent working days for up to ``attendance_employees`` people.
+
+The server never sees these as workbooks: ``materialize()`` writes a tiny
+placeholder source file per dataset plus the binary snapshot the store
+would have compiled from it (keyed by the placeholder's hash), so startup
+takes the production snapshot path and a million rows load in seconds
+rather than the minutes openpyxl would need.
+"""
+
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+from attendance import KNOWN_STATUSES, AttendanceStore, AttendanceTable  # noqa: E402
+from directory import Directory, DirectoryStore, Employee  # noqa: E402
+from snapshot import snapshot_path, write_snapshot  # noqa: E402
+from sources import file_digest  # noqa: E402
+
+SEED_FILE = os.path.join(ROOT, "all_employees.json")
+FIRST_ID = 1_000_000
+# Status mix of a typical day (present, late, half_day, absent, leave).
+STATUS_WEIGHTS = (0.80, 0.10, 0.04, 0.03, 0.03)
+
+
+def seed_records() -> List[dict]:
+    with open(SEED_FILE, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def synthetic_employees(size: int, seed: int = 7) -> List[Employee]:
+    records = seed_records()
+    rng = random.Random(seed)
+    first = sorted({r["name"].split()[0] for r in records if r["name"]})
+    last = sorted({r["name"].split()[-1] for r in records if len(r["name"].split()) > 1})
+    templates = [(r["department"], r["grade"], r["location"]) for r in records]
+    employees: List[Employee] = []
+    for i in range(size):
+        department, grade, location = rng.choice(templates)
+        manager_name, manager_id = "*", None
+        if i:
+            low = (i - 1) // 9
+            manager = employees[rng.randrange(low, max(low + 1, (i - 1) // 5))]
+            manager_name, manager_id = f"{manager.name}({manager.id})", manager.id
+            if rng.random() < 0.9:
+                department = manager.department
+            if rng.random() < 0.8:
+                location = manager.location
+        name = f"{rng.choice(first)} {rng.choice(last)}"
+        joined = date(2010, 1, 1) + timedelta(days=rng.randrange(5000))
+        employees.append(Employee(
+            id=str(FIRST_ID + i),
+            name=name,
+            department=department,
+            grade=grade,
+            reporting_manager=manager_name,
+            reporting_id=manager_id,
+            location=location,
+            mobile=str(rng.randrange(7000000000, 9999999999)),
+            extension=str(rng.randrange(6000, 7000)),
+            email=f"{name.lower().replace(' ', '.')}.{i}@example.com",
+            date_of_joining=joined.isoformat(),
+        ))
+    return employees
+
+
+def working_days(count: int, end: date) -> List[date]:
+    days, day = [], end
+    while len(days) < count:
+        if day.weekday() != 6:
+            days.append(day)
+        day -= timedelta(days=1)
+    return days[::-1]
+
+
+def synthetic_attendance(employees: List[Employee], days: int = 20, attendance_employees: int = 20000,
+                         seed: int = 7, end: date = date(2025, 8, 29)) -> AttendanceTable:
+    rng = np.random.default_rng(seed)
+    people = employees[:attendance_employees]
+    locations = sorted({emp.location for emp in people})
+    location_code = {value: code for code, value in enumerate(locations)}
+    ordinals = np.array([day.toordinal() for day in working_days(days, end)], dtype=np.int32)
+    rows = len(people) * len(ordinals)
+    employee = np.repeat(np.arange(len(people), dtype=np.int32), len(ordinals))
+    day = np.tile(ordinals, len(people))
+    status = rng.choice(len(STATUS_WEIGHTS), size=rows, p=STATUS_WEIGHTS).astype(np.int8)
+    attended = status <= KNOWN_STATUSES.index("half_day")
+    midnight = (day.astype(np.int64) - date(1970, 1, 1).toordinal()) * 86400
+    punch_in = midnight + 9 * 3600 + rng.integers(0, 5400, size=rows) + (status == 1) * 3600
+    hours = np.where(status == 2, 4.5, 9.0) + rng.normal(0, 0.5, size=rows)
+    punch_out = punch_in + (hours * 3600).astype(np.int64)
+    home = np.array([location_code[emp.location] for emp in people], dtype=np.int32)[employee]
+    columns = {
+        "employee": employee,
+        "day": day,
+        "punch_in": np.where(attended, punch_in, -1),
+        "punch_out": np.where(attended, punch_out, -1),
+        "status": status,
+        "hours": np.where(attended, hours, 0).astype(np.float32),
+        "location": home,
+        "out_location": home,
+        "remark": np.full(rows, -1, dtype=np.int32),
+    }
+    return AttendanceTable(columns, [emp.id for emp in people], [emp.name for emp in people],
+                           list(KNOWN_STATUSES), locations, [], version=1, source_hash="")
+
+
+def materialize(size: int, data_dir: str, seed: int = 7, days: int = 20,
+                attendance_employees: int = 20000) -> Dict[str, str]:
+    """Write placeholder sources and their snapshots; returns the env vars that point the server at them.
+
+    Placeholders are named after the generator parameters, so a second run
+    with the same parameters reuses the snapshots.
+    """
+    snapshot_dir = os.path.join(data_dir, "snapshots")
+    os.makedirs(snapshot_dir, exist_ok=True)
+    label = f"org-{size}-seed{seed}-days{days}-att{attendance_employees}"
+    paths = {kind: os.path.join(data_dir, f"{label}.{kind}.xlsx") for kind in ("employees", "attendance")}
+    stores = {"employees": DirectoryStore(paths["employees"]), "attendance": AttendanceStore(paths["attendance"])}
+    employees = None
+    for kind, path in paths.items():
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(f"synthetic {kind} for {label}; the real data is in the snapshot\n")
+        digest = file_digest(path)
+        target = snapshot_path(snapshot_dir, stores[kind].snapshot_kind, digest)
+        if os.path.exists(target):
+            continue
+        if employees is None:
+            employees = synthetic_employees(size, seed)
+        if kind == "employees":
+            generation = Directory(employees, version=1, source_hash=digest)
+        else:
+            generation = synthetic_attendance(employees, days, attendance_employees, seed)
+        write_snapshot(target, digest, stores[kind].to_snapshot(generation))
+    return {
+        "EMPLOYEE_DIRECTORY_PATH": paths["employees"],
+        "ATTENDANCE_DATA_PATH": paths["attendance"],
+        "SNAPSHOT_DIR": snapshot_dir,
+    }
+
+
+def sample_ids(size: int) -> Tuple[str, str, str]:
+    """(the root, a first-level manager, the deepest-numbered leaf) of the generated tree."""
+    return str(FIRST_ID), str(FIRST_ID + min(1, size - 1)), str(FIRST_ID + size - 1)
@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Keep the server's write-ahead logged collections and uploads out of the source tree.
+os.environ.setdefault("RECORD_STORE_DIR", tempfile.mkdtemp(prefix="record-store-"))
+os.environ.setdefault("IMAGE_STORE_DIR", tempfile.mkdtemp(prefix="image-store-"))
+# Likewise the workbook snapshots and the compressed sidecars of the React build.
+os.environ.setdefault("SNAPSHOT_DIR", tempfile.mkdtemp(prefix="snapshots-"))
+os.environ.setdefault("STATIC_SIDECAR_DIR", tempfile.mkdtemp(prefix="static-sidecars-"))
+
+WORKBOOK_PATH = os.path.join(BACKEND_DIR, "build", "employee_directory.xlsx")
+ATTENDANCE_PATH = os.path.join(BACKEND_DIR, "build", "attendance_data.xlsx")
+POLICY_DIR = os.path.join(BACKEND_DIR, "build", "company policies")
+TAXONOMY_PATH = os.path.join(BACKEND_DIR, "taxonomy.json")
+
+
+@pytest.fixture(scope="session")
+def workbook_path():
+    return WORKBOOK_PATH
+
+
+@pytest.fixture(scope="session")
+def attendance_path():
+    return ATTENDANCE_PATH
+
+
+@pytest.fixture(scope="session")
+def policy_dir():
+    return POLICY_DIR
+
+
+@pytest.fixture(scope="session")
+def taxonomy_path():
+    return TAXONOMY_PATH
@@ -0,0 +1,61 @@
+from collections import Counter, defaultdict
+from datetime import date
+
+from attendance import AttendanceStore, AttendanceTable
+
+
+def test_summary_matches_row_by_row_totals():
+    rows = [
+        {"employee_id": "1", "employee_name": "A", "date": "2025-07-14", "status": "Present",
+         "total_hours": 8, "punch_in": "2025-07-14 09:00:00", "punch_in_location": "IFC"},
+        {"employee_id": "1", "employee_name": "A", "date": "2025-07-15", "status": "late", "total_hours": 7.5},
+        {"employee_id": "2.0", "employee_name": "B", "date": "2025-07-15", "status": "half_day", "total_hours": 4},
+        {"employee_id": "2", "employee_name": "B", "date": "2025-07-20", "status": "present", "total_hours": 9},
+    ]
+    table = AttendanceTable.from_rows(rows, version=1)
+    assert table.punch_in[0] > 0 and table.punch_in[1] == -1
+
+    by_employee = table.summary(date(2025, 7, 14), date(2025, 7, 15), "employee")
+    assert by_employee["records"] == 3
+    assert by_employee["statuses"] == {"present": 1, "late": 1, "half_day": 1}
+    groups = {g["key"]: g for g in by_employee["groups"]}
+    assert groups["1"]["totalHours"] == 15.5 and groups["1"]["name"] == "A"
+    assert groups["2"]["statuses"] == {"half_day": 1}
+
+    by_day = table.summary(group_by="day")
+    assert [g["key"] for g in by_day["groups"]] == ["2025-07-14", "2025-07-15", "2025-07-20"]
+    assert table.summary(group_by="day") is by_day
+
+
+def test_department_codes_keep_only_the_latest_directory():
+    from directory import Directory, Employee
+
+    def directory(version, department):
+        emp = Employee(*(["1", "A", department] + [""] * (len(Employee._fields) - 3)))
+        return Directory([emp], version=version, source_hash=str(version))
+
+    table = AttendanceTable.from_rows([{"employee_id": "1", "employee_name": "A", "date": "2025-07-14",
+                                        "status": "present", "total_hours": 8}], version=1)
+    for version, department in ((1, "Sales"), (2, "Finance"), (3, "Legal")):
+        summary = table.summary(group_by="department", directory=directory(version, department))
+        assert [g["key"] for g in summary["groups"]] == [department]
+    assert [key for key in table.derived if "departments" in str(key)] == ["departments"]
+    assert table.derived["departments"][0] == 3
+    table._department_codes(directory(2, "Finance"))
+    assert table.derived["departments"][0] == 3
+
+
+def test_real_sheet_summary(workbook_path, attendance_path):
+    from directory import DirectoryStore
+
+    table = AttendanceStore(attendance_path).current()
+    assert len(table) > 500
+    directory = DirectoryStore(workbook_path).current()
+    summary = table.summary(group_by="department", directory=directory)
+    assert summary["records"] == len(table)
+
+    expected = defaultdict(Counter)
+    for i in range(len(table)):
+        emp = directory.get(table.employee_ids[table.employee[i]])
+        expected[emp.department if emp and emp.department else "Unassigned"][table.statuses[table.status[i]]] += 1
+    assert {g["key"]: g["statuses"] for g in summary["groups"]} == {k: dict(v) for k, v in expected.items()}
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from bootstrap import SectionRegistry, parse_known
+
+
+def test_fragments_are_cached_per_version_and_known_sections_skipped():
+    state = {"version": 1, "builds": 0}
+
+    def build():
+        state["builds"] += 1
+        return [{"id": "1", "v": state["version"]}]
+
+    sections = SectionRegistry()
+    sections.register("news", lambda: state["version"], build)
+    sections.register("tasks", lambda: 7, lambda: [])
+
+    body = json.loads(sections.assemble(["news", "tasks"]))
+    assert body == {"versions": {"news": 1, "tasks": 7},
+                    "sections": {"news": [{"id": "1", "v": 1}], "tasks": []}, "unchanged": []}
+    sections.assemble(["news"])
+    assert state["builds"] == 1
+
+    state["version"] = 2
+    body = json.loads(sections.assemble(["news", "tasks"], parse_known("tasks:7,news:1")))
+    assert body["sections"] == {"news": [{"id": "1", "v": 2}]} and body["unchanged"] == ["tasks"]
+    assert state["builds"] == 2
+
+    with pytest.raises(ValueError):
+        sections.assemble(["nope"])
+    with pytest.raises(ValueError):
+        parse_known("news:x")
+
+
+def test_bootstrap_endpoint():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    body = client.get("/api/bootstrap", params={"include": "employees,hierarchy,meetingRooms"}).json()
+    assert set(body["sections"]) == {"employees", "hierarchy", "meetingRooms"}
+    assert len(body["sections"]["employees"]) == len(server.employee_store.current())
+    known = ",".join(f"{name}:{version}" for name, version in body["versions"].items())
+    again = client.get("/api/bootstrap", params={"include": "employees,hierarchy,meetingRooms", "known": known})
+    assert again.json()["sections"] == {}
+    assert client.get("/api/bootstrap", params={"include": "employees", "known": known,
+                                                 "epoch": body["epoch"]}).json()["unchanged"] == ["employees"]
+    # Versions held from an earlier server run say nothing about this one.
+    stale = client.get("/api/bootstrap", params={"include": "employees", "known": known, "epoch": "0"}).json()
+    assert stale["unchanged"] == [] and "employees" in stale["sections"]
+    since = f"{body['epoch']}.{body['versions']['employees']}"
+    assert not client.get("/api/employees", params={"since": since}).json()["full"]
+    assert client.get("/api/bootstrap", params={"include": "nope"}).status_code == 400
+
+
+def test_meeting_rooms_section_moves_when_a_booking_starts_or_ends(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    params = {"include": "meetingRooms"}
+    body = client.get("/api/bootstrap", params=params).json()
+    known = {"known": f"meetingRooms:{body['versions']['meetingRooms']}", "epoch": body["epoch"]}
+    assert client.get("/api/bootstrap", params=dict(params, **known)).json()["unchanged"] == ["meetingRooms"]
+    # The clock passed a booking boundary; no booking was added or cancelled.
+    monkeypatch.setattr(server.meeting_rooms, "next_change", lambda: 0.0)
+    moved = client.get("/api/bootstrap", params=dict(params, **known)).json()
+    assert moved["unchanged"] == [] and "meetingRooms" in moved["sections"]
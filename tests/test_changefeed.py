@@ -0,0 +1,53 @@
+import asyncio
+import json
+import threading
+import time
+
+from changefeed import MAX_IDS, ChangeFeed
+
+
+def parse(chunk: bytes):
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_bursts_are_coalesced_and_delivered_quickly():
+    async def scenario():
+        feed = ChangeFeed()
+        feed.publish("news", 1, ["a"])
+        stream = feed.stream()
+        assert parse(await stream.__anext__()) == ("versions", {"news": 1})
+
+        def burst():
+            for version in range(2, 12):
+                feed.publish("meetingRooms", version, [f"room-{version % 3}"])
+            feed.publish("news", 2, ["b"])
+
+        started = time.perf_counter()
+        threading.Thread(target=burst).start()
+        first = parse(await stream.__anext__())
+        second = parse(await stream.__anext__())
+        elapsed = time.perf_counter() - started
+        await stream.aclose()
+        return feed, first, second, elapsed
+
+    feed, first, second, elapsed = asyncio.run(scenario())
+    assert first == ("change", {"type": "meetingRooms", "version": 11, "ids": ["room-0", "room-1", "room-2"]})
+    assert second == ("change", {"type": "news", "version": 2, "ids": ["b"]})
+    assert elapsed < 0.1
+    assert len(feed) == 0  # closing the stream unsubscribes
+
+
+def test_slow_client_backlog_stays_bounded():
+    async def scenario():
+        feed = ChangeFeed()
+        subscriber = feed.subscribe(["employees"])
+        for version in range(1, 2001):
+            feed.publish("employees", version, [str(version)])
+            feed.publish("attendance", version)  # filtered out
+        assert len(subscriber.pending) == 1
+        return await subscriber.next_batch()
+
+    (change,) = asyncio.run(scenario())
+    assert change.version == 2000 and change.ids is None  # > MAX_IDS ids: reload
+    assert MAX_IDS < 2000
@@ -0,0 +1,142 @@
+import threading
+from datetime import datetime, timedelta
+
+from changelog import ChangeLog, delta
+
+
+def test_log_compacts_repeated_ids_and_answers_since():
+    log = ChangeLog()
+    log.record(1)
+    log.record(2, ["a", "b"])
+    log.record(3, ["a"])
+    log.record(4, ["c"])
+    assert len(log) == 3
+    assert log.since(1) == {"a", "b", "c"}
+    assert log.since(2) == {"a", "c"}
+    assert log.since(4) == set()
+    assert log.since(0) is None  # nothing held: full snapshot
+    assert log.since(9) is None  # ahead of us (e.g. a previous server run)
+
+    log.record(5)  # everything changed
+    assert log.since(4) is None and log.since(5) == set()
+
+
+def test_late_publisher_never_moves_the_log_back():
+    log = ChangeLog()
+    log.record(4)
+    log.record(6, ["b"])
+    log.record(5, ["a"])
+    assert log.version == 6
+    assert log.since(5) == {"a", "b"} and log.since(6) == set()
+
+
+def test_bounded_log_falls_back_to_full_snapshot():
+    log = ChangeLog(capacity=2)
+    log.record(1)
+    for version, record_id in enumerate("abcd", start=2):
+        log.record(version, [record_id])
+    assert len(log) == 2 and log.floor == 3
+    assert log.since(2) is None
+    assert log.since(3) == {"c", "d"}
+
+    records = {"c": {"id": "c"}, "d": {"id": "d"}}
+    body = delta(log, log.epoch + ".2", records.get, lambda: records.values())
+    assert body["full"] and len(body["upserts"]) == 2
+    log.record(6, ["b"])
+    since = log.epoch + ".4"
+    body = delta(log, since, records.get, lambda: records.values())
+    assert body == {"version": log.epoch + ".6", "since": since, "full": False,
+                    "upserts": [{"id": "d"}], "deleted": ["b"]}
+
+
+def test_versions_from_another_run_get_a_full_snapshot():
+    log = ChangeLog(epoch="new")
+    log.record(1)
+    log.record(2, ["a"])
+    records = {"a": {"id": "a"}, "b": {"id": "b"}}
+    # Version 1 of an earlier run is not version 1 of this one.
+    for since in ("old.1", "1", "", "new.x"):
+        assert delta(log, since, records.get, lambda: records.values())["full"]
+    assert delta(log, "new.1", records.get, lambda: records.values())["upserts"] == [{"id": "a"}]
+
+
+def test_since_on_collection_endpoints():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    full = client.get("/api/employees", params={"since": 0}).json()
+    assert full["full"] and len(full["upserts"]) == len(server.employee_store.current())
+    current = client.get("/api/employees", params={"since": full["version"]}).json()
+    assert current["upserts"] == [] and current["deleted"] == [] and not current["full"]
+    assert client.get("/api/hierarchy", params={"since": 0}).json()["full"]
+    assert client.get("/api/attendance", params={"since": 0}).json()["full"]
+
+    rooms = client.get("/api/meeting-rooms", params={"since": 0}).json()
+    assert rooms["full"] and len(rooms["upserts"]) == len(server.meeting_rooms.rooms)
+    start = (datetime.now() + timedelta(days=5)).replace(hour=15, minute=0, second=0, microsecond=0)
+    client.post("/api/meeting-rooms/project-1-001/book", json={
+        "employee_id": "80006", "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat()})
+    changed = client.get("/api/meeting-rooms", params={"since": rooms["version"]}).json()
+    assert [room["id"] for room in changed["upserts"]] == ["project-1-001"]
+    epoch, _, version = rooms["version"].partition(".")
+    assert changed["version"] == f"{epoch}.{int(version) + 1}"
+
+
+def test_in_flight_writes_are_not_skipped_by_since(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    before = client.get("/api/news", params={"since": 0}).json()["version"]
+    applied, release = threading.Event(), threading.Event()
+    wait_durable = server.record_store.wait_durable
+
+    def slow_fsync(ticket):
+        applied.set()
+        release.wait(5)
+        wait_durable(ticket)
+    monkeypatch.setattr(server.record_store, "wait_durable", slow_fsync)
+    writer = threading.Thread(target=client.post, args=("/api/news",), kwargs={"json": {"title": "In flight"}})
+    writer.start()
+    try:
+        assert applied.wait(5)
+        # Applied but not yet durable or logged: the token must not move past it.
+        during = client.get("/api/news", params={"since": before}).json()
+        assert during["version"] == before and during["upserts"] == []
+    finally:
+        release.set()
+        writer.join()
+    after = client.get("/api/news", params={"since": during["version"]}).json()
+    assert [item["title"] for item in after["upserts"]] == ["In flight"]
+
+
+def test_in_flight_bookings_are_not_skipped_by_since(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    before = client.get("/api/meeting-rooms", params={"since": 0}).json()["version"]
+    changed, release = threading.Event(), threading.Event()
+
+    def slow_listener(version, room_ids):
+        changed.set()
+        release.wait(5)
+    monkeypatch.setattr(server.meeting_rooms, "_listeners", [slow_listener, *server.meeting_rooms._listeners])
+    start = (datetime.now() + timedelta(days=6)).replace(hour=11, minute=0, second=0, microsecond=0)
+    writer = threading.Thread(target=client.post, args=("/api/meeting-rooms/project-1-001/book",), kwargs={"json": {
+        "employee_id": "80006", "start_time": start.isoformat(), "end_time": (start + timedelta(hours=1)).isoformat()}})
+    writer.start()
+    try:
+        assert changed.wait(5)
+        during = client.get("/api/meeting-rooms", params={"since": before}).json()
+        assert during["version"] == before and during["upserts"] == []
+    finally:
+        release.set()
+        writer.join()
+    after = client.get("/api/meeting-rooms", params={"since": during["version"]}).json()
+    assert [room["id"] for room in after["upserts"]] == ["project-1-001"]
@@ -0,0 +1,135 @@
+import pytest
+
+from chat import (ChatBackend, ChatMessage, ChatService, DirectoryAssistant, LocalBackend, SessionStore,
+                  load_backend)
+from directory import Directory, DirectoryStore
+from hierarchy import OrgGraph
+from meeting_rooms import MeetingRooms
+from search_index import PrefixIndex
+
+NOW = 1_900_000_000.0
+
+
+def message(session_id: str, text: str = "hi", reply: str = "hello") -> ChatMessage:
+    return ChatMessage("msg", session_id, text, reply, "2030-01-01T00:00:00Z", "local", None)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_sessions_are_lru_bounded_by_count_bytes_and_messages():
+    store = SessionStore(max_sessions=2, max_messages=3)
+    for session_id in ("a", "b"):
+        store.append(message(session_id))
+    store.history("a")
+    store.append(message("a"))  # "a" is now the most recently used
+    store.append(message("c"))
+    assert len(store) == 2 and store.history("b") == []
+    for _ in range(5):
+        store.append(message("a"))
+    assert len(store.history("a")) == 3
+
+    small = SessionStore(max_bytes=1000)
+    small.append(message("x", reply="x" * 500))
+    small.append(message("y", reply="y" * 500))
+    assert small.history("x") == [] and len(small.history("y")) == 1
+    assert small.bytes == message("y", reply="y" * 500).size
+    assert small.clear("y") and small.bytes == 0 and not small.clear("y")
+
+
+def test_idle_sessions_expire():
+    clock = Clock()
+    store = SessionStore(ttl=60, clock=clock)
+    store.append(message("old"))
+    clock.now = 30
+    store.append(message("fresh"))
+    clock.now = 70
+    assert store.history("old") == [] and len(store.history("fresh")) == 1
+    store.append(message("fresh"))
+    assert len(store) == 1 and store.bytes == 2 * message("fresh").size
+
+
+@pytest.fixture(scope="module")
+def assistant(workbook_path):
+    directory = DirectoryStore(workbook_path).current()
+    index = PrefixIndex()
+    index.sync(directory)
+    return DirectoryAssistant(lambda: directory, lambda: OrgGraph.of(directory), index, MeetingRooms(),
+                              clock=lambda: NOW)
+
+
+def test_directory_questions_are_answered_locally(assistant):
+    directory = assistant.directory()
+    graph = assistant.graph()
+    emp = next(emp for emp in directory.employees if graph.parent[graph.position(emp.id)] >= 0)
+    boss = directory.employees[graph.parent[graph.position(emp.id)]]
+
+    for question in (f"Who is {emp.id}'s manager?", f"manager of {emp.name}", f"who does {emp.id} report to"):
+        intent, reply = assistant.answer(question)
+        assert intent == "manager" and boss.name in reply
+    intent, reply = assistant.answer(f"email of {emp.id}")
+    assert intent == "field" and emp.email in reply
+    intent, reply = assistant.answer(f"who reports to {boss.id}")
+    assert intent == "reports" and emp.name in reply
+    intent, reply = assistant.answer("rooms free at IFC now")
+    assert intent == "rooms" and "BOARD ROOM" in reply and "Noida" not in reply
+    assert "Locations:" in assistant.answer("free rooms in Atlantis")[1]
+    assert "people match" in assistant.answer("extension of Vikas")[1]
+    assert assistant.answer("who is the CEO of Google") is None
+    assert assistant.answer("what is the weather in Delhi") is None
+
+
+def test_employees_missing_from_a_reloaded_org_chart_are_not_found(assistant):
+    directory = assistant.directory()
+    graph = assistant.graph()
+    emp = next(emp for emp in directory.employees if not graph.children[graph.position(emp.id)])
+    reloaded = Directory([other for other in directory.employees if other.id != emp.id], version=2,
+                         source_hash="reloaded")
+    stale = DirectoryAssistant(assistant.directory, lambda: OrgGraph.of(reloaded), assistant.index, assistant.rooms)
+    for question, intent in ((f"manager of {emp.id}", "manager"), (f"who reports to {emp.id}", "reports")):
+        assert stale.answer(question) == (intent, f"I couldn't find anyone matching \"{emp.id}\" in the directory.")
+
+
+def test_service_falls_back_to_backend_and_records_history(assistant):
+    class Echo(ChatBackend):
+        name = "echo"
+
+        def reply(self, message, history):
+            return f"{message} ({len(history)} earlier)"
+
+    service = ChatService(assistant, Echo(), SessionStore())
+    first = service.send("s", "rooms free at IFC now")
+    assert first.source == "directory" and first.intent == "rooms"
+    second = service.send("s", "tell me a joke")
+    assert second.source == "echo" and second.bot_response == "tell me a joke (1 earlier)"
+    assert [m.user_message for m in service.sessions.history("s")] == ["rooms free at IFC now", "tell me a joke"]
+    with pytest.raises(ValueError):
+        service.send("s", "   ")
+
+
+def test_load_backend():
+    assert isinstance(load_backend(None), LocalBackend)
+    assert isinstance(load_backend("chat:LocalBackend"), LocalBackend)
+    with pytest.raises(ValueError):
+        load_backend("chat.LocalBackend")
+
+
+def test_chat_endpoints():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    sent = client.post("/api/chat", json={"session_id": "s1", "message": "Rooms free at Noida now?"}).json()
+    assert sent["source"] == "directory" and "Noida Conference Room" in sent["response"]
+    assert sent["created_at"]
+    history = client.get("/api/chat/history/s1").json()["messages"]
+    assert [(m["user_message"], m["bot_response"]) for m in history] == [("Rooms free at Noida now?", sent["response"])]
+    assert client.post("/api/chat", json={"session_id": "s1", "message": ""}).status_code == 400
+    assert client.delete("/api/chat/history/s1").json() == {"message": "Chat history cleared"}
+    assert client.get("/api/chat/history/s1").json()["messages"] == []
@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from datasets import DatasetRegistry
+
+
+def test_versions_only_move_on_new_content():
+    registry = DatasetRegistry()
+    registry.register("news")
+    first = registry.etag(["news"])
+    assert not registry.update("news", "")
+    assert registry.update("news", "abc")
+    assert not registry.update("news", "abc")
+    assert registry["news"].version == 1
+    assert registry.etag(["news"]) != first
+    assert registry.etag(["news"], "a") != registry.etag(["news"], "b")
+
+
+def test_tags_cover_the_whole_composite_hash():
+    # What changes is the suffix; a fresh run restarts the version at 1.
+    before, after = DatasetRegistry(), DatasetRegistry()
+    for registry, edits in ((before, 3), (after, 4)):
+        registry.register("hierarchy")
+        registry.update("hierarchy", f"{'f' * 64}:{edits}")
+    assert before["hierarchy"].version == after["hierarchy"].version
+    assert before.etag(["hierarchy"]) != after.etag(["hierarchy"])
+
+
+@pytest.fixture(scope="module")
+def client():
+    import server
+
+    return TestClient(server.app)
+
+
+@pytest.mark.parametrize("path", ["/api/employees?location=IFC", "/api/hierarchy", "/api/attendance?limit=5",
+                                  "/api/attendance/summary", "/employee_directory.xlsx", "/attendance_data.xlsx",
+                                  "/api/meeting-rooms", "/api/news"])
+def test_conditional_get_answers_304(client, path):
+    first = client.get(path)
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag.startswith('"')
+    repeat = client.get(path, headers={"If-None-Match": etag})
+    assert repeat.status_code == 304 and repeat.content == b""
+    assert repeat.headers["etag"] == etag
+    assert client.get(path, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_writes_change_the_etag(client):
+    for path, write in (("/api/news", lambda: client.post("/api/news", json={"title": "Etag"})),
+                        ("/api/meeting-rooms", lambda: client.post("/api/meeting-rooms/ifc-14-001/book", json={
+                            "employee_id": "80001", "start_time": "2099-01-01T09:00:00",
+                            "end_time": "2099-01-01T10:00:00"}))):
+        etag = client.get(path).headers["etag"]
+        assert write().status_code == 200
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,82 @@
+import os
+import shutil
+
+from openpyxl import load_workbook
+
+from directory import DirectoryStore, employee_from_row
+
+
+def test_row_mapping_matches_data_service():
+    emp = employee_from_row({
+        "id": 80024.0,
+        "name": " Jyotsna Chauhan ",
+        "department": "Marketing",
+        "reporting_manager": "Ashish Jerath(80006)",
+        "reporting_id": "80006.0",
+        "mobile": 9810000000,
+        "extension": 0,
+        "date_of_joining": 44228,
+    })
+    assert emp.id == "80024"
+    assert emp.name == "Jyotsna Chauhan"
+    assert emp.reporting_id == "80006"
+    assert emp.mobile == "9810000000"
+    assert emp.extension == "0"
+    assert emp.date_of_joining == "2021-02-01"
+    assert employee_from_row({"id": 1, "reporting_id": "*"}).reporting_id is None
+
+
+def test_store_parses_workbook_and_filters(workbook_path):
+    directory = DirectoryStore(workbook_path).current()
+    assert len(directory) > 600
+    top = directory.get("80002")
+    assert top.name == "Vikas Malhotra"
+    assert top.reporting_id is None
+    assert top.date_of_joining == "2021-02-01"
+
+    by_name = directory.search(search="vik")
+    assert top in by_name
+    assert all(
+        any(value.lower().startswith("vik") for value in (e.name, e.id, e.department, e.location, e.grade, e.mobile))
+        for e in by_name
+    )
+    at_ifc = directory.search(department="Human Resources", location="IFC")
+    assert at_ifc and all(e.department == "Human Resources" and e.location == "IFC" for e in at_ifc)
+    assert len(directory.search(department="All Departments")) == len(directory)
+
+
+def test_store_reloads_when_content_changes(tmp_path, workbook_path):
+    path = os.path.join(tmp_path, "employees.xlsx")
+    shutil.copy(workbook_path, path)
+    store = DirectoryStore(path, check_interval=0)
+    first = store.current()
+
+    os.utime(path, None)  # touch only: same hash, no re-parse
+    assert store.current() is first
+
+    workbook = load_workbook(path)
+    sheet = workbook.active
+    sheet.cell(row=2, column=2, value="Renamed Person")
+    workbook.save(path)
+    os.utime(path, (first.loaded_at + 10, first.loaded_at + 10))
+
+    second = store.current()
+    assert second is not first
+    assert second.version == first.version + 1
+    assert second.get("80002").name == "Renamed Person"
+
+
+def test_a_failing_listener_does_not_stop_the_reload(tmp_path, workbook_path, caplog):
+    path = os.path.join(tmp_path, "employees.xlsx")
+    shutil.copy(workbook_path, path)
+    store = DirectoryStore(path, check_interval=0)
+    seen = []
+
+    def broken(directory):
+        raise RuntimeError("index build failed")
+    store.add_listener(broken)
+    store.add_listener(seen.append)
+
+    assert store.refresh(force=True)
+    assert seen == [store.current()]
+    assert "index build failed" in caplog.text
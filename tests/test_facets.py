@@ -0,0 +1,31 @@
+from collections import Counter
+
+from directory import DirectoryStore
+from facets import FacetIndex, iter_bits
+
+
+def test_filter_and_counts_match_record_scan(workbook_path):
+    directory = DirectoryStore(workbook_path).current()
+    facets = FacetIndex.of(directory)
+
+    selected = facets.filter(department="Human Resources", location="IFC")
+    expected = directory.search(department="Human Resources", location="IFC")
+    assert facets.employees(selected) == expected
+
+    counts = facets.counts(selected)
+    assert counts["location"] == {"IFC": len(expected)}
+    assert counts["grade"] == dict(Counter(e.grade for e in expected if e.grade))
+
+    everyone = facets.counts()
+    assert sum(everyone["department"].values()) == sum(1 for e in directory.employees if e.department)
+    assert facets.filter(department="All Departments") == facets.all
+    assert facets.filter(department="No Such Team") == 0
+
+
+def test_sparse_counts_and_id_bitmaps(workbook_path):
+    directory = DirectoryStore(workbook_path).current()
+    facets = FacetIndex.of(directory)
+    ids = [directory.employees[i].id for i in (3, 17, 400)]
+    bitmap = facets.bitmap_of_ids(ids + ["missing"])
+    assert list(iter_bits(bitmap)) == [3, 17, 400]
+    assert sum(facets.counts(bitmap)["location"].values()) == 3
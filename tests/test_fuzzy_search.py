@@ -0,0 +1,85 @@
+import itertools
+
+from directory import Directory, DirectoryStore
+from fuzzy_search import TrigramIndex, bounded_distance, max_edits
+
+
+def levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def test_bounded_distance_matches_levenshtein():
+    words = ["", "a", "ab", "abc", "acb", "bca", "abcd", "xbcd"]
+    for a, b in itertools.product(words, repeat=2):
+        for limit in range(3):
+            distance = levenshtein(a, b)
+            assert bounded_distance(a, b, limit) == (distance if distance <= limit else None), (a, b, limit)
+    assert max_edits("raj") == 0 and max_edits("vikas") == 1 and max_edits("malhothra") == 2
+
+
+def test_typos_find_the_right_people(workbook_path):
+    directory = DirectoryStore(workbook_path).current()
+    index = TrigramIndex()
+    index.sync(directory)
+
+    def names(query, limit=None):
+        return [directory.get(emp_id).name for emp_id, _ in index.search(query, limit)]
+
+    assert names("Jyotsana") == ["Jyotsna Chauhan"]
+    assert set(names("Malhothra")) == {"Nitin Malhotra", "Vikas Malhotra"}
+    assert names("vikas malhothra") == ["Vikas Malhotra"]
+    assert names("pratam monga") == ["Pratham Monga"]
+    assert names("xyzzy") == [] and names("") == []
+    # Exact words outrank prefixes, which outrank typos.
+    scores = [score for _, score in index.search("vik")]
+    assert scores == sorted(scores) and scores[0] == 0.5
+    assert index.search("vikas")[0][1] == 0
+    assert names("kumar", 3) == names("kumar")[:3]
+
+
+def test_incremental_sync(workbook_path):
+    directory = DirectoryStore(workbook_path).current()
+    index = TrigramIndex()
+    index.sync(directory)
+    tokens = index.token_count
+
+    employees = list(directory.employees)
+    employees[0] = employees[0]._replace(name="Zebulon Quill")
+    removed = employees.pop()
+    assert index.sync(Directory(employees, version=2, source_hash="edited")) == (1, 2)
+    assert [emp_id for emp_id, _ in index.search("zebulom")] == [employees[0].id]
+    assert removed.id not in {emp_id for emp_id, _ in index.search(removed.name)}
+    assert abs(index.token_count - tokens) <= 4
+
+    index.sync(directory)
+    assert index.search("zebulon") == []
+
+
+def test_fuzzy_employee_search_endpoint():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    assert client.get("/api/employees", params={"search": "Malhothra"}).json()["total"] == 0
+    body = client.get("/api/employees", params={"search": "Malhothra", "fuzzy": 1}).json()
+    assert body["total"] == 2 and all("Malhotra" in emp["name"] for emp in body["employees"])
+    assert body["employees"][0]["matchScore"] == 1
+    department = body["employees"][0]["department"]
+    filtered = client.get("/api/employees", params={"search": "Malhothra", "fuzzy": 1, "department": department})
+    assert all(emp["department"] == department for emp in filtered.json()["employees"])
+    limited = client.get("/api/employees", params={"search": "kumar", "fuzzy": 1, "limit": 2}).json()
+    assert len(limited["employees"]) == 2 and limited["total"] > 2
+    ranked = client.get("/api/employees", params={"search": "kumar", "fuzzy": 1}).json()["employees"]
+    assert limited["employees"] == ranked[:2]
+    department = ranked[-1]["department"]
+    page = client.get("/api/employees", params={"search": "kumar", "fuzzy": 1, "limit": 1,
+                                                "department": department}).json()["employees"]
+    assert page == [emp for emp in ranked if emp["department"] == department][:1]
+    assert client.get("/api/employees", params={"search": "kumar", "fuzzy": 1, "after": "x"}).status_code == 400
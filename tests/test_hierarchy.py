@@ -0,0 +1,85 @@
+from directory import Directory, DirectoryStore, employee_from_row
+from hierarchy import OrgGraph
+
+
+def make_directory(rows):
+    return Directory([employee_from_row(row) for row in rows], version=1, source_hash="test")
+
+
+def test_intervals_answer_org_queries():
+    directory = make_directory([
+        {"id": "1", "reporting_id": "*"},
+        {"id": "2", "reporting_id": "1.0"},
+        {"id": "3", "reporting_manager": "Two Person(2)"},
+        {"id": "4", "reporting_id": "1"},
+        {"id": "5", "reporting_id": "404"},
+    ])
+    graph = OrgGraph.of(directory)
+    pos = directory.positions
+
+    assert graph.headcount(pos["1"]) == 3
+    assert graph.contains(pos["1"], pos["3"])
+    assert graph.contains(pos["2"], pos["3"])
+    assert not graph.contains(pos["4"], pos["3"])
+    assert not graph.contains(pos["3"], pos["2"])
+    assert [directory.employees[p].id for p in graph.chain(pos["3"])] == ["2", "1"]
+    assert graph.depth[pos["3"]] == 2
+    assert graph.orphans == [{"employeeId": "5", "reportingId": "404"}]
+    assert {"employeeId": "3", "reportsTo": "2"} in graph.relationships()
+
+
+def test_cycles_are_reported_and_broken():
+    directory = make_directory([
+        {"id": "10", "reporting_id": "12"},
+        {"id": "11", "reporting_id": "10"},
+        {"id": "12", "reporting_id": "11"},
+        {"id": "13", "reporting_id": "11"},
+    ])
+    graph = OrgGraph.of(directory)
+    assert [sorted(cycle) for cycle in graph.cycles] == [["10", "11", "12"]]
+    assert [directory.employees[p].id for p in graph.roots] == ["10"]
+    assert graph.headcount(directory.positions["10"]) == 3
+
+
+def test_real_directory_builds_a_forest(workbook_path):
+    graph = OrgGraph.of(DirectoryStore(workbook_path).current())
+    assert sum(graph.size[root] for root in graph.roots) == len(graph.directory)
+    top = graph.position("80006")
+    assert graph.contains(top, graph.position("80024"))
+
+
+def test_subtree_is_depth_limited_and_paginated():
+    rows = [{"id": "1", "reporting_id": "*"}]
+    rows += [{"id": str(100 + i), "reporting_id": "1"} for i in range(5)]
+    rows += [{"id": "200", "reporting_id": "100"}]
+    directory = make_directory(rows)
+    graph = OrgGraph.of(directory)
+    root = directory.positions["1"]
+
+    tree = graph.subtree(root, depth=1, limit=2)
+    assert tree["childCount"] == 5 and tree["subtreeSize"] == 7
+    assert [c["id"] for c in tree["children"]] == ["100", "101"]
+    assert "children" not in tree["children"][0]
+
+    seen = [c["id"] for c in tree["children"]]
+    cursor = tree["nextCursor"]
+    while cursor:
+        page = graph.subtree(root, depth=1, limit=2, cursor=cursor)
+        seen += [c["id"] for c in page["children"]]
+        cursor = page.get("nextCursor")
+    assert seen == ["100", "101", "102", "103", "104"]
+
+    deep = graph.subtree(root, depth=2, limit=1)
+    assert deep["children"][0]["children"][0]["id"] == "200"
+
+
+def test_only_the_latest_edited_graph_is_kept():
+    directory = make_directory([{"id": "1", "reporting_id": "*"}, {"id": "2", "reporting_id": "1"},
+                                {"id": "3", "reporting_id": "1"}])
+    base = OrgGraph.of(directory)
+    first = OrgGraph.of(directory, {"3": "2"}, overrides_version=1)
+    assert OrgGraph.of(directory, {"3": "2"}, overrides_version=1) is first
+    second = OrgGraph.of(directory, {"3": None}, overrides_version=2)
+    assert second is not first and OrgGraph.of(directory) is base
+    assert set(directory.derived) == {"org", "org.edited"} and directory.derived["org.edited"][1] is second
+    assert second.parent[directory.positions["3"]] == -1
@@ -0,0 +1,95 @@
+import base64
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from images import VARIANT_SIZES, ImageStore, initials, initials_svg
+
+
+def png_bytes(width=640, height=480, colour=(200, 30, 30)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), colour).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_uploads_are_deduplicated_and_rendered_once(tmp_path):
+    store = ImageStore(str(tmp_path))
+    digest = store.put(png_bytes())
+    paths = [store.path(digest, size) for size in VARIANT_SIZES]
+    mtimes = [os.path.getmtime(path) for path in paths]
+    for path, size in zip(paths, VARIANT_SIZES):
+        with Image.open(path) as variant:
+            assert variant.size == (size, size) and variant.format == "WEBP"
+
+    assert store.put(png_bytes()) == digest
+    assert [os.path.getmtime(path) for path in paths] == mtimes
+    assert store.put(png_bytes(colour=(0, 0, 255))) != digest
+    assert store._locks == {}  # per-hash locks do not outlive their uploads
+    store.close()
+
+
+def test_variant_picks_smallest_size_that_fits(tmp_path):
+    store = ImageStore(str(tmp_path))
+    digest = store.put(png_bytes())
+    assert store.variant(digest, 40).endswith("-48.webp")
+    assert store.variant(digest, 150).endswith("-150.webp")
+    assert store.variant(digest, 2000).endswith("-400.webp")
+    assert store.variant("../" + digest[3:], 48) is None
+    assert store.variant("0" * 64, 48) is None
+    with pytest.raises(ValueError):
+        store.put(b"not an image")
+    store.close()
+
+
+def test_initials_avatar():
+    assert initials("Asha Rani Verma") == "AV"
+    assert initials("madonna") == "MA"
+    assert initials("") == ""
+    svg = initials_svg(48, 48, "Asha Verma").decode()
+    assert ">AV</text>" in svg and 'width="48"' in svg
+    assert initials_svg(48, 48, "Asha Verma") is initials_svg(48, 48, "Asha Verma")
+    assert "<text" not in initials_svg(150, 150).decode()
+    assert ">A&lt;</text>" in initials_svg(48, 48, "A<script>").decode()
+
+
+def test_image_endpoints():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    employee = server.employee_store.current().employees[0]
+    version = client.get("/api/versions").json()["employees"]["version"]
+    image_url = "data:image/png;base64," + base64.b64encode(png_bytes()).decode()
+
+    chain = client.get(f"/api/hierarchy/{employee.id}/chain")
+    uploaded = client.put(f"/api/employees/{employee.id}/image", json={"imageUrl": image_url})
+    assert uploaded.status_code == 200
+    revalidated = client.get(f"/api/hierarchy/{employee.id}/chain", headers={"If-None-Match": chain.headers["etag"]})
+    assert revalidated.status_code == 200 and revalidated.headers["etag"] != chain.headers["etag"]
+    profile_image = uploaded.json()["profileImage"]
+    assert client.get("/api/versions").json()["employees"]["version"] > version
+    listed = client.get("/api/employees", params={"search": employee.name}).json()["employees"]
+    assert profile_image in [emp["profileImage"] for emp in listed]
+
+    served = client.get(profile_image)
+    assert served.headers["content-type"] == "image/webp"
+    assert "immutable" in served.headers["cache-control"]
+    raw = client.put(f"/api/employees/{employee.id}/image", content=png_bytes(), headers={"Content-Type": "image/png"})
+    assert raw.json()["profileImage"] == profile_image
+
+    assert client.put(f"/api/employees/{employee.id}/image", json={"imageUrl": "https://x/y.png"}).status_code == 400
+    assert client.put(f"/api/employees/{employee.id}/image", json=[image_url]).status_code == 400
+    assert client.put("/api/employees/nobody/image", json={"imageUrl": image_url}).status_code == 404
+    assert client.delete(f"/api/employees/{employee.id}/image").status_code == 200
+    assert client.delete(f"/api/employees/{employee.id}/image").status_code == 404
+
+    listed = client.get("/api/employees", params={"search": employee.name}).json()["employees"]
+    default = next(emp["profileImage"] for emp in listed if emp["id"] == employee.id)
+    placeholder = client.get(default)
+    assert placeholder.content == initials_svg(150, 150, employee.name)
+    assert placeholder.headers["content-type"] == "image/svg+xml"
+    assert "immutable" in placeholder.headers["cache-control"]
+    assert client.get("/api/placeholder/0/150").status_code == 400
@@ -0,0 +1,213 @@
+import random
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from meeting_rooms import BookingConflict, MeetingRooms
+
+TOMORROW_9AM = (datetime.now() + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+
+
+def slot(start_minutes, end_minutes):
+    return ((TOMORROW_9AM + timedelta(minutes=start_minutes)).isoformat(),
+            (TOMORROW_9AM + timedelta(minutes=end_minutes)).isoformat())
+
+
+def test_multiple_bookings_and_overlap_detection():
+    rooms = MeetingRooms()
+    first = rooms.book("ifc-14-001", "80001", "A", *slot(0, 60))
+    rooms.book("ifc-14-001", "80002", "B", *slot(60, 90))  # touching is fine
+    rooms.book("ifc-14-001", "80003", "C", *slot(120, 180))
+    with pytest.raises(BookingConflict) as clash:
+        rooms.book("ifc-14-001", "80004", "D", *slot(30, 45))
+    assert clash.value.booking == first
+    with pytest.raises(BookingConflict):
+        rooms.book("ifc-14-001", "80004", "D", *slot(100, 200))
+    rooms.book("ifc-14-002", "80004", "D", *slot(30, 45))  # other rooms are independent
+
+    room = rooms.room("ifc-14-001")
+    assert [b.employee_id for b in room.bookings] == ["80001", "80002", "80003"]
+    assert rooms.cancel("ifc-14-001", first.id) == first
+    rooms.book("ifc-14-001", "80004", "D", *slot(30, 45))
+
+    with pytest.raises(ValueError):
+        rooms.book("ifc-14-001", "80005", "E", *slot(-60 * 24 * 2, -60 * 24 * 2 + 30))
+    with pytest.raises(ValueError):
+        rooms.book("ifc-14-001", "80005", "E", *slot(300, 300))
+
+
+def test_concurrent_bookings_never_overlap():
+    rooms = MeetingRooms()
+    threads, accepted, rejected = 32, [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        barrier.wait()
+        for i in range(200):
+            # The 9 AM rush: everyone fights over the same few hours.
+            start = rng.randrange(0, 240, 15)
+            end = start + rng.choice((15, 30, 60))
+            try:
+                booking = rooms.book("ifc-14-009", str(seed), "Worker", *slot(start, end))
+            except BookingConflict:
+                with lock:
+                    rejected.append((start, end))
+                continue
+            with lock:
+                accepted.append(booking)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    room = rooms.room("ifc-14-009")
+    assert len(accepted) + len(rejected) == threads * 200
+    assert sorted(b.id for b in accepted) == sorted(b.id for b in room.bookings)
+    intervals = sorted((b.start, b.end) for b in accepted)
+    assert all(prev_end <= start for (_, prev_end), (start, _) in zip(intervals, intervals[1:]))
+
+
+def test_same_slot_race_has_exactly_one_winner():
+    rooms = MeetingRooms()
+    barrier = threading.Barrier(50)
+    winners = []
+
+    def worker(n):
+        barrier.wait()
+        try:
+            winners.append(rooms.book("noida-1-001", str(n), "Worker", *slot(0, 60)))
+        except BookingConflict:
+            pass
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(50)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    assert len(winners) == 1
+
+
+def test_booking_endpoints():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    start, end = slot(24 * 60 * 3, 24 * 60 * 3 + 60)
+    payload = {"employee_id": "80006", "employee_name": "A", "start_time": start, "end_time": end}
+    booked = client.post("/api/meeting-rooms/ifc-11-001/book", json=payload)
+    assert booked.status_code == 200
+    clash = client.post("/api/meeting-rooms/ifc-11-001/book", json=payload)
+    assert clash.status_code == 409
+    assert clash.json()["detail"]["conflict"]["id"] == booked.json()["id"]
+    assert client.post("/api/meeting-rooms/nope/book", json=payload).status_code == 404
+
+    listed = client.get("/api/meeting-rooms/ifc-11-001/bookings").json()
+    assert [b["id"] for b in listed] == [booked.json()["id"]]
+    rooms = client.get("/api/meeting-rooms", params={"location": "IFC", "floor": "11th Floor"}).json()
+    assert [room["id"] for room in rooms] == ["ifc-11-001"] and rooms[0]["status"] == "vacant"
+
+    free = client.get("/api/meeting-rooms/available",
+                      params={"start": start, "end": end, "min_capacity": 8, "location": "IFC"}).json()
+    assert "ifc-11-001" not in [room["id"] for room in free["rooms"]]
+    assert free["nextSlots"][0]["id"] == "ifc-11-001"
+    # Locations go through the taxonomy like the directory filters.
+    params = {"start": start, "end": end, "min_capacity": 8}
+    assert client.get("/api/meeting-rooms/available", params=dict(params, location=" ifc.")).json() == free
+    everywhere = client.get("/api/meeting-rooms/available", params=dict(params, location="All Locations")).json()
+    assert everywhere == client.get("/api/meeting-rooms/available", params=params).json()
+    assert len(client.get("/api/meeting-rooms", params={"location": "ifc"}).json()) == 11
+
+    cancelled = client.delete("/api/meeting-rooms/ifc-11-001/book", params={"booking_id": booked.json()["id"]})
+    assert cancelled.status_code == 200
+    assert client.get("/api/meeting-rooms/ifc-11-001/bookings").json() == []
+
+
+def test_available_ranks_free_rooms_and_offers_next_slots():
+    rooms = MeetingRooms()
+    start, end = slot(300, 360)  # 2-3 PM tomorrow
+    rooms.book("ifc-14-001", "1", "A", *slot(270, 330))     # OVAL, capacity 10
+    rooms.book("ifc-14-005", "2", "B", *slot(300, 420))     # GOLDEN GATE, capacity 10
+    rooms.book("ifc-14-005", "3", "C", *slot(420, 450))
+
+    result = rooms.available(start, end, min_capacity=8, location="IFC")
+    assert [room["id"] for room in result["rooms"]] == ["ifc-11-001", "ifc-14-009"]
+    assert [(s["id"], s["start_time"]) for s in result["nextSlots"]] == [
+        ("ifc-14-001", slot(330, 0)[0][:16]), ("ifc-14-005", slot(450, 0)[0][:16]),
+    ]
+
+    video = rooms.available(start, end, min_capacity=8, amenities=["video conference", "Audio System"])
+    assert [room["id"] for room in video["rooms"]] == ["ifc-14-009"]
+    assert rooms.available(start, end, min_capacity=50)["rooms"] == []
+    with pytest.raises(ValueError):
+        rooms.available(end, start)
+
+
+def test_past_bookings_expire_lazily():
+    rooms = MeetingRooms()
+    booked = rooms.book("office75-1-001", "1", "A", *slot(0, 30))
+    rooms.book("office75-1-001", "2", "B", *slot(60, 90))
+    room = rooms.room("office75-1-001")
+    assert rooms.expire(now=booked.start) == 0
+    assert rooms.expire(now=booked.end) == 1
+    assert [b.employee_id for b in room.bookings] == ["2"]
+    assert rooms.expire(now=booked.end) == 0
+
+
+def test_next_change_is_the_next_booking_start_or_end():
+    rooms = MeetingRooms()
+    first = rooms.book("office75-1-001", "1", "A", *slot(0, 30))
+    second = rooms.book("ifc-14-001", "2", "B", *slot(10, 90))
+    assert rooms.next_change(now=first.start - 60) == first.start
+    assert rooms.next_change(now=first.start) == second.start
+    assert rooms.next_change(now=second.start) == first.end
+    assert rooms.next_change(now=first.end) == second.end
+    assert rooms.next_change(now=second.end) == float("inf")
+
+
+def test_bookings_survive_a_restart(tmp_path):
+    from record_store import RecordStore
+
+    store = RecordStore(str(tmp_path))
+    rooms = MeetingRooms(bookings=store.collection("bookings"))
+    published = []
+    rooms.add_listener(lambda version, room_ids: published.append(version))
+    finished = rooms.book("ifc-12-001", "1", "A", *slot(0, 30))
+    kept = rooms.book("ifc-12-001", "2", "B", *slot(60, 90))
+    cancelled = rooms.book("ifc-14-002", "3", "C", *slot(0, 30))
+    rooms.cancel("ifc-14-002", cancelled.id)
+    assert published == [2, 3, 4, 5]
+    store.close()
+
+    store = RecordStore(str(tmp_path))
+    restarted = MeetingRooms(bookings=store.collection("bookings"), now=finished.end)
+    assert restarted.room("ifc-12-001").bookings == [kept]
+    assert restarted.room("ifc-14-002").bookings == []
+    assert len(store.collection("bookings")) == 1
+    assert restarted.version == rooms.version + 1  # continues from the last run; +1 for the pruned booking
+    with pytest.raises(BookingConflict):
+        restarted.book("ifc-12-001", "4", "D", *slot(70, 80))
+    store.close()
+
+
+def test_concurrent_changes_are_published_in_version_order():
+    rooms = MeetingRooms()
+    published = []
+    rooms.add_listener(lambda version, room_ids: published.append(version))
+    room_ids = list(rooms.rooms)
+
+    def worker(n):
+        for i in range(10):
+            rooms.book(room_ids[n], str(n), "X", *slot(i * 30, i * 30 + 30))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert published == list(range(2, 82))
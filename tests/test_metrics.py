@@ -0,0 +1,60 @@
+from metrics import Histogram, Metric, MetricsRegistry
+
+
+def test_histogram_and_exposition_format():
+    histogram = Histogram((0.01, 0.1))
+    for value in (0.005, 0.01, 0.05, 3.0):
+        histogram.observe(value)
+    lines = []
+    histogram.render("latency", (("route", "/x"),), lines)
+    assert lines == [
+        'latency_bucket{route="/x",le="0.01"} 2',
+        'latency_bucket{route="/x",le="0.1"} 3',
+        'latency_bucket{route="/x",le="+Inf"} 4',
+        'latency_sum{route="/x"} 3.065',
+        'latency_count{route="/x"} 4',
+    ]
+
+    registry = MetricsRegistry()
+    registry.register(lambda: [Metric("things", "gauge", "Things.", [({"kind": 'a "quoted"\nvalue'}, 3)])])
+    registry.requests.started()
+    registry.requests.finished("GET", "/api/x/{id}", 200, 0.002, 100)
+    text = registry.render()
+    assert 'http_requests_total{method="GET",route="/api/x/{id}",status="200"} 1' in text
+    assert "http_requests_in_flight 0" in text
+    assert '# TYPE things gauge\nthings{kind="a \\"quoted\\"\\nvalue"} 3\n' in text
+
+
+def test_metrics_endpoint_labels_routes_by_template():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    employee_id = server.employee_store.current().employees[0].id
+    client.get(f"/api/hierarchy/{employee_id}/chain")
+    client.get("/api/hierarchy/nobody/chain")
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'route="/api/hierarchy/{employee_id}/chain",status="200"' in text
+    assert 'route="/api/hierarchy/{employee_id}/chain",status="404"' in text
+    assert f"/api/hierarchy/{employee_id}" not in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/hierarchy/{employee_id}/chain",le="+Inf"}' in text
+    assert 'directory_records{dataset="employees"} ' in text
+    assert 'directory_index_build_seconds{listener="search_index.PrefixIndex.sync"' in text
+
+
+def test_health_readiness():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    assert client.get("/health").json()["status"] == "healthy"
+    server.stores_warmed.clear()
+    assert client.get("/health", params={"ready": 1}).status_code == 503
+    server.warm_stores()
+    ready = client.get("/health", params={"ready": 1})
+    assert ready.status_code == 200 and ready.json()["status"] == "ready"
+    assert ready.json()["stores"]["employee workbook"]["loaded"]
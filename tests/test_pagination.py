@@ -0,0 +1,46 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="module")
+def client():
+    import server
+
+    return TestClient(server.app)
+
+
+def collect(client, path, key, **params):
+    seen, cursor = [], None
+    while True:
+        body = client.get(path, params={**params, **({"after": cursor} if cursor else {})}).json()
+        seen += body[key]
+        cursor = body["nextCursor"]
+        if not cursor:
+            return seen, body["total"]
+
+
+def test_employee_pages_cover_the_result_once(client):
+    everyone = client.get("/api/employees", params={"location": "IFC"}).json()
+    paged, total = collect(client, "/api/employees", "employees", location="IFC", limit=37)
+    assert total == everyone["total"] == len(paged)
+    assert sorted(e["id"] for e in paged) == sorted(e["id"] for e in everyone["employees"])
+    ids = [e["id"] for e in paged]
+    assert ids == sorted(ids, key=lambda i: (len(i), i))
+
+
+def test_attendance_pages_and_stream_agree(client):
+    paged, total = collect(client, "/api/attendance", "records", limit=50)
+    assert len(paged) == total == len({r["id"] for r in paged})
+
+    streamed = client.get("/api/attendance", headers={"Accept": "application/x-ndjson"})
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in streamed.text.splitlines()]
+    assert [r["id"] for r in lines] == [r["id"] for r in paged]
+    assert streamed.headers["x-total-count"] == str(total)
+
+
+def test_bad_cursor_is_rejected(client):
+    assert client.get("/api/employees", params={"after": "YR9i"}).status_code == 400
+    assert client.get("/api/attendance", params={"after": "bm9wZQ"}).status_code == 400
@@ -0,0 +1,118 @@
+import os
+import shutil
+import threading
+
+import pytest
+
+import policy_search
+from policy_search import PolicyIndex, normalize, policy_title, snippet
+
+LEAVE = "_14_33_50e319284d7e4fe4_Leave Policy (Revised).pdf"
+DRESS = "_13_55_00673d13502c42da_Dress code policy.pdf"
+WHISTLE = "_16_4_3edd02c8f36f429f_Whistle Blower Policy.pdf"
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    calls = []
+    extract = policy_search.extract_pages
+
+    def counting(path):
+        calls.append(os.path.basename(path))
+        return extract(path)
+    monkeypatch.setattr(policy_search, "extract_pages", counting)
+    return calls
+
+
+def test_terms_and_titles():
+    assert normalize("Leaves") == "leave"
+    assert normalize("Policies") == "policy"
+    assert normalize("business") == "business"
+    assert policy_title(LEAVE) == "Leave Policy (Revised)"
+    assert policy_title("List of Holidays -2025.xlsx.pdf") == "List of Holidays -2025"
+
+
+def test_snippet_highlights_densest_matches():
+    text = "intro " * 80 + "casual leave & sick leave" + " outro" * 80
+    start = text.index("casual")
+    matches = [(start, start + 6), (start + 7, start + 12), (start + 20, start + 25)]
+    excerpt = snippet(text, matches)
+    assert excerpt.startswith("…") and excerpt.endswith("…")
+    assert "<mark>casual</mark> <mark>leave</mark> &amp; sick <mark>leave</mark>" in excerpt
+
+
+def test_bm25_ranks_the_matching_policy_first(policy_dir, tmp_path):
+    index = PolicyIndex(policy_dir, cache_dir=str(tmp_path))
+    index.refresh()
+    top = index.search("casual leave")["results"][0]
+    assert top["name"] == LEAVE
+    assert "<mark>Casual</mark> <mark>Leave</mark>" in top["snippet"]
+    text = index.documents[LEAVE].pages[top["page"] - 1]
+    assert all(text[start:end].lower().startswith(("casual", "leave")) for start, end in top["matches"])
+    assert index.search("whistle blower")["results"][0]["name"] == WHISTLE
+    assert index.search("the of and") == {"query": "the of and", "total": 0, "results": []}
+
+
+def test_reindexes_only_changed_files(policy_dir, tmp_path, extractions):
+    folder, cache = tmp_path / "policies", str(tmp_path / "cache")
+    folder.mkdir()
+    for name in (LEAVE, DRESS):
+        shutil.copy(os.path.join(policy_dir, name), folder)
+    index = PolicyIndex(str(folder), cache_dir=cache)
+    assert index.refresh() and sorted(extractions) == sorted([LEAVE, DRESS])
+
+    os.utime(folder / LEAVE, (1, 1))  # touched, same content
+    assert not index.refresh()
+    shutil.copy(os.path.join(policy_dir, WHISTLE), folder)
+    os.remove(folder / DRESS)
+    assert index.refresh()
+    assert extractions[2:] == [WHISTLE]
+    assert all(hit["name"] != DRESS for hit in index.search("dress code")["results"])
+    assert not any(DRESS in key for key in index.lengths)
+    assert len(os.listdir(cache)) == 2
+
+    restarted = PolicyIndex(str(folder), cache_dir=cache)
+    restarted.refresh()
+    assert len(extractions) == 3  # served from the text cache
+    assert restarted.search("whistle")["results"][0]["name"] == WHISTLE
+
+
+def test_searches_are_answered_while_a_file_is_extracted(policy_dir, tmp_path, monkeypatch):
+    folder = tmp_path / "policies"
+    folder.mkdir()
+    shutil.copy(os.path.join(policy_dir, LEAVE), folder)
+    index = PolicyIndex(str(folder))
+    index.refresh()
+    extracting, release = threading.Event(), threading.Event()
+    extract = policy_search.extract_pages
+
+    def slow(path):
+        extracting.set()
+        release.wait(5)
+        return extract(path)
+    monkeypatch.setattr(policy_search, "extract_pages", slow)
+    shutil.copy(os.path.join(policy_dir, WHISTLE), folder)
+    refresh = threading.Thread(target=index.refresh)
+    refresh.start()
+    assert extracting.wait(5)
+    try:
+        assert index.search("casual leave")["results"][0]["name"] == LEAVE
+        assert index.search("whistle blower")["total"] == 0
+    finally:
+        release.set()
+        refresh.join()
+    assert index.search("whistle blower")["results"][0]["name"] == WHISTLE
+    assert index.listing()[-1]["url"] == "/company%20policies/_16_4_3edd02c8f36f429f_Whistle%20Blower%20Policy.pdf"
+
+
+def test_policy_endpoints():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    listing = client.get("/api/policies").json()
+    assert LEAVE in [policy["name"] for policy in listing]
+    results = client.get("/api/policies/search", params={"q": "dress code", "limit": 3}).json()["results"]
+    assert results[0]["name"] == DRESS and len(results) <= 3
+    assert client.get("/api/policies/search").status_code == 422
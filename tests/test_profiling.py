@@ -0,0 +1,119 @@
+import time
+
+from profiling import NO_SPAN, ProfilingMiddleware, RequestProfiler, frame_label, span
+
+
+def busy(seconds):
+    until = time.perf_counter() + seconds
+    while time.perf_counter() < until:
+        sum(range(1000))
+
+
+def profiled_app(profiler):
+    from fastapi import FastAPI
+
+    from pagination import ndjson_response
+
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+    @app.get("/work")
+    def work():
+        with span("lookup"):
+            busy(0.04)
+        with span("serialize"):
+            busy(0.01)
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        return ndjson_response({"n": n} for n in range(1200))
+
+    @app.get("/debug/profiles")
+    def listing():
+        return profiler.listing()
+
+    return app
+
+
+def test_frame_labels_fall_back_to_the_name_before_python_3_11():
+    class Code:
+        co_name, co_filename, co_firstlineno = "work", "/srv/app/server.py", 7
+
+    assert frame_label(Code) == "work (server.py:7)"
+    assert frame_label(busy.__code__).startswith("busy (test_profiling.py:")
+
+
+def test_span_is_a_no_op_outside_traced_requests():
+    assert span("lookup") is NO_SPAN
+    with span("lookup"):
+        pass
+
+
+def test_profile_token_samples_one_request():
+    from fastapi.testclient import TestClient
+
+    profiler = RequestProfiler(token="s3cret", interval=0.001)
+    client = TestClient(profiled_app(profiler))
+    assert "x-profile-id" not in client.get("/work").headers
+    assert "x-profile-id" not in client.get("/work", headers={"X-Profile": "wrong"}).headers
+    assert not profiler.profiles
+
+    profile_id = client.get("/work", headers={"X-Profile": "s3cret"}).headers["x-profile-id"]
+    # The token is never taken from the query string, where access logs would record it.
+    assert "x-profile-id" not in client.get("/work", params={"__profile": "s3cret"}).headers
+    assert client.get("/work", headers={"X-Profile": "s3cret"}).headers["x-profile-id"] != profile_id
+    profile = profiler.profile(profile_id)
+    assert profile.status == 200 and profile.path == "/work"
+    lines = profile.collapsed().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    # Handlers run in the thread pool; their stacks are rooted at the endpoint.
+    assert any(line.startswith("profiled_app.<locals>.work (test_profiling.py") and ";busy (" in line
+               for line in lines)
+    # Reading profiles is never profiled itself.
+    client.get("/debug/profiles", headers={"X-Profile": "s3cret"})
+    assert [entry["id"] for entry in profiler.listing()][1:] == [profile_id]
+
+
+def test_slow_requests_are_logged_with_span_timings():
+    from fastapi.testclient import TestClient
+
+    profiler = RequestProfiler(slow_ms=30)
+    client = TestClient(profiled_app(profiler))
+    client.get("/work")
+    client.get("/debug/profiles")
+    [entry] = profiler.slow_requests()
+    assert entry["path"] == "/work" and entry["status"] == 200 and entry["ms"] >= 50
+    assert entry["spans"]["lookup"]["calls"] == 1 and entry["spans"]["lookup"]["ms"] >= 40
+    assert entry["spans"]["serialize"]["ms"] >= 10
+    assert entry["frameworkMs"] < entry["ms"] - 50
+
+    profiler.slow_seconds = 0
+    client.get("/stream")
+    # Streamed bodies are serialised after the handler returns, in batches.
+    assert profiler.slow_requests()[0]["spans"]["serialize"]["calls"] == 4
+
+
+def test_debug_routes_do_not_exist_without_a_token():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    assert server.profiler.token is None
+    assert client.get("/debug/slow-requests").status_code == 404
+    assert client.get("/debug/profiles", headers={"X-Profile": ""}).status_code == 404
+
+
+def test_debug_routes_answer_with_the_token(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import server
+
+    monkeypatch.setattr(server.profiler, "token", "s3cret")
+    client = TestClient(server.app)
+    headers = {"X-Profile": "s3cret"}
+    assert client.get("/debug/profiles", headers=headers).status_code == 200
+    assert client.get("/debug/slow-requests", headers=headers).status_code == 200
+    assert client.get("/debug/profiles/missing", headers=headers).status_code == 404
+    assert client.get("/debug/profiles", headers={"X-Profile": "wrong"}).status_code == 403
@@ -0,0 +1,112 @@
+import os
+import threading
+
+import pytest
+
+from record_store import RecordStore
+
+
+def test_changes_survive_restart(tmp_path):
+    store = RecordStore(str(tmp_path))
+    news = store.collection("news")
+    first = news.create({"title": "Launch"})
+    second = news.create({"title": "Offsite"})
+    news.update(first["id"], {"title": "Launch day", "id": "ignored"})
+    news.delete(second["id"])
+    with pytest.raises(KeyError):
+        news.update("missing", {})
+    store.close()
+
+    reopened = RecordStore(str(tmp_path)).collection("news")
+    assert [item["title"] for item in reopened.list()] == ["Launch day"]
+    assert reopened.get(first["id"])["id"] == first["id"]
+    assert reopened.version == news.version == 4
+
+
+def test_torn_log_tail_is_dropped(tmp_path):
+    store = RecordStore(str(tmp_path))
+    store.collection("tasks").create({"title": "kept"})
+    store.close()
+    wal = tmp_path / "tasks.wal"
+    with open(wal, "ab") as fh:
+        fh.write(b'{"seq":2,"op":"put","id":"task_x","rec')
+    size_before = os.path.getsize(wal)
+
+    store = RecordStore(str(tmp_path))
+    tasks = store.collection("tasks")
+    assert [task["title"] for task in tasks.list()] == ["kept"]
+    assert os.path.getsize(wal) < size_before
+    tasks.create({"title": "after crash"})
+    store.close()
+    assert len(RecordStore(str(tmp_path)).collection("tasks")) == 2
+
+
+def test_compaction_keeps_state_and_truncates_log(tmp_path):
+    store = RecordStore(str(tmp_path), compact_after=10)
+    alerts = store.collection("alerts")
+    ids = [alerts.create({"n": n})["id"] for n in range(25)]
+    for record_id in ids[:5]:
+        alerts.delete(record_id)
+    store.close()
+    assert (tmp_path / "alerts.snapshot.json").exists()
+    assert sum(1 for _ in open(tmp_path / "alerts.wal", "rb")) < 10
+
+    reopened = RecordStore(str(tmp_path)).collection("alerts")
+    assert [item["n"] for item in reopened.list()] == list(range(24, 4, -1))
+    assert reopened.version == 30
+
+
+def test_concurrent_writers_share_commits(tmp_path):
+    store = RecordStore(str(tmp_path))
+    help_desk = store.collection("help")
+    request = help_desk.create({"title": "VPN", "replies": []})
+    published = []
+    help_desk.add_listener(lambda version, ids: published.append(version))
+
+    def worker(n):
+        for i in range(25):
+            help_desk.update(request["id"], lambda item: {"replies": item["replies"] + [f"{n}-{i}"]})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(help_desk.get(request["id"])["replies"]) == 200
+    assert store.commits <= 201
+    # Listeners hear about every change exactly once, in seq order.
+    assert published == list(range(2, 202))
+    store.close()
+    assert len(RecordStore(str(tmp_path)).collection("help").get(request["id"])["replies"]) == 200
+
+
+def test_collection_and_hierarchy_endpoints():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    created = client.post("/api/news", json={"title": "Town hall"}).json()
+    assert created["id"].startswith("news_")
+    assert client.put(f"/api/news/{created['id']}", json={"title": "Town hall (moved)"}).json()["title"] == \
+        "Town hall (moved)"
+    assert client.get("/api/news").json()[0]["title"] == "Town hall (moved)"
+    assert client.put("/api/news/nope", json={}).status_code == 404
+
+    help_request = client.post("/api/help", json={"title": "Laptop"}).json()
+    reply = client.post(f"/api/help/{help_request['id']}/replies", json={"message": "On it"}).json()
+    assert client.get("/api/help").json()[0]["replies"] == [reply]
+
+    alert = client.post("/api/alerts", json={"title": "Fire drill"}).json()
+    assert alert["isActive"] and alert["type"] == "info"
+    assert alert["id"] in [a["id"] for a in client.get("/api/alerts/active").json()]
+    client.post(f"/api/alerts/{alert['id']}/toggle")
+    assert alert["id"] not in [a["id"] for a in client.get("/api/alerts/active").json()]
+
+    employees = server.employee_store.current().employees
+    worker, manager = employees[-1].id, employees[0].id
+    assert client.post("/api/hierarchy", json={"employeeId": worker, "reportsTo": manager}).status_code == 200
+    assert client.get(f"/api/hierarchy/{worker}/chain").json()[0]["id"] == manager
+    assert client.get(f"/api/hierarchy/{manager}/contains/{worker}").json()["contains"]
+    assert client.delete(f"/api/hierarchy/{worker}").status_code == 200
+    assert client.delete(f"/api/hierarchy/{worker}").status_code == 404
@@ -0,0 +1,32 @@
+from directory import Directory, DirectoryStore
+from search_index import PrefixIndex
+
+QUERIES = ["a", "vik", "80", "IFC", "human", "9", "President", "zzz", "de"]
+
+
+def test_index_matches_linear_scan(workbook_path):
+    directory = DirectoryStore(workbook_path).current()
+    index = PrefixIndex()
+    index.sync(directory)
+    for query in QUERIES:
+        assert directory.search(query, index=index) == directory.search(query), query
+    assert directory.search("a", department="Sales", index=index) == directory.search("a", department="Sales")
+
+
+def test_incremental_sync_only_touches_changed_records(workbook_path):
+    directory = DirectoryStore(workbook_path).current()
+    index = PrefixIndex()
+    index.sync(directory)
+
+    employees = list(directory.employees)
+    renamed = employees[0]._replace(name="Zebulon Quill")
+    employees[0] = renamed
+    removed = employees.pop()
+    updated = Directory(employees, version=2, source_hash="edited")
+
+    assert index.sync(updated) == (1, 2)
+    assert index.lookup("zebulon") == {renamed.id}
+    assert removed.id not in index.lookup(removed.name[:3])
+    assert renamed.id not in index.lookup(directory.employees[0].name)
+    for query in QUERIES:
+        assert updated.search(query, index=index) == updated.search(query), query
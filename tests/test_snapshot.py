@@ -0,0 +1,40 @@
+import os
+import shutil
+
+from attendance import AttendanceStore
+from directory import DirectoryStore
+from snapshot import open_snapshot, snapshot_path
+
+
+def test_directory_round_trips_through_snapshot(tmp_path, workbook_path):
+    parsed = DirectoryStore(workbook_path, snapshot_dir=str(tmp_path)).current()
+    assert parsed.loaded_from == "source"
+    assert os.path.exists(snapshot_path(str(tmp_path), "employees", parsed.source_hash))
+
+    mapped = DirectoryStore(workbook_path, snapshot_dir=str(tmp_path)).current()
+    assert mapped.loaded_from == "snapshot"
+    assert mapped.employees == parsed.employees
+    assert any(emp.reporting_id is None for emp in mapped.employees)
+
+
+def test_attendance_round_trips_through_snapshot(attendance_path, tmp_path):
+    parsed = AttendanceStore(attendance_path, snapshot_dir=str(tmp_path)).current()
+    mapped = AttendanceStore(attendance_path, snapshot_dir=str(tmp_path)).current()
+    assert mapped.loaded_from == "snapshot"
+    assert list(mapped.records(range(len(mapped)))) == list(parsed.records(range(len(parsed))))
+    assert mapped.summary(group_by="location") == parsed.summary(group_by="location")
+
+
+def test_changed_source_misses_and_replaces_snapshot(tmp_path, workbook_path):
+    source = tmp_path / "employees.xlsx"
+    shutil.copy(workbook_path, source)
+    snapshots = tmp_path / "snapshots"
+    first = DirectoryStore(str(source), snapshot_dir=str(snapshots)).current()
+
+    with open(source, "ab") as fh:
+        fh.write(b"\0")  # different hash; openpyxl ignores trailing bytes
+    second = DirectoryStore(str(source), snapshot_dir=str(snapshots)).current()
+    assert second.loaded_from == "source" and second.source_hash != first.source_hash
+    assert open_snapshot(str(snapshots), "employees", first.source_hash) is None
+    assert os.listdir(snapshots) == [os.path.basename(
+        snapshot_path(str(snapshots), "employees", second.source_hash))]
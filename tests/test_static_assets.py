@@ -0,0 +1,79 @@
+import os
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from static_assets import IMMUTABLE, PrecompressedFiles, accepted_encodings
+
+
+def make_build(tmp_path):
+    os.makedirs(tmp_path / "static" / "js")
+    (tmp_path / "index.html").write_text("<html>" + "app " * 500 + "</html>")
+    (tmp_path / "static" / "js" / "main.0123abcd.js").write_text("console.log('x');" * 400)
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" + bytes(2000))
+    app = Starlette()
+    app.mount("/", PrecompressedFiles(str(tmp_path)))
+    return TestClient(app)
+
+
+def test_negotiates_sidecars_and_cache_policy(tmp_path):
+    client = make_build(tmp_path)
+    assert os.path.exists(tmp_path / "static" / "js" / "main.0123abcd.js.gz")
+    assert not os.path.exists(tmp_path / "logo.png.gz")
+
+    bundle = client.get("/static/js/main.0123abcd.js", headers={"Accept-Encoding": "gzip"})
+    assert bundle.headers["content-encoding"] == "gzip"
+    assert bundle.headers["cache-control"] == IMMUTABLE
+    assert bundle.text == "console.log('x');" * 400
+    assert int(bundle.headers["content-length"]) < 1000
+
+    plain = client.get("/static/js/main.0123abcd.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] != bundle.headers["etag"]
+
+    index = client.get("/index.html")
+    assert index.headers["cache-control"] == "no-cache"
+    assert client.get("/index.html", headers={"If-None-Match": index.headers["etag"]}).status_code == 304
+
+
+def test_sidecars_can_live_outside_the_build(tmp_path):
+    build, sidecars = tmp_path / "build", tmp_path / "sidecars"
+    build.mkdir()
+    (build / "index.html").write_text("<html>" + "app " * 500 + "</html>")
+    app = Starlette()
+    app.mount("/", PrecompressedFiles(str(build), sidecar_dir=str(sidecars)))
+    response = TestClient(app).get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip" and response.text.startswith("<html>app")
+    assert os.listdir(build) == ["index.html"] and os.path.exists(sidecars / "index.html.gz")
+
+
+def test_spa_fallback_and_missing_assets(tmp_path):
+    client = make_build(tmp_path)
+    assert client.get("/directory/80002").text.startswith("<html>")
+    assert client.get("/static/js/missing.js").status_code == 404
+
+
+def test_changed_added_and_removed_files_are_noticed(tmp_path):
+    client = make_build(tmp_path)
+    index = client.get("/index.html", headers={"Accept-Encoding": "gzip"})
+    assert client.get("/index.html", headers={"If-None-Match": "*"}).status_code == 304
+
+    (tmp_path / "index.html").write_text("<html>" + "new " * 800 + "</html>")
+    os.utime(tmp_path / "index.html", ns=(1, os.stat(tmp_path / "index.html").st_mtime_ns + 10 ** 9))
+    changed = client.get("/index.html", headers={"Accept-Encoding": "gzip", "If-None-Match": index.headers["etag"]})
+    assert changed.status_code == 200 and changed.headers["etag"] != index.headers["etag"]
+    assert changed.text == "<html>" + "new " * 800 + "</html>"
+    assert int(changed.headers["content-length"]) == os.path.getsize(tmp_path / "index.html.gz")
+
+    (tmp_path / "policy.pdf").write_bytes(b"%PDF" + bytes(100))
+    assert client.get("/policy.pdf").content == b"%PDF" + bytes(100)
+    os.remove(tmp_path / "policy.pdf")
+    assert client.get("/policy.pdf").status_code == 404
+    assert client.get("/index.html.gz").status_code == 404
+    assert client.get("/static/../../etc/passwd").text.startswith("<html>")  # never outside the build
+
+
+def test_accept_encoding_parsing():
+    assert accepted_encodings("gzip;q=0.5, br") == ["br", "gzip"]
+    assert accepted_encodings("br;q=0, gzip") == ["gzip"]
+    assert accepted_encodings("") == []
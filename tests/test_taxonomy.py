@@ -0,0 +1,76 @@
+import pytest
+
+from directory import DirectoryStore
+from facets import FacetIndex
+from taxonomy import Taxonomy, Vocabulary, value_key
+
+
+def test_resolution_ignores_case_punctuation_and_word_order():
+    assert value_key("Sales Gallery 62") == value_key("62 sales  Gallery.")
+    taxonomy = Taxonomy({"department": Vocabulary("department", ["Human Resources", "Project Management"],
+                                                  {"Human Resource": "Human Resources"})})
+    assert taxonomy.canonical("department", "human resource") == "Human Resources"
+    assert taxonomy.canonical("department", "Project Management.") == "Project Management"
+    assert taxonomy.canonical("department", " Legal ") == "Legal"
+    # Fields without a vocabulary keep every value as written.
+    assert taxonomy.canonical("location", "Anywhere") == "Anywhere"
+    with pytest.raises(ValueError):
+        Vocabulary("department", ["Sales"], {"Saels": "Marketing"})
+    # Arbitrary filter values are resolved, never remembered.
+    for n in range(100):
+        taxonomy.canonical("department", f"junk {n}")
+    assert not hasattr(taxonomy.vocabularies["department"], "_resolved")
+
+
+def test_encode_shares_values_and_reports_unmapped():
+    taxonomy = Taxonomy({"location": Vocabulary("location", ["62 Sales Gallery", "Sales Gallery 113"],
+                                                {"Sales Galley 113": "Sales Gallery 113"})})
+    raw = ["62 Sales Gallery", "62 sales Gallery", "Sales Galley 113", "Sales Gallery 11", "", "Sales Gallery 11"]
+    column, unmapped = taxonomy.encode("location", raw)
+    assert column.values == ["62 Sales Gallery", "Sales Gallery 113", "Sales Gallery 11", ""]
+    assert list(column.codes) == [0, 0, 1, 2, 3, 2] and column.codes.typecode == "H"
+    assert unmapped == {"Sales Gallery 11": 2}
+    report = taxonomy.report({"location": column}, {"location": unmapped})["location"]
+    assert report["values"][0] == {"value": "62 Sales Gallery", "code": 0, "count": 2}
+    [missing] = report["unmapped"]
+    assert missing["value"] == "Sales Gallery 11" and missing["count"] == 2
+    assert missing["suggestions"][0] == "Sales Gallery 113"
+
+
+def test_directory_is_canonicalised_and_dictionary_encoded(workbook_path, taxonomy_path, tmp_path):
+    taxonomy = Taxonomy.load(taxonomy_path)
+    store = DirectoryStore(workbook_path, snapshot_dir=str(tmp_path), taxonomy=taxonomy)
+    directory = store.current()
+    assert "62 sales Gallery" not in {emp.location for emp in directory.employees}
+    assert not any(directory.unmapped.values())
+    locations = directory.columns["location"]
+    for emp, code in zip(directory.employees, locations.codes):
+        assert emp.location is locations.values[code]
+    facets = FacetIndex(directory)
+    assert facets.columns["location"].codes is locations.codes
+
+    # A compiled snapshot is re-canonicalised with the current alias table.
+    reloaded = DirectoryStore(workbook_path, snapshot_dir=str(tmp_path), taxonomy=taxonomy).current()
+    assert reloaded.loaded_from == "snapshot"
+    assert [emp.location for emp in reloaded.employees] == [emp.location for emp in directory.employees]
+    # The snapshot keeps the workbook's spellings, so dropping the aliases separates them again.
+    unaliased = DirectoryStore(workbook_path, snapshot_dir=str(tmp_path), taxonomy=Taxonomy()).current()
+    assert unaliased.loaded_from == "snapshot"
+    assert "62 sales Gallery" in {emp.location for emp in unaliased.employees}
+
+
+def test_taxonomy_endpoint_and_filter_aliases():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    report = client.get("/api/taxonomy").json()
+    assert report["location"]["unmapped"] == []
+    gallery = next(v for v in report["location"]["values"] if v["value"] == "62 Sales Gallery")
+    names = [loc["name"] for loc in client.get("/api/locations").json()["locations"]]
+    assert "62 sales Gallery" not in names and "62 Sales Gallery" in names
+    filtered = client.get("/api/employees", params={"location": "sales gallery 62"}).json()
+    assert filtered["total"] == gallery["count"]
+    assert client.get("/api/employees", params={"department": "Human Resource"}).json()["total"] == \
+        client.get("/api/employees", params={"department": "Human Resources"}).json()["total"] > 0
@@ -0,0 +1,78 @@
+from datetime import date
+
+import pytest
+
+from attendance import AttendanceTable
+from policy_search import PolicyIndex
+from work_calendar import CalendarYear, WorkCalendar, parse_holidays
+
+
+def test_parse_holiday_rows():
+    text = ("S.no Holiday List Date Day 1 New Year Day 01st January,2025 Wednesday "
+            "2 Raksha Bandhan 09th August ,2025 Saturday 3 Holi 08-Mar-23 Wednesday "
+            "4 Misprint 02nd October,2025 Monday")
+    assert [(h.day, h.name) for h in parse_holidays(text)] == [
+        (date(2025, 1, 1), "New Year Day"), (date(2025, 8, 9), "Raksha Bandhan"), (date(2023, 3, 8), "Holi")]
+
+
+def test_weekly_offs_and_prefix_sums():
+    year = CalendarYear(2026, [date(2026, 1, 26)])
+    # Sundays and the 2nd/4th Saturdays are off; 1st, 3rd and 5th Saturdays are worked.
+    assert not year.is_working(date(2026, 1, 4)) and not year.is_working(date(2026, 1, 10))
+    assert year.is_working(date(2026, 1, 3)) and year.is_working(date(2026, 1, 31))
+    assert not year.is_working(date(2026, 1, 26))
+    assert year.count(date(2026, 1, 1), date(2026, 1, 31)) == 31 - 4 - 2 - 1
+
+
+@pytest.fixture(scope="module")
+def calendar(policy_dir):
+    policies = PolicyIndex(policy_dir)
+    work_calendar = WorkCalendar()
+    assert work_calendar.sync(policies.current()) and not work_calendar.sync(policies)
+    return work_calendar
+
+
+def test_holiday_lists_drive_working_days(calendar):
+    assert calendar.listed_years == [2023, 2024, 2025]
+    assert len(calendar.sources) == 3
+    summary = calendar.summary(date(2025, 8, 1), date(2025, 8, 31))
+    # Raksha Bandhan is on a 2nd Saturday (already off); Janmashtami takes the 3rd.
+    assert [h["name"] for h in summary["holidays"]] == ["Raksha Bandhan", "Independence Day", "Janmashtami"]
+    assert summary["workingDays"] == 31 - 5 - 2 - 2
+    assert summary["calendarDays"] == summary["workingDays"] + summary["weeklyOffs"] + 2
+    start, end = date(2024, 12, 20), date(2026, 1, 10)
+    assert calendar.working_days(start, end) == sum(
+        calendar.is_working(date.fromordinal(day)) for day in range(start.toordinal(), end.toordinal() + 1))
+    assert calendar.summary(start, end)["yearsWithoutHolidayList"] == [2026]
+    with pytest.raises(ValueError):
+        calendar.working_days(end, start)
+
+
+def test_attendance_summary_expected_days(calendar):
+    rows = [{"employee_id": "E1", "name": "A", "date": day, "status": status}
+            for day, status in (("2025-08-14", "present"), ("2025-08-15", "holiday"), ("2025-08-18", "half_day"))]
+    table = AttendanceTable.from_rows(rows)
+    summary = table.summary(date(2025, 8, 11), date(2025, 8, 18), calendar=calendar)
+    assert summary["workingDays"] == 5
+    assert summary["groups"][0]["expectedDays"] == 5 and summary["groups"][0]["attendedDays"] == 1.5
+    by_day = table.summary(group_by="day", calendar=calendar)["groups"]
+    assert [row["workingDay"] for row in by_day] == [True, False, True]
+
+
+def test_working_days_endpoint():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    client = TestClient(server.app)
+    params = {"from": "2025-10-01", "to": "2025-10-31", "location": "sales gallery 62"}
+    response = client.get("/api/calendar/working-days", params=params)
+    body = response.json()
+    assert body["location"] == "62 Sales Gallery" and len(body["holidays"]) == 5
+    assert client.get("/api/calendar/working-days", params=params,
+                      headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+    assert client.get("/api/calendar/working-days",
+                      params={"from": "2025-10-01", "to": "2025-10-31", "location": "Atlantis"}).status_code == 404
+    assert client.get("/api/calendar/working-days", params={"from": "2025-10-31", "to": "2025-10-01"}).status_code == 400
+    summary = client.get("/api/attendance/summary").json()
+    assert summary["workingDays"] > 0 and "expectedDays" in summary["groups"][0]